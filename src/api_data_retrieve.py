@@ -11,6 +11,15 @@ from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+import search_index
+import similarity_index
+from genre_sketches import record_movies
+from leaderboards import refresh_leaderboards
+from metrics_history import record_snapshots
+from movie_documents import refresh_documents
+from partitioning import PARTITION_BY_YEAR, SPLIT_MOVIE_TEXT
+from ingestion_metrics import IngestionMetrics
+
 # Load environment variables
 load_dotenv()
 
@@ -18,7 +27,8 @@ load_dotenv()
 TMDB_API_KEY = os.getenv('TMDB_API_KEY')
 TMDB_BASE_URL = 'https://api.themoviedb.org/3'
 
-# Database configuration (should match create_db_script.py)
+# Database configuration (should match create_db_script.py); always the primary,
+# since this script writes (read replicas are only used through db_routing.py)
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', '127.0.0.1'),
     'port': int(os.getenv('DB_PORT', 3305)),
@@ -30,17 +40,39 @@ DB_CONFIG = {
 # Configuration for data fetching
 NUM_PAGES_TO_FETCH = 25  # 25 pages × 20 movies = 500 movies (reduces to ~10K total records)
 REQUEST_DELAY = 0.25  # Delay between API requests (4 requests/second to be safe)
+TOP_BILLING_SIZE = 3  # Cast members kept in movie_top_billing (matches query_5)
+
+# Progress reporting
+INGEST_VERBOSE = os.getenv('INGEST_VERBOSE', '0') == '1'  # Print one line per movie
+PROGRESS_INTERVAL = float(os.getenv('INGEST_PROGRESS_INTERVAL', 10))  # Seconds between progress lines
+INGEST_METRICS_FILE = os.getenv('INGEST_METRICS_FILE')  # .json or Prometheus text file
+
+# Keep the embedded search index (search_index.py) up to date while ingesting
+UPDATE_SEARCH_INDEX = os.getenv('UPDATE_SEARCH_INDEX', '0') == '1'
+
+# Add ingested movies to the similar-movie index (similarity_index.py)
+UPDATE_SIMILARITY_INDEX = os.getenv('UPDATE_SIMILARITY_INDEX', '0') == '1'
+
+# Metrics for the current run (replaced by populate_database())
+METRICS = IngestionMetrics(progress_interval=0)
 
 
-def get_db_connection():
+def get_db_connection(database=None):
     """
     Establish connection to MySQL database.
 
+    Args:
+        database (str): Schema to use instead of DB_CONFIG['database']
+
     Returns:
         mysql.connector.connection: Database connection object
     """
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
+        config = DB_CONFIG.copy()
+        if database:
+            config['database'] = database
+
+        connection = mysql.connector.connect(**config)
         if connection.is_connected():
             return connection
     except Error as e:
@@ -69,11 +101,18 @@ def make_api_request(endpoint, params=None):
     retry_delay = 2
 
     for attempt in range(max_retries):
+        if attempt > 0:
+            METRICS.increment('api_retries')
+
         try:
-            response = requests.get(url, params=params, timeout=10)
+            METRICS.increment('api_calls')
+            with METRICS.timed('api_latency_ms'):
+                response = requests.get(url, params=params, timeout=10)
+            METRICS.increment('bytes_downloaded', len(response.content))
 
             # Handle rate limiting
             if response.status_code == 429:
+                METRICS.increment('api_rate_limited')
                 wait_time = int(response.headers.get('Retry-After', 60))
                 print(f"Rate limited. Waiting {wait_time} seconds...")
                 time.sleep(wait_time)
@@ -89,8 +128,11 @@ def make_api_request(endpoint, params=None):
                 time.sleep(retry_delay)
                 retry_delay *= 2  # Exponential backoff
             else:
+                METRICS.increment('api_failures')
                 return None
 
+    METRICS.increment('api_failures')
+
     return None
 
 
@@ -174,10 +216,12 @@ def insert_genres(connection, genres):
         ON DUPLICATE KEY UPDATE genre_name = VALUES(genre_name)
         """
 
-        for genre in genres:
-            cursor.execute(insert_query, (genre['id'], genre['name']))
+        with METRICS.timed('db_write_ms'):
+            for genre in genres:
+                cursor.execute(insert_query, (genre['id'], genre['name']))
 
-        connection.commit()
+            connection.commit()
+        METRICS.add_rows('genres', len(genres))
         print(f"✓ Inserted {len(genres)} genres into database")
 
     except Error as e:
@@ -206,6 +250,36 @@ def parse_date(date_string):
         return None
 
 
+def release_year_of(movie_data):
+    """
+    Partition key of a movie: its release year, or 0 when the date is unknown.
+
+    Args:
+        movie_data (dict): Movie data from TMDb API
+
+    Returns:
+        int: Release year or 0
+    """
+    release_date = parse_date(movie_data.get('release_date'))
+    return release_date.year if release_date else 0
+
+
+def delete_moved_movie(cursor, movie_id, release_year):
+    """
+    Remove rows a movie left in other partitions after its release year changed.
+    The primary keys of partitioned tables include release_year, so an upsert
+    with a new year would otherwise create a second copy instead of updating.
+
+    Args:
+        cursor: MySQL cursor inside the movie's write transaction
+        movie_id (int): Movie ID
+        release_year (int): Current release year of the movie
+    """
+    for table in ('movies', 'movie_cast', 'movie_crew'):
+        cursor.execute(f"DELETE FROM {table} WHERE movie_id = %s AND release_year <> %s",
+                       (movie_id, release_year))
+
+
 def insert_movie(connection, movie_data):
     """
     Insert a movie into the database.
@@ -220,16 +294,20 @@ def insert_movie(connection, movie_data):
     cursor = connection.cursor()
 
     try:
-        insert_query = """
+        # Overview goes to movie_texts in split mode, so it is left out of movies
+        overview_column = "" if SPLIT_MOVIE_TEXT else "overview, "
+        overview_update = "" if SPLIT_MOVIE_TEXT else "overview = VALUES(overview),"
+        year_column = "release_year, " if PARTITION_BY_YEAR else ""
+        insert_query = f"""
         INSERT INTO movies (
-            movie_id, title, overview, release_date, runtime,
+            movie_id, {year_column}title, {overview_column}release_date, runtime,
             budget, revenue, vote_average, vote_count,
             popularity, original_language
         )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES ({', '.join(['%s'] * (10 + bool(year_column) + bool(overview_column)))})
         ON DUPLICATE KEY UPDATE
             title = VALUES(title),
-            overview = VALUES(overview),
+            {overview_update}
             vote_average = VALUES(vote_average),
             vote_count = VALUES(vote_count),
             popularity = VALUES(popularity)
@@ -237,8 +315,9 @@ def insert_movie(connection, movie_data):
 
         values = (
             movie_data.get('id'),
+            *((release_year_of(movie_data),) if PARTITION_BY_YEAR else ()),
             movie_data.get('title', 'Unknown'),
-            movie_data.get('overview'),
+            *(() if SPLIT_MOVIE_TEXT else (movie_data.get('overview'),)),
             parse_date(movie_data.get('release_date')),
             movie_data.get('runtime'),
             movie_data.get('budget', 0),
@@ -249,8 +328,22 @@ def insert_movie(connection, movie_data):
             movie_data.get('original_language')
         )
 
-        cursor.execute(insert_query, values)
-        connection.commit()
+        with METRICS.timed('db_write_ms'):
+            if PARTITION_BY_YEAR:
+                delete_moved_movie(cursor, movie_data.get('id'), release_year_of(movie_data))
+            cursor.execute(insert_query, values)
+            if SPLIT_MOVIE_TEXT:
+                cursor.execute("""
+                INSERT INTO movie_texts (movie_id, title, overview)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    title = VALUES(title),
+                    overview = VALUES(overview)
+                """, (movie_data.get('id'), movie_data.get('title', 'Unknown'), movie_data.get('overview')))
+            connection.commit()
+        METRICS.add_rows('movies', 1)
+        if SPLIT_MOVIE_TEXT:
+            METRICS.add_rows('movie_texts', 1)
         return True
 
     except Error as e:
@@ -282,10 +375,12 @@ def insert_movie_genres(connection, movie_id, genres):
         ON DUPLICATE KEY UPDATE movie_id = movie_id
         """
 
-        for genre in genres:
-            cursor.execute(insert_query, (movie_id, genre['id']))
+        with METRICS.timed('db_write_ms'):
+            for genre in genres:
+                cursor.execute(insert_query, (movie_id, genre['id']))
 
-        connection.commit()
+            connection.commit()
+        METRICS.add_rows('movie_genres', len(genres))
 
     except Error as e:
         print(f"Error inserting movie genres for movie {movie_id}: {e}")
@@ -323,8 +418,10 @@ def insert_person(connection, person_data):
             person_data.get('popularity', 0.0)
         )
 
-        cursor.execute(insert_query, values)
-        connection.commit()
+        with METRICS.timed('db_write_ms'):
+            cursor.execute(insert_query, values)
+            connection.commit()
+        METRICS.add_rows('people', 1)
         return True
 
     except Error as e:
@@ -335,7 +432,7 @@ def insert_person(connection, person_data):
         cursor.close()
 
 
-def insert_cast(connection, movie_id, cast_list):
+def insert_cast(connection, movie_id, cast_list, release_year=0):
     """
     Insert cast members for a movie.
 
@@ -343,6 +440,7 @@ def insert_cast(connection, movie_id, cast_list):
         connection: MySQL connection object
         movie_id (int): Movie ID
         cast_list (list): List of cast member dictionaries
+        release_year (int): Partition key of the movie (used with PARTITION_BY_YEAR)
     """
     if not cast_list:
         return
@@ -354,31 +452,197 @@ def insert_cast(connection, movie_id, cast_list):
         for cast_member in cast_list:
             insert_person(connection, cast_member)
 
-        # Then insert cast relationships
+        # Then insert cast relationships (idempotent with the clustered schema)
+        year_column = ", release_year" if PARTITION_BY_YEAR else ""
+        insert_query = f"""
+        INSERT INTO movie_cast (movie_id, person_id, character_name, cast_order{year_column})
+        VALUES (%s, %s, %s, %s{', %s' if year_column else ''})
+        ON DUPLICATE KEY UPDATE
+            person_id = VALUES(person_id),
+            character_name = VALUES(character_name)
+        """
+
+        with METRICS.timed('db_write_ms'):
+            for cast_member in cast_list:
+                values = (
+                    movie_id,
+                    cast_member.get('id'),
+                    cast_member.get('character'),
+                    cast_member.get('order', 999),
+                    *((release_year,) if year_column else ())
+                )
+                cursor.execute(insert_query, values)
+
+            connection.commit()
+        METRICS.add_rows('movie_cast', len(cast_list))
+
+        write_top_billing(connection, movie_id, cast_list)
+
+    except Error as e:
+        print(f"Error inserting cast for movie {movie_id}: {e}")
+        connection.rollback()
+    finally:
+        cursor.close()
+
+
+def write_top_billing(connection, movie_id, cast_list):
+    """
+    Store the top-billed cast names of a movie in movie_top_billing.
+    Called whenever a movie's cast is written so query_5 never has to
+    aggregate movie_cast at read time.
+
+    Args:
+        connection: MySQL connection object
+        movie_id (int): Movie ID
+        cast_list (list): List of cast member dictionaries
+    """
+    billed = sorted((c for c in cast_list if c.get('order', 999) < TOP_BILLING_SIZE),
+                    key=lambda c: c.get('order', 999))
+    top_cast = ', '.join(c.get('name', 'Unknown') for c in billed) or None
+
+    cursor = connection.cursor()
+
+    try:
         insert_query = """
-        INSERT INTO movie_cast (movie_id, person_id, character_name, cast_order)
-        VALUES (%s, %s, %s, %s)
+        INSERT INTO movie_top_billing (movie_id, top_cast)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE top_cast = VALUES(top_cast)
         """
 
-        for cast_member in cast_list:
-            values = (
-                movie_id,
-                cast_member.get('id'),
-                cast_member.get('character'),
-                cast_member.get('order', 999)
-            )
-            cursor.execute(insert_query, values)
+        with METRICS.timed('db_write_ms'):
+            cursor.execute(insert_query, (movie_id, top_cast))
+            connection.commit()
+        METRICS.add_rows('movie_top_billing', 1)
+
+    except Error as e:
+        print(f"Error writing top billing for movie {movie_id}: {e}")
+        connection.rollback()
+    finally:
+        cursor.close()
+
+
+TOP_BILLING_TABLE = """
+CREATE TABLE IF NOT EXISTS movie_top_billing (
+    movie_id INT PRIMARY KEY,
+    top_cast VARCHAR(1024){movie_fk}
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def top_billing_table(partition_by_year=PARTITION_BY_YEAR):
+    """CREATE TABLE statement of movie_top_billing (no foreign key when movies is partitioned)."""
+    movie_fk = "" if partition_by_year else \
+        ",\n    FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE"
+    return TOP_BILLING_TABLE.format(movie_fk=movie_fk)
+
+
+def rebuild_top_billing(connection):
+    """
+    Recompute movie_top_billing for every movie from movie_cast.
+    Used to backfill existing databases or after editing cast rows directly.
 
+    Args:
+        connection: MySQL connection object
+
+    Returns:
+        int: Number of rows written
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        INSERT INTO movie_top_billing (movie_id, top_cast)
+        SELECT
+            mc.movie_id,
+            GROUP_CONCAT(p.name ORDER BY mc.cast_order SEPARATOR ', ')
+        FROM movie_cast mc
+        INNER JOIN people p ON mc.person_id = p.person_id
+        WHERE mc.cast_order < %s
+        GROUP BY mc.movie_id
+        ON DUPLICATE KEY UPDATE top_cast = VALUES(top_cast)
+        """, (TOP_BILLING_SIZE,))
+        rows = cursor.rowcount
         connection.commit()
+        return rows
 
     except Error as e:
-        print(f"Error inserting cast for movie {movie_id}: {e}")
+        print(f"Error rebuilding top billing: {e}")
         connection.rollback()
+        raise
     finally:
         cursor.close()
 
 
-def insert_crew(connection, movie_id, crew_list):
+def write_movie_document(connection, movie_id):
+    """
+    Rebuild the movie_documents entry of a movie once its genres and credits
+    are stored, so detail reads stay a single primary-key lookup.
+
+    Args:
+        connection: MySQL connection object
+        movie_id (int): Movie ID
+    """
+    try:
+        with METRICS.timed('db_write_ms'):
+            refresh_documents(connection, [movie_id])
+        METRICS.add_rows('movie_documents', 1)
+
+    except Error as e:
+        print(f"Error writing document for movie {movie_id}: {e}")
+
+
+def write_leaderboards(connection, movie_id):
+    """
+    Update the genre, year and director leaderboards of a movie once its
+    rating, genres and crew are stored.
+
+    Args:
+        connection: MySQL connection object
+        movie_id (int): Movie ID
+    """
+    try:
+        with METRICS.timed('db_write_ms'):
+            refresh_leaderboards(connection, [movie_id])
+
+    except Error as e:
+        print(f"Error updating leaderboards for movie {movie_id}: {e}")
+
+
+def write_metrics_history(connection, snapshots, captured_at):
+    """
+    Append one page of rating/popularity snapshots to the metrics history.
+
+    Args:
+        connection: MySQL connection object
+        snapshots (list): Tuples (movie_id, vote_average, vote_count, popularity)
+        captured_at (datetime): Start of this sync, shared by all its snapshots
+    """
+    try:
+        with METRICS.timed('db_write_ms'):
+            rows = record_snapshots(connection, snapshots, captured_at)
+        METRICS.add_rows('movie_metrics_history', rows)
+
+    except Error as e:
+        print(f"Error writing metrics history: {e}")
+
+
+def write_genre_sketches(connection, movies):
+    """
+    Merge one page of movies into the genre sketches of approximate query_3.
+
+    Args:
+        connection: MySQL connection object
+        movies (list): Tuples (movie_id, genre_ids, release_year, vote_average, revenue)
+    """
+    try:
+        with METRICS.timed('db_write_ms'):
+            record_movies(connection, movies)
+
+    except Error as e:
+        print(f"Error updating genre sketches: {e}")
+
+
+def insert_crew(connection, movie_id, crew_list, release_year=0):
     """
     Insert crew members for a movie.
     Filters to keep only directors, producers, and writers to avoid too much data.
@@ -387,6 +651,7 @@ def insert_crew(connection, movie_id, crew_list):
         connection: MySQL connection object
         movie_id (int): Movie ID
         crew_list (list): List of crew member dictionaries
+        release_year (int): Partition key of the movie (used with PARTITION_BY_YEAR)
     """
     if not crew_list:
         return
@@ -405,22 +670,27 @@ def insert_crew(connection, movie_id, crew_list):
         for crew_member in filtered_crew:
             insert_person(connection, crew_member)
 
-        # Then insert crew relationships
-        insert_query = """
-        INSERT INTO movie_crew (movie_id, person_id, job, department)
-        VALUES (%s, %s, %s, %s)
+        # Then insert crew relationships (idempotent with the clustered schema)
+        year_column = ", release_year" if PARTITION_BY_YEAR else ""
+        insert_query = f"""
+        INSERT INTO movie_crew (movie_id, person_id, job, department{year_column})
+        VALUES (%s, %s, %s, %s{', %s' if year_column else ''})
+        ON DUPLICATE KEY UPDATE department = VALUES(department)
         """
 
-        for crew_member in filtered_crew:
-            values = (
-                movie_id,
-                crew_member.get('id'),
-                crew_member.get('job'),
-                crew_member.get('department')
-            )
-            cursor.execute(insert_query, values)
+        with METRICS.timed('db_write_ms'):
+            for crew_member in filtered_crew:
+                values = (
+                    movie_id,
+                    crew_member.get('id'),
+                    crew_member.get('job'),
+                    crew_member.get('department'),
+                    *((release_year,) if year_column else ())
+                )
+                cursor.execute(insert_query, values)
 
-        connection.commit()
+            connection.commit()
+        METRICS.add_rows('movie_crew', len(filtered_crew))
 
     except Error as e:
         print(f"Error inserting crew for movie {movie_id}: {e}")
@@ -429,17 +699,47 @@ def insert_crew(connection, movie_id, crew_list):
         cursor.close()
 
 
-def populate_database():
+def log_movie(message):
+    """Print a per-movie status line when INGEST_VERBOSE is enabled."""
+    if INGEST_VERBOSE:
+        print(message, flush=True)
+
+
+def populate_database(database=None):
     """
     Main function to populate the database with movie data.
+
+    Per-movie output is only printed with INGEST_VERBOSE=1; otherwise a progress
+    line with rate and ETA is printed every INGEST_PROGRESS_INTERVAL seconds.
+    The metrics of the run are available in the module-level METRICS object.
+
+    Args:
+        database (str): Schema to load (default: the live DB_CONFIG database);
+            blue_green.py passes its staging schema here
     """
+    global METRICS
+
     connection = None
+    METRICS = IngestionMetrics(
+        total_movies=NUM_PAGES_TO_FETCH * 20,
+        progress_interval=PROGRESS_INTERVAL,
+        output_path=INGEST_METRICS_FILE,
+    )
+
+    index = None
+    similar_index = None
 
     try:
         # Connect to database
-        connection = get_db_connection()
+        connection = get_db_connection(database)
         print("Connected to database successfully\n")
 
+        # Indices updated during the run start from the whole catalogue
+        if UPDATE_SEARCH_INDEX:
+            index = search_index.load_or_create(connection)
+        if UPDATE_SIMILARITY_INDEX:
+            similar_index = similarity_index.load_or_create(connection)
+
         # Step 1: Fetch and insert genres
         print("="*60)
         print("STEP 1: Fetching and inserting genres")
@@ -456,6 +756,7 @@ def populate_database():
 
         total_movies = 0
         successful_movies = 0
+        sync_started = datetime.now()
 
         for page in range(1, NUM_PAGES_TO_FETCH + 1):
             print(f"\nProcessing page {page}/{NUM_PAGES_TO_FETCH}...")
@@ -468,25 +769,46 @@ def populate_database():
                 continue
 
             print(f"  Found {len(movies)} movies on this page")
+            snapshots = []
+            sketched = []
 
             # For each movie, fetch detailed info and insert
             for i, movie_basic in enumerate(movies, 1):
                 movie_id = movie_basic.get('id')
                 total_movies += 1
-
-                print(f"    [{i}/{len(movies)}] Fetching details for movie ID {movie_id}...", end=' ')
+                METRICS.increment('movies_processed')
+                METRICS.maybe_report_progress()
 
                 # Fetch detailed info with credits
                 movie_details = fetch_movie_details(movie_id)
 
                 if not movie_details:
-                    print("FAILED")
+                    log_movie(f"    [{i}/{len(movies)}] Movie ID {movie_id}: FAILED")
+                    METRICS.increment('movies_failed')
                     continue
 
                 # Insert movie
                 if insert_movie(connection, movie_details):
-                    print(f"✓ '{movie_details.get('title', 'Unknown')}'")
+                    log_movie(f"    [{i}/{len(movies)}] Movie ID {movie_id}: ✓ '{movie_details.get('title', 'Unknown')}'")
                     successful_movies += 1
+                    METRICS.increment('movies_inserted')
+                    snapshots.append((movie_id, movie_details.get('vote_average'),
+                                      movie_details.get('vote_count'), movie_details.get('popularity')))
+                    release_date = parse_date(movie_details.get('release_date'))
+                    sketched.append((movie_id, [genre['id'] for genre in movie_details.get('genres', [])],
+                                     release_date.year if release_date else None,
+                                     movie_details.get('vote_average'), movie_details.get('revenue', 0)))
+
+                    if index is not None:
+                        release_date = parse_date(movie_details.get('release_date'))
+                        index.add_document(
+                            movie_id,
+                            movie_details.get('title', 'Unknown'),
+                            movie_details.get('overview'),
+                            movie_details.get('vote_average'),
+                            release_date.year if release_date else None,
+                            movie_details.get('popularity', 0.0),
+                        )
 
                     # Insert genres
                     if 'genres' in movie_details:
@@ -498,13 +820,25 @@ def populate_database():
 
                         if 'cast' in credits:
                             # Limit to top 8 cast members per movie (reduced for smaller DB size)
-                            insert_cast(connection, movie_id, credits['cast'][:8])
+                            insert_cast(connection, movie_id, credits['cast'][:8],
+                                        release_year_of(movie_details))
 
                         if 'crew' in credits:
-                            insert_crew(connection, movie_id, credits['crew'])
+                            insert_crew(connection, movie_id, credits['crew'],
+                                        release_year_of(movie_details))
+
+                    # Detail document, assembled once genres and credits are in place
+                    write_movie_document(connection, movie_id)
+                    write_leaderboards(connection, movie_id)
+
+                    if similar_index is not None:
+                        similar_index.add_movies(connection, [movie_id])
                 else:
-                    print("FAILED")
+                    log_movie(f"    [{i}/{len(movies)}] Movie ID {movie_id}: FAILED")
+                    METRICS.increment('movies_failed')
 
+            write_metrics_history(connection, snapshots, sync_started)
+            write_genre_sketches(connection, sketched)
             print(f"\nPage {page} completed: {successful_movies}/{total_movies} movies inserted successfully")
 
         # Final summary
@@ -514,10 +848,26 @@ def populate_database():
         print(f"Total movies processed: {total_movies}")
         print(f"Successfully inserted: {successful_movies}")
         print(f"Failed: {total_movies - successful_movies}")
+        METRICS.maybe_report_progress(force=True)
+
+        api_latency = METRICS.histograms['api_latency_ms']
+        db_latency = METRICS.histograms['db_write_ms']
+        print(f"API calls: {METRICS.counters['api_calls']:,} "
+              f"(retries: {METRICS.counters['api_retries']}, "
+              f"rate-limited: {METRICS.counters['api_rate_limited']}, "
+              f"failed: {METRICS.counters['api_failures']})")
+        print(f"API latency: p50 {api_latency.percentile(50):.0f} ms, "
+              f"p95 {api_latency.percentile(95):.0f} ms, max {api_latency.max:.0f} ms")
+        print(f"DB write latency: p50 {db_latency.percentile(50):.0f} ms, "
+              f"p95 {db_latency.percentile(95):.0f} ms, max {db_latency.max:.0f} ms")
+        print(f"Downloaded: {METRICS.counters['bytes_downloaded'] / 1e6:.1f} MB")
 
         # Show table counts
         cursor = connection.cursor()
-        tables = ['movies', 'genres', 'movie_genres', 'people', 'movie_cast', 'movie_crew']
+        tables = ['movies', 'genres', 'movie_genres', 'people', 'movie_cast', 'movie_crew',
+                  'movie_top_billing', 'movie_documents', 'movie_leaderboards', 'movie_metrics_history']
+        if SPLIT_MOVIE_TEXT:
+            tables.append('movie_texts')
 
         print("\nFinal table record counts:")
         for table in tables:
@@ -526,6 +876,20 @@ def populate_database():
             print(f"  - {table}: {count:,} records")
 
         cursor.close()
+
+        if index is not None:
+            index.save()
+            print(f"\nSearch index updated: {len(index):,} movies in {search_index.SEARCH_INDEX_PATH}")
+
+        if similar_index is not None:
+            similar_index.save()
+            print(f"Similarity index updated: {len(similar_index):,} movies "
+                  f"in {similarity_index.SIMILARITY_INDEX_PATH}")
+
+        if INGEST_METRICS_FILE:
+            METRICS.write(INGEST_METRICS_FILE)
+            print(f"\nMetrics written to {INGEST_METRICS_FILE}")
+
         print("\n" + "="*60)
         print("Database population completed successfully!")
         print("="*60)
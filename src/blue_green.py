@@ -0,0 +1,260 @@
+"""
+Blue/Green Dataset Loading for MovieFinder Application
+Builds a complete new generation of tables in a staging schema while the live
+schema keeps serving queries, then swaps the generations with one atomic
+RENAME TABLE. The replaced generation is kept in a backup schema so the swap
+can be rolled back instantly.
+
+The metrics history and its rollups (metrics_history.py) span generations and
+stay in the live schema: a swap merges the staging load's observations into
+them instead of replacing them, and neither a swap nor a rollback moves them.
+
+Schemas (derived from DB_NAME):
+    <db>           live tables read by the application
+    <db>_staging   generation being built (and the old live tables after a rollback)
+    <db>_previous  generation replaced by the last swap
+
+Usage:
+    python src/blue_green.py load      # build staging, bulk-load, index, analyze, swap
+    python src/blue_green.py build     # same, without the final swap
+    python src/blue_green.py swap      # swap a built staging generation in
+    python src/blue_green.py rollback  # bring the previous generation back
+    python src/blue_green.py status    # row counts per schema
+"""
+
+import sys
+import time
+
+from mysql.connector import Error
+
+from api_data_retrieve import DB_CONFIG, get_db_connection, populate_database
+from create_db_script import create_tables, create_indices
+from metrics_history import history_tables, merge_history
+
+LIVE_SCHEMA = DB_CONFIG['database']
+STAGING_SCHEMA = f"{LIVE_SCHEMA}_staging"
+PREVIOUS_SCHEMA = f"{LIVE_SCHEMA}_previous"
+
+
+def list_tables(connection, schema):
+    """
+    List the base tables of a schema.
+
+    Args:
+        connection: MySQL connection object
+        schema (str): Schema name
+
+    Returns:
+        list: Table names
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT TABLE_NAME
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'
+        ORDER BY TABLE_NAME
+        """, (schema,))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def prepare_staging(connection):
+    """
+    Recreate the staging schema with empty tables and primary keys only.
+    Secondary and FULLTEXT indices are built after the bulk load, which is
+    considerably faster than maintaining them row by row.
+
+    Args:
+        connection: MySQL connection object
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS {STAGING_SCHEMA}")
+        cursor.execute(f"CREATE DATABASE {STAGING_SCHEMA}")
+        cursor.execute(f"USE {STAGING_SCHEMA}")
+        print(f"✓ Created staging schema '{STAGING_SCHEMA}'")
+    finally:
+        cursor.close()
+
+    create_tables(connection)
+
+
+def finish_staging(connection):
+    """
+    Index and analyze a loaded staging schema so the swapped-in tables have
+    fresh statistics and warm plans from the first query on.
+
+    Args:
+        connection: MySQL connection object using the staging schema
+    """
+    start = time.perf_counter()
+    create_indices(connection)
+    print(f"✓ Indexed staging tables in {time.perf_counter() - start:.2f}s")
+
+    cursor = connection.cursor()
+
+    try:
+        tables = list_tables(connection, STAGING_SCHEMA)
+        cursor.execute(f"ANALYZE TABLE {', '.join(tables)}")
+        cursor.fetchall()
+        print(f"✓ Analyzed {len(tables)} staging tables")
+    finally:
+        cursor.close()
+
+
+def build_generation():
+    """
+    Build a complete new generation in the staging schema.
+
+    Returns:
+        bool: True if the staging schema is ready to be swapped in
+    """
+    connection = get_db_connection()
+
+    try:
+        prepare_staging(connection)
+    finally:
+        connection.close()
+
+    start = time.perf_counter()
+    if populate_database(STAGING_SCHEMA) != 0:
+        print(f"✗ Loading '{STAGING_SCHEMA}' failed, live tables left untouched")
+        return False
+    print(f"✓ Loaded staging schema in {(time.perf_counter() - start) / 60:.1f} minutes")
+
+    connection = get_db_connection(STAGING_SCHEMA)
+
+    try:
+        finish_staging(connection)
+    finally:
+        connection.close()
+
+    return True
+
+
+def rename_generations(connection, incoming_schema, outgoing_schema):
+    """
+    Move the live tables to outgoing_schema and the tables of incoming_schema
+    into the live schema, all in a single RENAME TABLE statement. MySQL applies
+    the whole statement atomically, so queries see either the old or the new
+    generation and never a mix or a missing table.
+
+    Args:
+        connection: MySQL connection object
+        incoming_schema (str): Schema holding the generation to publish
+        outgoing_schema (str): Schema receiving the current live tables
+
+    Returns:
+        int: Number of tables swapped
+    """
+    live = set(list_tables(connection, LIVE_SCHEMA))
+    # Long-term tables stay live once they exist (see merge_history())
+    kept = live.intersection(history_tables())
+    incoming = [t for t in list_tables(connection, incoming_schema) if t not in kept]
+    if not incoming:
+        raise Error(msg=f"Schema '{incoming_schema}' has no tables to swap in")
+    cursor = connection.cursor()
+
+    try:
+        # Make room in the outgoing schema for the tables being replaced
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {outgoing_schema}")
+        stale = list_tables(connection, outgoing_schema)
+        if stale:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cursor.execute(f"DROP TABLE {', '.join(f'{outgoing_schema}.{t}' for t in stale)}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+        renames = [f"{LIVE_SCHEMA}.{t} TO {outgoing_schema}.{t}" for t in incoming if t in live]
+        renames += [f"{incoming_schema}.{t} TO {LIVE_SCHEMA}.{t}" for t in incoming]
+
+        start = time.perf_counter()
+        cursor.execute("RENAME TABLE " + ",\n    ".join(renames))
+        print(f"✓ Swapped {len(incoming)} tables from '{incoming_schema}' into "
+              f"'{LIVE_SCHEMA}' in {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"(replaced tables kept in '{outgoing_schema}')")
+        return len(incoming)
+
+    except Error as e:
+        print(f"Error swapping generations: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def swap(connection):
+    """Publish the staging generation, keeping the live one in the previous schema."""
+    live = set(list_tables(connection, LIVE_SCHEMA))
+    staging = set(list_tables(connection, STAGING_SCHEMA))
+    if set(history_tables()) <= live & staging:
+        rows = merge_history(connection, STAGING_SCHEMA, LIVE_SCHEMA)
+        print(f"✓ Merged the staging sync into the live metrics history ({rows:,} rows)")
+    return rename_generations(connection, STAGING_SCHEMA, PREVIOUS_SCHEMA)
+
+
+def rollback(connection):
+    """Bring the previous generation back, moving the current one to staging."""
+    return rename_generations(connection, PREVIOUS_SCHEMA, STAGING_SCHEMA)
+
+
+def show_status(connection):
+    """
+    Print the row count of each table in every generation.
+
+    Args:
+        connection: MySQL connection object
+    """
+    cursor = connection.cursor()
+
+    try:
+        for schema in (LIVE_SCHEMA, STAGING_SCHEMA, PREVIOUS_SCHEMA):
+            tables = list_tables(connection, schema)
+            print(f"\n{schema}: {'(empty)' if not tables else ''}")
+            for table in tables:
+                cursor.execute(f"SELECT COUNT(*) FROM {schema}.{table}")
+                print(f"  - {table}: {cursor.fetchone()[0]:,} records")
+    finally:
+        cursor.close()
+
+
+def main():
+    """
+    Build, swap, roll back, or inspect dataset generations.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    if command not in ('load', 'build', 'swap', 'rollback', 'status'):
+        print("Usage: python src/blue_green.py <load|build|swap|rollback|status>")
+        return 1
+
+    connection = None
+
+    try:
+        if command in ('load', 'build') and not build_generation():
+            return 1
+        if command == 'build':
+            return 0
+
+        connection = get_db_connection()
+        if command in ('load', 'swap'):
+            swap(connection)
+        elif command == 'rollback':
+            rollback(connection)
+        else:
+            show_status(connection)
+
+    except Error as e:
+        print(f"\nFATAL ERROR: {e}")
+        return 1
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,556 @@
+"""
+Columnar Analytics for MovieFinder Application
+Exports movies, genres, movie_genres, movie_cast and people into NumPy column
+arrays (optionally saved as a memory-mapped directory of .npy files) and
+computes grouped aggregates, percentiles and top-N lists in-process.
+
+Usage:
+    python src/columnar_analytics.py export [directory]   # snapshot MySQL to disk
+    python src/columnar_analytics.py report [directory]   # run analytics on a snapshot
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from mysql.connector import Error
+
+
+# Default snapshot location
+SNAPSHOT_DIR = os.getenv('ANALYTICS_SNAPSHOT_DIR', 'analytics_snapshot')
+
+# Rows fetched per round trip while exporting
+EXPORT_BATCH_SIZE = 10000
+
+# Snapshot layout version
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Numeric movie columns: name -> (SQL expression, dtype, value used for NULL)
+MOVIE_COLUMNS = {
+    'movie_id': ('movie_id', np.int64, 0),
+    'release_year': ('YEAR(release_date)', np.int16, 0),
+    'runtime': ('runtime', np.float32, np.nan),
+    'budget': ('budget', np.float64, np.nan),
+    'revenue': ('revenue', np.float64, np.nan),
+    'vote_average': ('vote_average', np.float64, np.nan),
+    'vote_count': ('vote_count', np.int32, 0),
+    'popularity': ('popularity', np.float64, np.nan),
+}
+
+
+def encode_strings(values):
+    """
+    Pack strings into a UTF-8 byte blob plus offsets.
+
+    Args:
+        values (list): Strings (None is stored as an empty string)
+
+    Returns:
+        tuple: (blob uint8 array, offsets int64 array of length len(values) + 1)
+    """
+    encoded = [(value or '').encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+class StringColumn:
+    """
+    Read-only string column backed by a byte blob and offsets.
+
+    Args:
+        blob (np.ndarray): uint8 array of concatenated UTF-8 strings
+        offsets (np.ndarray): int64 start offsets, with a final end offset
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+
+class CatalogueSnapshot:
+    """
+    Column arrays for the catalogue. Foreign keys into movies are stored as
+    row positions (movie_idx) so joins are plain array indexing.
+
+    Attributes:
+        movies (dict): Column name -> array (see MOVIE_COLUMNS)
+        titles (StringColumn): Movie titles aligned with movies
+        genre_ids (np.ndarray), genre_names (list): Genre lookup
+        movie_genres (dict): 'movie_idx', 'genre_id'
+        movie_cast (dict): 'movie_idx', 'person_id', 'cast_order'
+        people (dict): 'person_id' plus names (StringColumn) in people_names
+    """
+
+    def __init__(self, movies, titles, genre_ids, genre_names, movie_genres, movie_cast,
+                 people, people_names):
+        self.movies = movies
+        self.titles = titles
+        self.genre_ids = genre_ids
+        self.genre_names = genre_names
+        self.movie_genres = movie_genres
+        self.movie_cast = movie_cast
+        self.people = people
+        self.people_names = people_names
+
+    def __len__(self):
+        return len(self.movies['movie_id'])
+
+    def save(self, directory=SNAPSHOT_DIR):
+        """
+        Save the snapshot as one .npy file per column plus meta.json.
+
+        Args:
+            directory (str): Output directory (created if missing)
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        arrays = {f'movies.{name}': column for name, column in self.movies.items()}
+        arrays.update({f'movie_genres.{name}': column for name, column in self.movie_genres.items()})
+        arrays.update({f'movie_cast.{name}': column for name, column in self.movie_cast.items()})
+        arrays.update({f'people.{name}': column for name, column in self.people.items()})
+        arrays['movies.title_blob'] = self.titles.blob
+        arrays['movies.title_offsets'] = self.titles.offsets
+        arrays['people.name_blob'] = self.people_names.blob
+        arrays['people.name_offsets'] = self.people_names.offsets
+        arrays['genres.genre_id'] = self.genre_ids
+
+        for name, column in arrays.items():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(column))
+
+        meta = {
+            'version': SNAPSHOT_FORMAT_VERSION,
+            'created_at': time.time(),
+            'genre_names': list(self.genre_names),
+            'arrays': sorted(arrays),
+        }
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, directory=SNAPSHOT_DIR, mmap=True):
+        """
+        Load a snapshot written by save().
+
+        Args:
+            directory (str): Snapshot directory
+            mmap (bool): Memory-map the column files instead of reading them
+
+        Returns:
+            CatalogueSnapshot: Loaded snapshot
+        """
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get('version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {meta.get('version')}")
+
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'),
+                                mmap_mode='r' if mmap else None)
+                  for name in meta['arrays']}
+
+        def table(prefix, exclude=()):
+            return {name.split('.', 1)[1]: column for name, column in arrays.items()
+                    if name.startswith(prefix + '.') and name.split('.', 1)[1] not in exclude}
+
+        return cls(
+            movies=table('movies', exclude=('title_blob', 'title_offsets')),
+            titles=StringColumn(arrays['movies.title_blob'], arrays['movies.title_offsets']),
+            genre_ids=arrays['genres.genre_id'],
+            genre_names=meta['genre_names'],
+            movie_genres=table('movie_genres'),
+            movie_cast=table('movie_cast'),
+            people=table('people', exclude=('name_blob', 'name_offsets')),
+            people_names=StringColumn(arrays['people.name_blob'], arrays['people.name_offsets']),
+        )
+
+
+def _fetch_all(connection, query, batch_size=EXPORT_BATCH_SIZE):
+    """Run a query and return every row, fetching in batches."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(query)
+        rows = []
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            rows.extend(batch)
+        return rows
+    finally:
+        cursor.close()
+
+
+def _column(rows, position, dtype, null_value):
+    """Build a typed array from one position of each row, replacing NULLs."""
+    return np.array([null_value if row[position] is None else row[position] for row in rows],
+                    dtype=dtype)
+
+
+def _to_movie_idx(movie_ids, referenced_ids):
+    """
+    Map movie IDs to row positions in the movies arrays.
+
+    Args:
+        movie_ids (np.ndarray): Sorted movie IDs of the snapshot
+        referenced_ids (np.ndarray): Movie IDs to translate
+
+    Returns:
+        tuple: (positions int32 array, boolean mask of IDs that were found)
+    """
+    positions = np.searchsorted(movie_ids, referenced_ids)
+    positions = np.clip(positions, 0, max(len(movie_ids) - 1, 0))
+    found = movie_ids[positions] == referenced_ids if len(movie_ids) else np.zeros(len(referenced_ids), bool)
+    return positions.astype(np.int32), found
+
+
+def export_snapshot(connection):
+    """
+    Pull the catalogue from MySQL into column arrays.
+
+    Args:
+        connection: MySQL connection object
+
+    Returns:
+        CatalogueSnapshot: In-memory snapshot
+    """
+    try:
+        expressions = ', '.join(sql for sql, _, _ in MOVIE_COLUMNS.values())
+        rows = _fetch_all(connection, f"SELECT {expressions}, title FROM movies ORDER BY movie_id")
+        movies = {name: _column(rows, i, dtype, null_value)
+                  for i, (name, (_, dtype, null_value)) in enumerate(MOVIE_COLUMNS.items())}
+        titles = StringColumn(*encode_strings([row[-1] for row in rows]))
+
+        genre_rows = _fetch_all(connection, "SELECT genre_id, genre_name FROM genres ORDER BY genre_id")
+        genre_ids = np.array([row[0] for row in genre_rows], dtype=np.int32)
+        genre_names = [row[1] for row in genre_rows]
+
+        mg_rows = _fetch_all(connection, "SELECT movie_id, genre_id FROM movie_genres")
+        mg_movie_ids = np.array([row[0] for row in mg_rows], dtype=np.int64)
+        mg_idx, found = _to_movie_idx(movies['movie_id'], mg_movie_ids)
+        movie_genres = {
+            'movie_idx': mg_idx[found],
+            'genre_id': np.array([row[1] for row in mg_rows], dtype=np.int32)[found],
+        }
+
+        cast_rows = _fetch_all(connection, "SELECT movie_id, person_id, cast_order FROM movie_cast")
+        cast_movie_ids = np.array([row[0] for row in cast_rows], dtype=np.int64)
+        cast_idx, found = _to_movie_idx(movies['movie_id'], cast_movie_ids)
+        movie_cast = {
+            'movie_idx': cast_idx[found],
+            'person_id': _column(cast_rows, 1, np.int64, 0)[found],
+            'cast_order': _column(cast_rows, 2, np.int16, 999)[found],
+        }
+
+        people_rows = _fetch_all(connection, "SELECT person_id, name FROM people ORDER BY person_id")
+        people = {'person_id': np.array([row[0] for row in people_rows], dtype=np.int64)}
+        people_names = StringColumn(*encode_strings([row[1] for row in people_rows]))
+
+        return CatalogueSnapshot(movies, titles, genre_ids, genre_names, movie_genres,
+                                 movie_cast, people, people_names)
+
+    except Error as e:
+        print(f"Error exporting snapshot: {e}")
+        raise
+
+
+def group_aggregate(keys, values):
+    """
+    Grouped count, sum, mean, min and max of values, ignoring NaN values.
+
+    Args:
+        keys (np.ndarray): Group key per element
+        values (np.ndarray): Value per element
+
+    Returns:
+        dict: 'key', 'count', 'sum', 'mean', 'min', 'max' arrays, one entry per group
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    n = len(unique_keys)
+
+    counts = np.bincount(inverse, weights=valid, minlength=n)
+    sums = np.bincount(inverse, weights=np.where(valid, values, 0.0), minlength=n)
+
+    minimums = np.full(n, np.inf)
+    maximums = np.full(n, -np.inf)
+    np.minimum.at(minimums, inverse[valid], values[valid])
+    np.maximum.at(maximums, inverse[valid], values[valid])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+
+    empty = counts == 0
+    minimums[empty] = np.nan
+    maximums[empty] = np.nan
+
+    return {'key': unique_keys, 'count': counts.astype(np.int64), 'sum': sums, 'mean': means,
+            'min': minimums, 'max': maximums}
+
+
+def group_percentiles(keys, values, percentiles=(25, 50, 75)):
+    """
+    Grouped percentiles with linear interpolation, ignoring NaN values.
+
+    Args:
+        keys (np.ndarray): Group key per element
+        values (np.ndarray): Value per element
+        percentiles (tuple): Percentiles between 0 and 100
+
+    Returns:
+        tuple: (unique keys array, array of shape (groups, len(percentiles)))
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    keys, values = np.asarray(keys)[valid], values[valid]
+
+    order = np.lexsort((values, keys))
+    sorted_keys, sorted_values = keys[order], values[order]
+    unique_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+
+    result = np.empty((len(unique_keys), len(percentiles)))
+    for j, p in enumerate(percentiles):
+        position = starts + (counts - 1) * (p / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + counts - 1)
+        fraction = position - lower
+        result[:, j] = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+    return unique_keys, result
+
+
+def top_n(values, n=10, mask=None):
+    """
+    Row positions of the n largest values, best first (NaN values excluded).
+
+    Args:
+        values (np.ndarray): Values to rank
+        n (int): Number of positions to return
+        mask (np.ndarray): Optional boolean filter of eligible rows
+
+    Returns:
+        np.ndarray: Row positions
+    """
+    values = np.asarray(values, dtype=np.float64)
+    eligible = ~np.isnan(values)
+    if mask is not None:
+        eligible &= mask
+    candidates = np.flatnonzero(eligible)
+    if len(candidates) <= n:
+        return candidates[np.argsort(-values[candidates], kind='stable')]
+
+    part = candidates[np.argpartition(-values[candidates], n - 1)[:n]]
+    return part[np.argsort(-values[part], kind='stable')]
+
+
+def genre_stats(snapshot, min_movies=20):
+    """
+    Columnar equivalent of query_3.
+
+    Args:
+        snapshot (CatalogueSnapshot): Catalogue snapshot
+        min_movies (int): Minimum number of rated movies per genre
+
+    Returns:
+        list: List of tuples (genre_name, avg_rating, movie_count, total_revenue, avg_revenue)
+    """
+    movie_idx = snapshot.movie_genres['movie_idx']
+    genre_id = snapshot.movie_genres['genre_id']
+    rating = snapshot.movies['vote_average'][movie_idx]
+    rated = ~np.isnan(rating)
+
+    ratings = group_aggregate(genre_id[rated], rating[rated])
+    revenue = group_aggregate(genre_id[rated], snapshot.movies['revenue'][movie_idx][rated])
+
+    names = dict(zip(snapshot.genre_ids.tolist(), snapshot.genre_names))
+    rows = []
+    for i, key in enumerate(ratings['key'].tolist()):
+        count = int(ratings['count'][i])
+        if count < min_movies:
+            continue
+        avg_revenue = revenue['mean'][i]
+        rows.append((
+            names.get(key, str(key)),
+            round(float(ratings['mean'][i]), 2),
+            count,
+            int(revenue['sum'][i]),
+            None if np.isnan(avg_revenue) else round(float(avg_revenue)),
+        ))
+
+    rows.sort(key=lambda row: (-row[1], -row[2]))
+    return rows
+
+
+def yearly_distribution(snapshot, column='revenue', percentiles=(25, 50, 75, 95), min_year=None,
+                        max_year=None):
+    """
+    Per-release-year count, mean and percentiles of a movie column.
+
+    Args:
+        snapshot (CatalogueSnapshot): Catalogue snapshot
+        column (str): Numeric movie column (e.g. 'revenue', 'vote_average')
+        percentiles (tuple): Percentiles to compute
+        min_year (int): Earliest year (inclusive)
+        max_year (int): Latest year (inclusive)
+
+    Returns:
+        list: List of tuples (year, count, mean, p1, p2, ...)
+    """
+    years = np.asarray(snapshot.movies['release_year'])
+    values = np.asarray(snapshot.movies[column], dtype=np.float64)
+
+    mask = years > 0
+    if min_year is not None:
+        mask &= years >= min_year
+    if max_year is not None:
+        mask &= years <= max_year
+
+    stats = group_aggregate(years[mask], values[mask])
+    keys, pct = group_percentiles(years[mask], values[mask], percentiles)
+    pct_by_year = dict(zip(keys.tolist(), pct.tolist()))
+
+    rows = []
+    for i, year in enumerate(stats['key'].tolist()):
+        if stats['count'][i] == 0:
+            continue
+        rows.append((year, int(stats['count'][i]), float(stats['mean'][i]), *pct_by_year[year]))
+    return rows
+
+
+def top_movies(snapshot, column='vote_average', n=10, min_votes=0, genre=None, year=None):
+    """
+    Top-N movies by a numeric column, optionally within a genre or year.
+
+    Args:
+        snapshot (CatalogueSnapshot): Catalogue snapshot
+        column (str): Ranking column (e.g. 'vote_average', 'revenue', 'popularity')
+        n (int): Number of movies
+        min_votes (int): Minimum vote_count
+        genre (str): Genre name filter
+        year (int): Release year filter
+
+    Returns:
+        list: List of tuples (movie_id, title, value)
+    """
+    mask = np.asarray(snapshot.movies['vote_count']) >= min_votes
+    if year is not None:
+        mask &= np.asarray(snapshot.movies['release_year']) == year
+    if genre is not None:
+        if genre not in snapshot.genre_names:
+            return []
+        genre_id = snapshot.genre_ids[snapshot.genre_names.index(genre)]
+        in_genre = np.zeros(len(snapshot), dtype=bool)
+        in_genre[snapshot.movie_genres['movie_idx'][snapshot.movie_genres['genre_id'] == genre_id]] = True
+        mask &= in_genre
+
+    values = snapshot.movies[column]
+    return [(int(snapshot.movies['movie_id'][i]), snapshot.titles[i], float(values[i]))
+            for i in top_n(values, n, mask)]
+
+
+def top_actors(snapshot, n=10, max_cast_order=None):
+    """
+    Actors with the most cast appearances.
+
+    Args:
+        snapshot (CatalogueSnapshot): Catalogue snapshot
+        n (int): Number of actors
+        max_cast_order (int): Only count billings with cast_order below this value
+
+    Returns:
+        list: List of tuples (person_id, name, appearances)
+    """
+    person_ids = snapshot.movie_cast['person_id']
+    if max_cast_order is not None:
+        person_ids = person_ids[snapshot.movie_cast['cast_order'] < max_cast_order]
+
+    unique_ids, counts = np.unique(person_ids, return_counts=True)
+    best = top_n(counts, n)
+
+    known_ids = snapshot.people['person_id']
+    rows = []
+    for i in best:
+        person_id = unique_ids[i]
+        position = np.searchsorted(known_ids, person_id)
+        found = position < len(known_ids) and known_ids[position] == person_id
+        name = snapshot.people_names[position] if found else str(person_id)
+        rows.append((int(person_id), name, int(counts[i])))
+    return rows
+
+
+def main():
+    """
+    Export a snapshot from MySQL, or print an analytics report from one.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'report'
+    directory = sys.argv[2] if len(sys.argv) > 2 else SNAPSHOT_DIR
+
+    if command == 'export':
+        import mysql.connector
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        db_config = {
+            'host': os.getenv('DB_HOST', '127.0.0.1'),
+            'port': int(os.getenv('DB_PORT', 3305)),
+            'user': os.getenv('DB_USER', 'yarony'),
+            'password': os.getenv('DB_PASSWORD'),
+            'database': os.getenv('DB_NAME', 'yarony')
+        }
+
+        connection = None
+        try:
+            connection = mysql.connector.connect(**db_config)
+            start = time.perf_counter()
+            snapshot = export_snapshot(connection)
+            snapshot.save(directory)
+            print(f"✓ Exported {len(snapshot):,} movies to '{directory}' in {time.perf_counter() - start:.2f}s")
+        except Error as e:
+            print(f"\nDatabase Error: {e}")
+            return 1
+        finally:
+            if connection and connection.is_connected():
+                connection.close()
+        return 0
+
+    if command != 'report':
+        print(f"Unknown command '{command}'. Use 'export' or 'report'.")
+        return 1
+
+    snapshot = CatalogueSnapshot.load(directory)
+    print(f"Loaded snapshot with {len(snapshot):,} movies from '{directory}'\n")
+
+    start = time.perf_counter()
+    stats = genre_stats(snapshot, min_movies=20)
+    print(f"Genre statistics ({(time.perf_counter() - start) * 1000:.2f} ms):")
+    for genre, avg_rating, count, total_revenue, avg_revenue in stats:
+        print(f"  {genre:<20}{avg_rating:<8}{count:<8}${total_revenue:,}")
+
+    start = time.perf_counter()
+    distribution = yearly_distribution(snapshot, 'revenue', min_year=2000)
+    print(f"\nRevenue by year since 2000 ({(time.perf_counter() - start) * 1000:.2f} ms):")
+    for year, count, mean, p25, p50, p75, p95 in distribution:
+        print(f"  {year}: {count:>5} movies | median ${p50:,.0f} | p95 ${p95:,.0f}")
+
+    start = time.perf_counter()
+    best = top_movies(snapshot, 'vote_average', n=10, min_votes=1000)
+    print(f"\nTop rated movies with 1000+ votes ({(time.perf_counter() - start) * 1000:.2f} ms):")
+    for movie_id, title, rating in best:
+        print(f"  {rating:.1f}  {title}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -8,6 +8,13 @@ from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 
+from api_data_retrieve import top_billing_table
+from genre_sketches import SKETCH_TABLE
+from leaderboards import LEADERBOARD_INDICES, LEADERBOARD_TABLE
+from metrics_history import create_history_tables
+from movie_documents import documents_table
+from partitioning import PARTITION_BY_YEAR, SPLIT_MOVIE_TEXT, movie_texts_table, partition_clause
+
 # Load environment variables
 load_dotenv()
 
@@ -21,6 +28,10 @@ DB_CONFIG = {
 
 DATABASE_NAME = 'yarony'
 
+# Cluster movie_cast/movie_crew by their natural keys instead of a surrogate id
+# (off by default; PARTITION_BY_YEAR turns it on)
+CLUSTERED_CREDITS = os.getenv('CLUSTERED_CREDITS', '0') == '1'
+
 
 def get_connection(include_db=False):
     """
@@ -74,22 +85,48 @@ def create_database(connection):
         raise
 
 
-def create_tables(connection):
+def create_tables(connection, clustered_credits=CLUSTERED_CREDITS, split_text=SPLIT_MOVIE_TEXT,
+                  partition_by_year=PARTITION_BY_YEAR):
     """
     Create all tables for the movie database.
 
+    With clustered_credits, movie_cast is keyed by (movie_id, cast_order) and
+    movie_crew by (movie_id, person_id, job). A movie's credits are then stored
+    contiguously, and re-running ingestion updates rows instead of duplicating them.
+
     Args:
         connection: MySQL connection object
+        clustered_credits (bool): Use natural primary keys for the credit tables
+        split_text (bool): Store overview in movie_texts instead of movies
+        partition_by_year (bool): RANGE-partition movies and credits by release_year.
+            Implies split_text and clustered_credits; MySQL forbids foreign keys on
+            partitioned tables, so the ones touching them are left out.
     """
     cursor = connection.cursor()
 
+    if partition_by_year:
+        split_text = True
+        clustered_credits = True
+
+    # Foreign keys are only declared when the referenced/referencing tables are not partitioned
+    movie_fk = "" if partition_by_year else \
+        ",\n            FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE"
+    credit_fks = "" if partition_by_year else (
+        ",\n                FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE"
+        ",\n                FOREIGN KEY (person_id) REFERENCES people(person_id) ON DELETE CASCADE")
+    year_column = "release_year SMALLINT NOT NULL DEFAULT 0," if partition_by_year else ""
+    year_key = ", release_year" if partition_by_year else ""
+    partitions = partition_clause() if partition_by_year else ""
+
     try:
-        # Table 1: movies
-        movies_table = """
+        # Table 1: movies (narrow when the overview lives in movie_texts)
+        overview_column = "" if split_text else "overview TEXT,"
+        movies_table = f"""
         CREATE TABLE IF NOT EXISTS movies (
-            movie_id INT PRIMARY KEY,
+            movie_id INT NOT NULL,
+            {year_column}
             title VARCHAR(255) NOT NULL,
-            overview TEXT,
+            {overview_column}
             release_date DATE,
             runtime INT,
             budget BIGINT,
@@ -97,12 +134,20 @@ def create_tables(connection):
             vote_average DECIMAL(3,1),
             vote_count INT,
             popularity DECIMAL(10,3),
-            original_language VARCHAR(10)
+            original_language VARCHAR(10),
+            PRIMARY KEY (movie_id{year_key})
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        {partitions}
         """
         cursor.execute(movies_table)
         print("✓ Table 'movies' created successfully")
 
+        # Table 1b: movie_texts (large text fields, joined by movie_id).
+        # title is repeated here so the combined FULLTEXT index can span both fields.
+        if split_text:
+            cursor.execute(movie_texts_table(partition_by_year))
+            print("✓ Table 'movie_texts' created successfully")
+
         # Table 2: genres
         genres_table = """
         CREATE TABLE IF NOT EXISTS genres (
@@ -114,13 +159,12 @@ def create_tables(connection):
         print("✓ Table 'genres' created successfully")
 
         # Table 3: movie_genres (junction table)
-        movie_genres_table = """
+        movie_genres_table = f"""
         CREATE TABLE IF NOT EXISTS movie_genres (
             movie_id INT,
             genre_id INT,
             PRIMARY KEY (movie_id, genre_id),
-            FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE,
-            FOREIGN KEY (genre_id) REFERENCES genres(genre_id) ON DELETE CASCADE
+            FOREIGN KEY (genre_id) REFERENCES genres(genre_id) ON DELETE CASCADE{movie_fk}
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """
         cursor.execute(movie_genres_table)
@@ -139,35 +183,81 @@ def create_tables(connection):
         print("✓ Table 'people' created successfully")
 
         # Table 5: movie_cast
-        movie_cast_table = """
-        CREATE TABLE IF NOT EXISTS movie_cast (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            movie_id INT,
-            person_id INT,
-            character_name VARCHAR(255),
-            cast_order INT,
-            FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE,
-            FOREIGN KEY (person_id) REFERENCES people(person_id) ON DELETE CASCADE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """
+        if clustered_credits:
+            movie_cast_table = f"""
+            CREATE TABLE IF NOT EXISTS movie_cast (
+                movie_id INT NOT NULL,
+                cast_order INT NOT NULL,
+                {year_column}
+                person_id INT,
+                character_name VARCHAR(255),
+                PRIMARY KEY (movie_id, cast_order{year_key}){credit_fks}
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            {partitions}
+            """
+        else:
+            movie_cast_table = """
+            CREATE TABLE IF NOT EXISTS movie_cast (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                movie_id INT,
+                person_id INT,
+                character_name VARCHAR(255),
+                cast_order INT,
+                FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE,
+                FOREIGN KEY (person_id) REFERENCES people(person_id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """
         cursor.execute(movie_cast_table)
         print("✓ Table 'movie_cast' created successfully")
 
         # Table 6: movie_crew
-        movie_crew_table = """
-        CREATE TABLE IF NOT EXISTS movie_crew (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            movie_id INT,
-            person_id INT,
-            job VARCHAR(100),
-            department VARCHAR(100),
-            FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE,
-            FOREIGN KEY (person_id) REFERENCES people(person_id) ON DELETE CASCADE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-        """
+        if clustered_credits:
+            movie_crew_table = f"""
+            CREATE TABLE IF NOT EXISTS movie_crew (
+                movie_id INT NOT NULL,
+                person_id INT NOT NULL,
+                job VARCHAR(100) NOT NULL,
+                {year_column}
+                department VARCHAR(100),
+                PRIMARY KEY (movie_id, person_id, job{year_key}){credit_fks}
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            {partitions}
+            """
+        else:
+            movie_crew_table = """
+            CREATE TABLE IF NOT EXISTS movie_crew (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                movie_id INT,
+                person_id INT,
+                job VARCHAR(100),
+                department VARCHAR(100),
+                FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE,
+                FOREIGN KEY (person_id) REFERENCES people(person_id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """
         cursor.execute(movie_crew_table)
         print("✓ Table 'movie_crew' created successfully")
 
+        # Table 7: movie_top_billing (denormalized top cast names, maintained by ingestion)
+        cursor.execute(top_billing_table(partition_by_year))
+        print("✓ Table 'movie_top_billing' created successfully")
+
+        # Table 8: movie_documents (one JSON document per movie for detail reads, maintained by ingestion)
+        cursor.execute(documents_table(partition_by_year))
+        print("✓ Table 'movie_documents' created successfully")
+
+        # Table 9: movie_leaderboards (top movies per genre/year/director, maintained by ingestion)
+        cursor.execute(LEADERBOARD_TABLE)
+        print("✓ Table 'movie_leaderboards' created successfully")
+
+        # Tables 10-12: append-only metrics history with daily and weekly rollups
+        create_history_tables(cursor)
+        print("✓ Tables 'movie_metrics_history', 'movie_metrics_daily', 'movie_metrics_weekly' created successfully")
+
+        # Table 13: genre_sketches (HyperLogLog + movie sample per genre for approximate query_3)
+        cursor.execute(SKETCH_TABLE)
+        print("✓ Table 'genre_sketches' created successfully")
+
         connection.commit()
         print("\nAll tables created successfully!")
 
@@ -179,22 +269,40 @@ def create_tables(connection):
         cursor.close()
 
 
-def create_indices(connection):
+def create_indices(connection, clustered_credits=CLUSTERED_CREDITS, split_text=SPLIT_MOVIE_TEXT,
+                   partition_by_year=PARTITION_BY_YEAR):
     """
     Create all indices for query optimization.
 
     Args:
         connection: MySQL connection object
+        clustered_credits (bool): Credit tables use natural primary keys
+            (the primary key already covers movie_cast(movie_id, cast_order))
+        split_text (bool): Overview lives in movie_texts instead of movies
+        partition_by_year (bool): Movies and credits are partitioned by release_year;
+            partitioned tables cannot hold FULLTEXT indices, so the title index moves
+            to movie_texts as well
     """
     cursor = connection.cursor()
 
+    if partition_by_year:
+        split_text = True
+        clustered_credits = True
+
+    text_table = 'movie_texts' if split_text else 'movies'
+    title_table = 'movie_texts' if partition_by_year else 'movies'
+
     indices = [
         # FULLTEXT indices for text search queries
-        ("CREATE FULLTEXT INDEX idx_movie_overview ON movies(overview)",
-         "FULLTEXT index on movies.overview"),
+        (f"CREATE FULLTEXT INDEX idx_movie_overview ON {text_table}(overview)",
+         f"FULLTEXT index on {text_table}.overview"),
+
+        (f"CREATE FULLTEXT INDEX idx_movie_title ON {title_table}(title)",
+         f"FULLTEXT index on {title_table}.title"),
 
-        ("CREATE FULLTEXT INDEX idx_movie_title ON movies(title)",
-         "FULLTEXT index on movies.title"),
+        # Composite FULLTEXT index used by search_movies() for combined ranking
+        (f"CREATE FULLTEXT INDEX idx_movie_title_overview ON {text_table}(title, overview)",
+         f"FULLTEXT index on {text_table}(title, overview)"),
 
         # Regular indices for filtering and joins
         ("CREATE INDEX idx_movie_vote_average ON movies(vote_average)",
@@ -215,10 +323,32 @@ def create_indices(connection):
         ("CREATE INDEX idx_movie_genres_genre ON movie_genres(genre_id)",
          "Index on movie_genres.genre_id"),
 
+        # Faceted browsing: year range + rating filter with popularity covered, and
+        # popularity order for unfiltered pages (genre filter uses idx_movie_genres_genre,
+        # which InnoDB extends with the movie_id primary key)
+        ("CREATE INDEX idx_movie_date_rating_popularity ON movies(release_date, vote_average, popularity)",
+         "Composite index on movies(release_date, vote_average, popularity)"),
+
+        ("CREATE INDEX idx_movie_popularity ON movies(popularity)",
+         "Index on movies.popularity"),
+
         ("CREATE INDEX idx_people_name ON people(name)",
          "Index on people.name"),
+
+        # Leaderboard reads scan one board in rank order; refreshes find a movie's boards
+        *((f"CREATE INDEX {name} ON movie_leaderboards({columns})",
+           f"Index {name} on movie_leaderboards")
+          for name, columns in LEADERBOARD_INDICES.items()),
     ]
 
+    if partition_by_year:
+        indices.append(("CREATE INDEX idx_movie_release_year ON movies(release_year)",
+                        "Index on movies.release_year"))
+
+    if not clustered_credits:
+        indices.append(("CREATE INDEX idx_movie_cast_movie_order ON movie_cast(movie_id, cast_order)",
+                        "Composite index on movie_cast(movie_id, cast_order)"))
+
     try:
         for sql, description in indices:
             try:
@@ -305,7 +435,11 @@ def main():
         print("\nStep 3: Creating indices...")
         create_indices(connection)
 
-        # Step 5: Display schema info
+        # Step 5: A fresh schema already includes every versioned migration
+        from migrations import stamp_all
+        stamp_all(connection)
+
+        # Step 6: Display schema info
         show_schema_info(connection)
 
         print("\n" + "="*60)
@@ -0,0 +1,314 @@
+"""
+Read/Write Connection Routing for MovieFinder Application
+Sends writes (api_data_retrieve.py) to the primary and read queries
+(queries_db_script.py) to read replicas, skipping replicas that are down or
+lag behind the primary by more than REPLICA_MAX_LAG seconds.
+
+Configuration:
+    DB_HOST / DB_PORT        primary (as before)
+    DB_REPLICAS              read replicas, "host:port,host:port" (empty: primary only)
+    REPLICA_MAX_LAG          seconds of replication lag tolerated for reads (default 5)
+    REPLICA_LAG_POLICY       'primary' to fall back to the primary when no replica
+                             is usable (default), 'reject' to raise instead
+    HEALTH_CHECK_INTERVAL    seconds between health checks of an endpoint (default 5)
+    DB_BACKEND               'mysql' (default) or 'sqlite' to serve reads from the
+                             exported SQLite file at SQLITE_PATH (sqlite_backend.py)
+
+Usage:
+    python src/db_routing.py   # health of every endpoint
+"""
+
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error, pooling
+from dotenv import load_dotenv
+
+import sqlite_backend
+
+# Load environment variables
+load_dotenv()
+
+# Primary database configuration (should match api_data_retrieve.py)
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', '127.0.0.1'),
+    'port': int(os.getenv('DB_PORT', 3305)),
+    'user': os.getenv('DB_USER', 'yarony'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME', 'yarony')
+}
+
+DB_REPLICAS = os.getenv('DB_REPLICAS', '')
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 5))
+REPLICA_LAG_POLICY = os.getenv('REPLICA_LAG_POLICY', 'primary')
+HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 5))
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+
+# Seconds to wait when opening a connection during a health check
+HEALTH_CHECK_CONNECT_TIMEOUT = 2
+
+
+class ReplicaUnavailable(Error):
+    """No replica can serve reads and REPLICA_LAG_POLICY is 'reject'."""
+
+
+def replica_lag(connection):
+    """
+    Seconds a replica is behind its source (0 when it is not a replica,
+    infinity when replication is stopped).
+
+    Args:
+        connection: MySQL connection object to the replica
+
+    Returns:
+        float: Replication lag in seconds
+    """
+    cursor = connection.cursor(dictionary=True)
+
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Error:
+            cursor.execute("SHOW SLAVE STATUS")  # MySQL < 8.0.22
+        row = cursor.fetchone()
+        cursor.fetchall()
+        if not row:
+            return 0.0
+        lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+        return float('inf') if lag is None else float(lag)
+    finally:
+        cursor.close()
+
+
+def parse_endpoints(spec, default_port):
+    """
+    Parse "host:port,host:port" into (host, port) tuples.
+
+    Args:
+        spec (str): Comma-separated endpoints
+        default_port (int): Port used when an endpoint has none
+
+    Returns:
+        list: List of (host, port) tuples
+    """
+    endpoints = []
+    for address in filter(None, (a.strip() for a in spec.split(','))):
+        host, _, port = address.partition(':')
+        endpoints.append((host, int(port or default_port)))
+    return endpoints
+
+
+class Endpoint:
+    """
+    One MySQL server with its connection pool and last health check.
+
+    Args:
+        role (str): 'primary' or 'replica'
+        host (str): Server host
+        port (int): Server port
+        pool_size (int): Pooled connections for this server
+    """
+
+    def __init__(self, role, host, port, pool_size):
+        self.role = role
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.config = {**DB_CONFIG, 'host': host, 'port': port}
+        self.pool = None
+        self.healthy = role == 'primary'
+        self.lag = 0.0
+        self.checked_at = None
+        self.error = None
+        self._monitor = None
+        self._check_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+
+    @property
+    def name(self):
+        return f"{self.role} {self.host}:{self.port}"
+
+    def connection(self):
+        """Borrow a pooled connection (close() returns it)."""
+        with self._pool_lock:
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name=f"{self.role}_{self.host}_{self.port}".replace('.', '_'),
+                    pool_size=self.pool_size, **self.config)
+        return self.pool.get_connection()
+
+    def check(self):
+        """
+        Ping the server and, for replicas, measure replication lag.
+        Uses a dedicated connection so checks never wait for a pool slot; if
+        another thread is already checking this endpoint, returns immediately.
+        """
+        if not self._check_lock.acquire(blocking=False):
+            return
+
+        try:
+            if self._monitor is None or not self._monitor.is_connected():
+                self._monitor = mysql.connector.connect(
+                    **self.config, connection_timeout=HEALTH_CHECK_CONNECT_TIMEOUT)
+            cursor = self._monitor.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            self.lag = replica_lag(self._monitor) if self.role == 'replica' else 0.0
+            self.healthy = self.lag <= REPLICA_MAX_LAG
+            self.error = None if self.healthy else f"lag {self.lag:.0f}s > {REPLICA_MAX_LAG:.0f}s"
+        except Error as e:
+            self.healthy = False
+            self.error = str(e)
+            self._monitor = None
+        finally:
+            self.checked_at = time.monotonic()
+            self._check_lock.release()
+
+    def status(self):
+        return {'endpoint': self.name, 'healthy': self.healthy,
+                'lag_seconds': None if self.lag == float('inf') else self.lag, 'error': self.error}
+
+
+class ConnectionRouter:
+    """
+    Hands out primary connections for writes and replica connections for reads.
+
+    Replicas are used round-robin. Each endpoint is health-checked at most every
+    HEALTH_CHECK_INTERVAL seconds, on demand when a read connection is requested.
+
+    Args:
+        replicas (str): "host:port,..." of read replicas (default: DB_REPLICAS)
+        pool_size (int): Pooled connections per endpoint
+        max_lag (float): Replication lag tolerated for reads
+        lag_policy (str): 'primary' or 'reject' when no replica is usable
+        backend (str): 'mysql', or 'sqlite' to serve reads from the local SQLite file
+    """
+
+    def __init__(self, replicas=DB_REPLICAS, pool_size=8, max_lag=REPLICA_MAX_LAG,
+                 lag_policy=REPLICA_LAG_POLICY, backend=DB_BACKEND):
+        if lag_policy not in ('primary', 'reject'):
+            raise ValueError(f"Unknown replica lag policy: {lag_policy}")
+        if backend not in ('mysql', 'sqlite'):
+            raise ValueError(f"Unknown database backend: {backend}")
+
+        self.primary = Endpoint('primary', DB_CONFIG['host'], DB_CONFIG['port'], pool_size)
+        self.replicas = [Endpoint('replica', host, port, pool_size)
+                         for host, port in parse_endpoints(replicas, DB_CONFIG['port'])]
+        self.max_lag = max_lag
+        self.lag_policy = lag_policy
+        self.backend = backend
+        self.stats = {'primary_writes': 0, 'replica_reads': 0, 'primary_reads': 0, 'rejected_reads': 0,
+                      'sqlite_reads': 0}
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def refresh(self, force=False):
+        """Health-check endpoints whose last check is older than the interval."""
+        now = time.monotonic()
+        for endpoint in [self.primary, *self.replicas]:
+            if force or endpoint.checked_at is None or now - endpoint.checked_at >= HEALTH_CHECK_INTERVAL:
+                endpoint.check()
+
+    def write_connection(self):
+        """Connection to the primary."""
+        with self._lock:
+            self.stats['primary_writes'] += 1
+        return self.primary.connection()
+
+    def read_connection(self):
+        """
+        Connection for read queries: the next healthy replica within the lag bound,
+        otherwise the primary or ReplicaUnavailable depending on the lag policy.
+
+        With the sqlite backend every read opens the local SQLite file instead.
+
+        Raises:
+            ReplicaUnavailable: No usable replica and lag_policy is 'reject'
+        """
+        if self.backend == 'sqlite':
+            with self._lock:
+                self.stats['sqlite_reads'] += 1
+            return sqlite_backend.connect()
+
+        if not self.replicas:
+            with self._lock:
+                self.stats['primary_reads'] += 1
+            return self.primary.connection()
+
+        self.refresh()
+        usable = [r for r in self.replicas if r.healthy and r.lag <= self.max_lag]
+
+        with self._lock:
+            if usable:
+                endpoint = usable[self._next % len(usable)]
+                self._next += 1
+                self.stats['replica_reads'] += 1
+            elif self.lag_policy == 'primary':
+                endpoint = self.primary
+                self.stats['primary_reads'] += 1
+            else:
+                self.stats['rejected_reads'] += 1
+                raise ReplicaUnavailable(msg="No replica within the lag bound is available")
+
+        try:
+            return endpoint.connection()
+        except Error as e:
+            # Take a failing replica out of rotation until its next health check
+            endpoint.healthy = False
+            endpoint.error = str(e)
+            if endpoint is self.primary:
+                raise
+            return self.read_connection()
+
+    def status(self):
+        """Health of every endpoint plus routing counters."""
+        return {'backend': self.backend, 'endpoints': [e.status() for e in [self.primary, *self.replicas]],
+                **self.stats}
+
+
+# Shared router, created on first use
+_router = None
+
+
+def get_router():
+    """Return the process-wide ConnectionRouter."""
+    global _router
+    if _router is None:
+        _router = ConnectionRouter()
+    return _router
+
+
+def get_read_connection():
+    """Connection for read queries (see ConnectionRouter.read_connection)."""
+    return get_router().read_connection()
+
+
+def get_write_connection():
+    """Connection to the primary for writes."""
+    return get_router().write_connection()
+
+
+def main():
+    """
+    Print the health of the primary and every replica.
+    """
+    router = get_router()
+    router.refresh(force=True)
+
+    print(f"{'Endpoint':<32}{'Healthy':<10}{'Lag (s)':<10}{'Error'}")
+    print("-"*70)
+    for status in router.status()['endpoints']:
+        lag = status['lag_seconds']
+        print(f"{status['endpoint']:<32}{'yes' if status['healthy'] else 'no':<10}"
+              f"{'-' if lag is None else f'{lag:.0f}':<10}{status['error'] or ''}")
+
+    return 0 if router.primary.healthy else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,497 @@
+"""
+Genre Sketches for MovieFinder Application
+Approximate query_3 (per-genre movie count, average rating, total and average
+revenue) from small per-genre sketches in genre_sketches, instead of
+COUNT(DISTINCT)/AVG/SUM over every movie_genres and movies row.
+
+Each genre keeps:
+    - a HyperLogLog of its movie IDs (2**HLL_PRECISION one-byte registers),
+      estimating the number of distinct movies within ~0.8% (one standard error);
+    - a uniform sample of up to SAMPLE_SIZE of its movies: the ones with the
+      smallest hash of movie_id (bottom-k). Unlike a classic reservoir, the sample
+      is the same whatever the ingestion order, and re-ingesting a movie replaces
+      its entry instead of adding a duplicate.
+
+Averages, revenue totals and year-range counts are estimated from the sample
+and returned with 95% confidence half-widths. The median and 90th percentile of
+rating and revenue are the sample quantiles, with distribution-free 95% intervals
+from the order statistics of the sample. Genres with no more than SAMPLE_SIZE
+movies have a complete sample and exact answers (zero error).
+
+The sketches are merged into genre_sketches by api_data_retrieve.py once per
+page of movies (record_movies()). HyperLogLogs cannot forget, so movies deleted
+or moved out of a genre stay counted until
+`python src/maintenance.py rebuild-sketches`.
+
+Usage:
+    python src/genre_sketches.py bench [min_movies]   # approximate vs exact query_3
+"""
+
+import math
+import sys
+import time
+
+import numpy as np
+from mysql.connector import Error
+
+# HyperLogLog registers = 2**HLL_PRECISION (relative standard error 1.04 / sqrt(registers))
+HLL_PRECISION = 14
+
+# Movies sampled per genre
+SAMPLE_SIZE = 2048
+
+# z-score of the reported error bounds (95% confidence)
+CONFIDENCE_Z = 1.96
+
+# Quantiles of rating and revenue reported per genre
+QUANTILES = {'median': 0.5, 'p90': 0.9}
+
+# Rows fetched per round trip while rebuilding
+REBUILD_BATCH_SIZE = 20000
+
+# One sampled movie; NaN marks a NULL rating or revenue
+SAMPLE_DTYPE = np.dtype([('hash', '<u8'), ('movie_id', '<i4'), ('year', '<i2'),
+                         ('rating', '<f4'), ('revenue', '<f8')])
+
+SKETCH_TABLE = """
+CREATE TABLE IF NOT EXISTS genre_sketches (
+    genre_id INT PRIMARY KEY,
+    hll_registers BLOB NOT NULL,
+    sample MEDIUMBLOB NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# Decoded sketches of the last version read: (backend, version) -> rows
+_cache = {}
+
+
+def hash_ids(movie_ids):
+    """
+    SplitMix64 hash of movie IDs.
+
+    Args:
+        movie_ids: Integer array-like
+
+    Returns:
+        np.ndarray: uint64 hashes
+    """
+    z = np.asarray(movie_ids, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over='ignore'):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class GenreSketch:
+    """
+    HyperLogLog and bottom-k sample of one genre's movies.
+
+    Args:
+        registers (np.ndarray): HyperLogLog registers (default: empty)
+        sample (np.ndarray): SAMPLE_DTYPE entries sorted by hash (default: empty)
+    """
+
+    def __init__(self, registers=None, sample=None):
+        self.registers = registers if registers is not None else np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+        self.sample = sample if sample is not None else np.zeros(0, dtype=SAMPLE_DTYPE)
+
+    def add(self, entries):
+        """
+        Add movies to the sketch (replacing sampled entries of the same movies).
+
+        Args:
+            entries (np.ndarray): SAMPLE_DTYPE entries, hash already set
+        """
+        if not len(entries):
+            return
+
+        hashes = entries['hash']
+        suffix_bits = 64 - HLL_PRECISION
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << suffix_bits) - 1)
+        # Position of the leftmost 1-bit in the remaining bits (exact: they fit a float64 mantissa)
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (suffix_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+        self.sample = merge_samples(self.sample, entries)
+
+    def distinct(self):
+        """
+        Estimated number of distinct movies.
+
+        Returns:
+            tuple: (estimate, 95% relative error bound)
+        """
+        if len(self.sample) < SAMPLE_SIZE:
+            return float(len(self.sample)), 0.0
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return max(float(estimate), float(len(self.sample))), CONFIDENCE_Z * 1.04 / math.sqrt(m)
+
+
+def merge_samples(kept, added):
+    """
+    Bottom-k union of two samples; entries of `added` replace those of the same movie.
+
+    Returns:
+        np.ndarray: At most SAMPLE_SIZE entries sorted by hash
+    """
+    if len(kept) and len(added):
+        kept = kept[~np.isin(kept['movie_id'], added['movie_id'])]
+    merged = np.concatenate([added, kept])
+    # Keep the first occurrence of each movie (added entries come first)
+    _, first = np.unique(merged['movie_id'], return_index=True)
+    merged = merged[first]
+    return np.sort(merged, order='hash')[:SAMPLE_SIZE]
+
+
+def make_entries(rows):
+    """
+    Sample entries from (movie_id, year, rating, revenue) rows.
+
+    Returns:
+        np.ndarray: SAMPLE_DTYPE entries
+    """
+    entries = np.zeros(len(rows), dtype=SAMPLE_DTYPE)
+    if not rows:
+        return entries
+    movie_ids, years, ratings, revenues = zip(*rows)
+    entries['movie_id'] = movie_ids
+    entries['hash'] = hash_ids(movie_ids)
+    entries['year'] = [year or 0 for year in years]
+    entries['rating'] = [np.nan if rating is None else float(rating) for rating in ratings]
+    entries['revenue'] = [np.nan if revenue is None else float(revenue) for revenue in revenues]
+    return entries
+
+
+def decode(registers, sample):
+    """GenreSketch from the stored blobs."""
+    return GenreSketch(np.frombuffer(registers, dtype=np.uint8).copy(),
+                       np.frombuffer(sample, dtype=SAMPLE_DTYPE).copy())
+
+
+def write_sketches(cursor, sketches):
+    """Upsert sketches (genre_id -> GenreSketch), bumping their version."""
+    cursor.executemany("""
+    INSERT INTO genre_sketches (genre_id, hll_registers, sample, version)
+    VALUES (%s, %s, %s, 1)
+    ON DUPLICATE KEY UPDATE
+        hll_registers = VALUES(hll_registers),
+        sample = VALUES(sample),
+        version = version + 1
+    """, [(genre_id, sketch.registers.tobytes(), sketch.sample.tobytes())
+          for genre_id, sketch in sketches.items()])
+
+
+def record_movies(connection, movies):
+    """
+    Merge a batch of ingested movies into their genres' sketches. The stored
+    sketches are locked while merging, so concurrent writers do not lose
+    each other's movies. Commits.
+
+    Args:
+        connection: MySQL connection object
+        movies (list): Tuples (movie_id, genre_ids, release_year, vote_average, revenue)
+
+    Returns:
+        int: Number of genre sketches written
+    """
+    by_genre = {}
+    for movie_id, genre_ids, year, rating, revenue in movies:
+        for genre_id in genre_ids:
+            by_genre.setdefault(int(genre_id), []).append((movie_id, year, rating, revenue))
+    if not by_genre:
+        return 0
+
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(f"""
+        SELECT genre_id, hll_registers, sample
+        FROM genre_sketches
+        WHERE genre_id IN ({', '.join(['%s'] * len(by_genre))})
+        FOR UPDATE
+        """, list(by_genre))
+        sketches = {genre_id: decode(registers, sample) for genre_id, registers, sample in cursor.fetchall()}
+
+        for genre_id, rows in by_genre.items():
+            sketches.setdefault(genre_id, GenreSketch()).add(make_entries(rows))
+
+        write_sketches(cursor, sketches)
+        connection.commit()
+        return len(sketches)
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def rebuild_sketches(connection, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Recompute every genre sketch from movie_genres and movies. Commits.
+
+    Args:
+        connection: MySQL connection object
+        batch_size (int): Rows fetched per round trip
+
+    Returns:
+        int: Number of genre sketches written
+    """
+    sketches = {}
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT mg.genre_id, m.movie_id, YEAR(m.release_date), m.vote_average, m.revenue
+        FROM movie_genres mg
+        INNER JOIN movies m ON m.movie_id = mg.movie_id
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            by_genre = {}
+            for genre_id, *movie in rows:
+                by_genre.setdefault(genre_id, []).append(movie)
+            for genre_id, movies in by_genre.items():
+                sketches.setdefault(genre_id, GenreSketch()).add(make_entries(movies))
+
+        # Upsert rather than truncate, so versions keep increasing and cached sketches are replaced
+        if sketches:
+            write_sketches(cursor, sketches)
+            cursor.execute(f"""
+            DELETE FROM genre_sketches
+            WHERE genre_id NOT IN ({', '.join(['%s'] * len(sketches))})
+            """, list(sketches))
+        else:
+            cursor.execute("DELETE FROM genre_sketches")
+        connection.commit()
+        return len(sketches)
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def cached_sketches(backend, version, load):
+    """
+    Decoded sketches for a table version, loading them only when it changed.
+
+    Args:
+        backend (str): Connection kind, so MySQL and SQLite versions do not mix
+        version (tuple): Sum of the genre_sketches versions and number of genres
+        load (callable): Returns rows (genre_name, hll_registers, sample)
+
+    Returns:
+        list: List of tuples (genre_name, GenreSketch)
+    """
+    key = (backend, version)
+    if key not in _cache:
+        _cache.clear()
+        _cache[key] = [(genre_name, decode(registers, sample)) for genre_name, registers, sample in load()]
+    return _cache[key]
+
+
+def interval(values):
+    """Mean and 95% half-width of a sample mean (0 for fewer than 2 values)."""
+    if not len(values):
+        return None, None
+    mean = float(np.mean(values))
+    if len(values) < 2:
+        return mean, 0.0
+    return mean, CONFIDENCE_Z * float(np.std(values, ddof=1)) / math.sqrt(len(values))
+
+
+def quantile_interval(values, q):
+    """
+    Sample quantile and its 95% confidence interval. The interval runs between
+    the order statistics whose ranks are n*q -/+ z*sqrt(n*q*(1-q)) (normal
+    approximation of the binomial count of values below the true quantile).
+
+    Returns:
+        tuple: (quantile, (low, high)), or (None, None) for no values
+    """
+    n = len(values)
+    if not n:
+        return None, None
+    ordered = np.sort(values)
+    spread = CONFIDENCE_Z * math.sqrt(n * q * (1 - q))
+    low = ordered[max(0, int(math.floor(n * q - spread)))]
+    high = ordered[min(n - 1, int(math.ceil(n * q + spread)))]
+    return float(np.quantile(ordered, q)), (float(low), float(high))
+
+
+def estimate_genre_stats(sketches, min_movies=20, year_from=None, year_to=None):
+    """
+    query_3 estimated from genre sketches.
+
+    Args:
+        sketches (list): Tuples (genre_name, GenreSketch)
+        min_movies (int): Minimum estimated movie count of a genre
+        year_from (int): Earliest release year (inclusive)
+        year_to (int): Latest release year (inclusive)
+
+    Returns:
+        list: List of tuples (genre_name, avg_rating, movie_count, total_revenue,
+            avg_revenue, quantiles, errors), ordered like query_3; quantiles is a
+            dict with 'rating_median', 'rating_p90', 'revenue_median' and
+            'revenue_p90'; errors is a dict of 95% half-widths for 'avg_rating',
+            'movie_count', 'total_revenue' and 'avg_revenue', and of 95% (low, high)
+            intervals for each quantile
+    """
+    results = []
+
+    for genre_name, sketch in sketches:
+        sample = sketch.sample
+        if not len(sample):
+            continue
+
+        distinct, distinct_error = sketch.distinct()
+        complete = distinct_error == 0.0
+
+        # Same rows as query_3: rated movies in the year range
+        matching = ~np.isnan(sample['rating'])
+        if year_from is not None:
+            matching &= sample['year'] >= int(year_from)
+        if year_to is not None:
+            matching &= sample['year'] <= int(year_to)
+        matches = int(np.count_nonzero(matching))
+        if not matches:
+            continue
+
+        fraction = matches / len(sample)
+        count = distinct * fraction
+        # Sampling error of the matching fraction, combined with the HyperLogLog error
+        fraction_error = 0.0 if complete else CONFIDENCE_Z * math.sqrt((1 - fraction) / (len(sample) * fraction))
+        count_error = 0.0 if complete else count * math.hypot(distinct_error, fraction_error)
+
+        if count < min_movies:
+            continue
+
+        avg_rating, rating_error = interval(sample['rating'][matching].astype(np.float64))
+        revenues = sample['revenue'][matching]
+        revenues = revenues[~np.isnan(revenues)]
+        avg_revenue, revenue_error = interval(revenues)
+
+        if avg_revenue is None:
+            total_revenue = total_error = None
+        else:
+            # SUM skips NULL revenues: scale by the estimated number of movies that have one
+            total_revenue = avg_revenue * count * len(revenues) / matches
+            total_error = 0.0 if complete else abs(total_revenue) * math.hypot(
+                count_error / count, revenue_error / avg_revenue if avg_revenue else 0.0)
+
+        if complete:
+            rating_error = revenue_error = 0.0
+
+        quantiles, quantile_errors = {}, {}
+        for field, values, digits in (('rating', sample['rating'][matching].astype(np.float64), 2),
+                                      ('revenue', revenues, 0)):
+            for label, q in QUANTILES.items():
+                value, bounds = quantile_interval(values, q)
+                if value is not None and complete:
+                    bounds = (value, value)
+                key = f"{field}_{label}"
+                quantiles[key] = None if value is None else round(value, digits)
+                quantile_errors[key] = None if bounds is None else [round(bound, digits) for bound in bounds]
+
+        results.append((
+            genre_name,
+            round(avg_rating, 2),
+            int(round(count)),
+            None if total_revenue is None else int(round(total_revenue)),
+            None if avg_revenue is None else int(round(avg_revenue)),
+            quantiles,
+            {
+                'avg_rating': round(rating_error, 3),
+                'movie_count': int(math.ceil(count_error)),
+                'total_revenue': None if total_error is None else int(math.ceil(total_error)),
+                'avg_revenue': None if revenue_error is None else int(math.ceil(revenue_error)),
+                **quantile_errors,
+            },
+        ))
+
+    results.sort(key=lambda row: (-row[1], -row[2]))
+    return results
+
+
+def benchmark(connection, min_movies=20, repeats=20):
+    """
+    Compare query_3 with its sketch-based estimate.
+
+    Returns:
+        tuple: (exact median ms, approximate median ms,
+                list of (genre, exact count, estimate, error bound, within bound))
+    """
+    from queries_db_script import query_3, query_3_approximate
+
+    def median_ms(func):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(connection, min_movies)
+            timings.append((time.perf_counter() - start) * 1000)
+        return float(np.median(timings))
+
+    exact = {row[0]: row for row in query_3(connection, min_movies)}
+    approximate = query_3_approximate(connection, min_movies)
+
+    comparison = []
+    for genre_name, _, count, _, _, _, errors in approximate:
+        if genre_name in exact:
+            true_count = exact[genre_name][2]
+            comparison.append((genre_name, true_count, count, errors['movie_count'],
+                               abs(count - true_count) <= errors['movie_count']))
+
+    return median_ms(query_3), median_ms(query_3_approximate), comparison
+
+
+def main():
+    """
+    Benchmark approximate query_3 against the exact query.
+    """
+    from api_data_retrieve import get_db_connection
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'bench'
+    if command != 'bench':
+        print(f"Unknown command '{command}'. Use 'bench'.")
+        return 1
+
+    min_movies = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    connection = None
+
+    try:
+        connection = get_db_connection()
+        exact_ms, approximate_ms, comparison = benchmark(connection, min_movies)
+
+        print(f"query_3 exact:       {exact_ms:8.2f} ms (median)")
+        print(f"query_3 approximate: {approximate_ms:8.2f} ms (median)\n")
+        print(f"{'Genre':<20}{'Exact':>10}{'Estimate':>10}{'± 95%':>10}  ")
+        print("-"*54)
+        for genre_name, true_count, count, bound, within in comparison:
+            print(f"{genre_name:<20}{true_count:>10,}{count:>10,}{bound:>10,}  {'✓' if within else '⚠'}")
+
+    except Error as e:
+        print(f"\nDatabase Error: {e}")
+        return 1
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,402 @@
+"""
+Index Advisor for MovieFinder Application
+Runs EXPLAIN FORMAT=JSON for query_1..query_5 over representative parameters,
+flags full scans, filesorts and temporary tables, proposes composite/covering
+indices, and can apply them and report the latency change per query.
+
+Usage:
+    python src/index_advisor.py report    # show plan findings and proposed indices
+    python src/index_advisor.py trial     # apply, benchmark before/after, then drop them
+    python src/index_advisor.py apply     # apply, benchmark before/after, keep them
+"""
+
+import json
+import re
+import statistics
+import sys
+import time
+
+from mysql.connector import Error
+
+import queries_db_script
+from api_data_retrieve import get_db_connection
+from query_profiling import QueryProfiler, enable_profiling, disable_profiling, get_profiler
+
+
+# Representative calls per query: (query name, function, arguments after the connection)
+REPRESENTATIVE_CALLS = [
+    ('query_1', queries_db_script.query_1, ("space exploration",)),
+    ('query_1', queries_db_script.query_1, ("time travel",)),
+    ('query_2', queries_db_script.query_2, ("Star",)),
+    ('query_2', queries_db_script.query_2, ("Dark",)),
+    ('query_3', queries_db_script.query_3, (20,)),
+    ('query_3', queries_db_script.query_3, (50,)),
+    ('query_4', queries_db_script.query_4, ("Tom Hanks", 2)),
+    ('query_4', queries_db_script.query_4, ("Samuel L. Jackson", 2)),
+    ('query_5', queries_db_script.query_5, ("Christopher Nolan", 7.0)),
+    ('query_5', queries_db_script.query_5, ("Steven Spielberg", 7.5)),
+]
+
+# Hand-picked composites known to help specific queries; proposed when their table is flagged
+CURATED_CANDIDATES = [
+    ('movie_genres', ('genre_id', 'movie_id'), "query_3: genre -> movie join without touching the PK"),
+    ('movies', ('vote_average', 'movie_id', 'revenue'), "query_3: covering rating filter with revenue"),
+    ('movie_crew', ('job', 'person_id', 'movie_id'), "query_5: director lookups by job"),
+    ('movie_cast', ('person_id', 'movie_id'), "query_4: actor -> movies probe"),
+]
+
+# Widest index the advisor will propose
+MAX_INDEX_COLUMNS = 4
+
+# Column types that cannot be part of a regular B-tree index proposal
+UNINDEXABLE_TYPES = {'text', 'mediumtext', 'longtext', 'blob', 'mediumblob', 'longblob', 'json'}
+
+# Timed executions per representative call when benchmarking
+BENCHMARK_REPEATS = 5
+
+TABLE_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+CONDITION_COLUMN_RE = re.compile(r"`\w+`\.`(\w+)`\.`(\w+)`")
+
+
+class PlanCollector:
+    """Profiler sink that keeps the EXPLAIN output and statement of each call."""
+
+    def __init__(self):
+        self.plans = []
+
+    def emit(self, sample):
+        self.plans.append(sample)
+
+
+def capture_plans(connection, calls=REPRESENTATIVE_CALLS):
+    """
+    Run each representative call once with EXPLAIN FORMAT=JSON capture.
+
+    Args:
+        connection: MySQL connection object
+        calls (list): Representative calls
+
+    Returns:
+        list: List of (query name, statement, plan dict) tuples
+    """
+    collector = PlanCollector()
+    previous = get_profiler()
+    enable_profiling(QueryProfiler(sinks=[collector], explain='plan', explain_slow_only=False))
+
+    try:
+        for name, func, args in calls:
+            func(connection, *args)
+    finally:
+        if previous is None:
+            disable_profiling()
+        else:
+            enable_profiling(previous)
+
+    return [(sample['query'], sample['statement'], json.loads(sample['explain']))
+            for sample in collector.plans if sample['explain']]
+
+
+def walk_plan(node, findings, aliases):
+    """
+    Collect flagged operations from an EXPLAIN FORMAT=JSON tree.
+
+    Args:
+        node: Any JSON value from the plan
+        findings (list): Output list of finding dictionaries
+        aliases (dict): Alias -> table name from the statement
+    """
+    if isinstance(node, list):
+        for item in node:
+            walk_plan(item, findings, aliases)
+        return
+    if not isinstance(node, dict):
+        return
+
+    for operation in ('ordering_operation', 'grouping_operation', 'duplicates_removal'):
+        step = node.get(operation)
+        if isinstance(step, dict):
+            if step.get('using_filesort'):
+                findings.append({'kind': 'filesort', 'operation': operation})
+            if step.get('using_temporary_table'):
+                findings.append({'kind': 'temporary', 'operation': operation})
+
+    table = node.get('table')
+    if isinstance(table, dict):
+        alias = table.get('table_name')
+        access = table.get('access_type')
+        if access in ('ALL', 'index'):
+            condition = table.get('attached_condition', '')
+            condition_columns = [column for cond_alias, column in CONDITION_COLUMN_RE.findall(condition)
+                                 if cond_alias == alias]
+            findings.append({
+                'kind': 'full_scan' if access == 'ALL' else 'full_index_scan',
+                'alias': alias,
+                'table': aliases.get(alias, alias),
+                'rows': table.get('rows_examined_per_scan'),
+                'key': table.get('key'),
+                'condition_columns': list(dict.fromkeys(condition_columns)),
+                'used_columns': table.get('used_columns', []),
+            })
+
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            walk_plan(value, findings, aliases)
+
+
+def existing_indices(connection):
+    """
+    Read the leading columns of every index in the current database.
+
+    Returns:
+        dict: Table -> list of column tuples
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """)
+        grouped = {}
+        for table, index, column in cursor.fetchall():
+            grouped.setdefault((table, index), []).append(column)
+
+        indices = {}
+        for (table, index), columns in grouped.items():
+            indices.setdefault(table, []).append(tuple(columns))
+        return indices
+    finally:
+        cursor.close()
+
+
+def column_types(connection):
+    """Return {(table, column): data_type} for the current database."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        """)
+        return {(table, column): data_type.lower() for table, column, data_type in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def is_covered(columns, indices):
+    """True if an existing index starts with the proposed columns."""
+    return any(index[:len(columns)] == tuple(columns) for index in indices)
+
+
+def propose_indices(findings, indices, types):
+    """
+    Turn plan findings into index proposals.
+
+    Condition columns of a scanned table lead the proposal; the remaining used
+    columns are appended (up to MAX_INDEX_COLUMNS) to make it covering.
+
+    Args:
+        findings (list): (query name, finding) tuples
+        indices (dict): Existing indices per table
+        types (dict): Column data types
+
+    Returns:
+        list: Proposal dictionaries with 'table', 'columns', 'reason', 'queries'
+    """
+    proposals = {}
+
+    def add(table, columns, reason, query):
+        columns = tuple(c for c in columns if types.get((table, c), '') not in UNINDEXABLE_TYPES)
+        columns = tuple(dict.fromkeys(columns))[:MAX_INDEX_COLUMNS]
+        if not columns or is_covered(columns, indices.get(table, [])):
+            return
+        entry = proposals.setdefault((table, columns), {'table': table, 'columns': columns,
+                                                        'reason': reason, 'queries': set()})
+        entry['queries'].add(query)
+
+    flagged_tables = {}
+    for query, finding in findings:
+        if finding['kind'] not in ('full_scan', 'full_index_scan'):
+            continue
+        table = finding['table']
+        flagged_tables.setdefault(table, set()).add(query)
+        leading = finding['condition_columns']
+        if leading:
+            covering = leading + [c for c in finding['used_columns'] if c not in leading]
+            add(table, covering, f"{finding['kind']} filtered on {', '.join(leading)}", query)
+
+    for table, columns, reason in CURATED_CANDIDATES:
+        for query in flagged_tables.get(table, ()):
+            add(table, columns, reason, query)
+
+    return list(proposals.values())
+
+
+def index_name(proposal):
+    """Build a deterministic index name for a proposal."""
+    name = f"idx_adv_{proposal['table']}_{'_'.join(proposal['columns'])}"
+    return name[:64]
+
+
+def benchmark_calls(connection, calls=REPRESENTATIVE_CALLS, repeats=BENCHMARK_REPEATS):
+    """
+    Median latency per query name over the representative calls.
+
+    Returns:
+        dict: Query name -> median milliseconds
+    """
+    timings = {}
+    for name, func, args in calls:
+        func(connection, *args)  # Warm-up
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(connection, *args)
+            timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+
+def apply_proposals(connection, proposals):
+    """
+    Create the proposed indices.
+
+    Returns:
+        list: Names of the indices that were created
+    """
+    cursor = connection.cursor()
+    created = []
+
+    try:
+        for proposal in proposals:
+            name = index_name(proposal)
+            try:
+                cursor.execute(f"CREATE INDEX {name} ON {proposal['table']}({', '.join(proposal['columns'])})")
+                cursor.execute(f"ANALYZE TABLE {proposal['table']}")
+                cursor.fetchall()
+                created.append((proposal['table'], name))
+                print(f"✓ Created {name}")
+            except Error as e:
+                print(f"✗ Error creating {name}: {e}")
+        return created
+    finally:
+        cursor.close()
+
+
+def drop_indices(connection, created):
+    """Drop indices created by apply_proposals()."""
+    cursor = connection.cursor()
+
+    try:
+        for table, name in created:
+            try:
+                cursor.execute(f"DROP INDEX {name} ON {table}")
+                print(f"✓ Dropped {name}")
+            except Error as e:
+                print(f"✗ Error dropping {name}: {e}")
+    finally:
+        cursor.close()
+
+
+def analyze(connection):
+    """
+    Capture plans and derive findings and proposals.
+
+    Returns:
+        tuple: (findings list of (query, finding), proposals list)
+    """
+    findings = []
+    for name, statement, plan in capture_plans(connection):
+        aliases = {alias: table for table, alias in TABLE_ALIAS_RE.findall(statement or '')}
+        plan_findings = []
+        walk_plan(plan, plan_findings, aliases)
+        findings.extend((name, finding) for finding in plan_findings)
+
+    proposals = propose_indices(findings, existing_indices(connection), column_types(connection))
+    return findings, proposals
+
+
+def print_report(findings, proposals):
+    """Print plan findings and index proposals."""
+    print("="*70)
+    print("PLAN FINDINGS")
+    print("="*70)
+
+    seen = set()
+    for query, finding in findings:
+        if finding['kind'] in ('full_scan', 'full_index_scan'):
+            text = (f"{finding['kind']} on {finding['table']} ({finding['alias']}), "
+                    f"~{finding['rows']} rows, key={finding['key']}")
+        else:
+            text = f"{finding['kind']} in {finding['operation']}"
+        if (query, text) not in seen:
+            seen.add((query, text))
+            print(f"  {query}: {text}")
+    if not seen:
+        print("  No full scans, filesorts or temporary tables found.")
+
+    print("\n" + "="*70)
+    print("PROPOSED INDICES")
+    print("="*70)
+    for proposal in proposals:
+        print(f"  CREATE INDEX {index_name(proposal)} ON {proposal['table']}({', '.join(proposal['columns'])})")
+        print(f"      for {', '.join(sorted(proposal['queries']))}: {proposal['reason']}")
+    if not proposals:
+        print("  None - existing indices already cover the flagged access paths.")
+
+
+def print_benchmark(before, after):
+    """Print the latency change per query."""
+    print("\n" + "="*70)
+    print("LATENCY BEFORE / AFTER (median ms)")
+    print("="*70)
+    print(f"{'Query':<10}{'Before':<12}{'After':<12}{'Change'}")
+    print("-"*44)
+    for name in sorted(before):
+        change = (after[name] - before[name]) / before[name] * 100 if before[name] else 0.0
+        print(f"{name:<10}{before[name]:<12.2f}{after[name]:<12.2f}{change:+.1f}%")
+
+
+def main():
+    """
+    Run the advisor in report, trial or apply mode.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'report'
+    if command not in ('report', 'trial', 'apply'):
+        print("Usage: python src/index_advisor.py <report|trial|apply>")
+        return 1
+
+    connection = None
+    previous_engine = queries_db_script.SEARCH_ENGINE
+
+    try:
+        connection = get_db_connection()
+        queries_db_script.set_search_engine('mysql')
+
+        findings, proposals = analyze(connection)
+        print_report(findings, proposals)
+
+        if command != 'report' and proposals:
+            before = benchmark_calls(connection)
+            created = apply_proposals(connection, proposals)
+            after = benchmark_calls(connection)
+            print_benchmark(before, after)
+
+            if command == 'trial':
+                drop_indices(connection, created)
+
+    except Error as e:
+        print(f"\nDatabase Error: {e}")
+        return 1
+
+    finally:
+        queries_db_script.set_search_engine(previous_engine)
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
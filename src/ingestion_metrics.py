@@ -0,0 +1,175 @@
+"""
+Ingestion Metrics for MovieFinder Application
+Counters, latency histograms and a periodic progress line for the TMDb
+ingestion pipeline, exposed programmatically and as JSON/Prometheus files.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from query_profiling import Histogram, format_prometheus_histogram, write_text_atomically
+
+
+# Counters tracked by every IngestionMetrics instance
+COUNTER_NAMES = (
+    'api_calls',
+    'api_retries',
+    'api_rate_limited',
+    'api_failures',
+    'bytes_downloaded',
+    'movies_processed',
+    'movies_inserted',
+    'movies_failed',
+)
+
+# Histograms tracked by every IngestionMetrics instance (milliseconds)
+HISTOGRAM_NAMES = ('api_latency_ms', 'db_write_ms')
+
+
+class IngestionMetrics:
+    """
+    Metrics collected while populating the database.
+
+    Args:
+        total_movies (int): Expected number of movies, used for the ETA
+        progress_interval (float): Seconds between progress lines (0 disables them)
+        output_path (str): Optional file rewritten with every progress line
+            (JSON if it ends in .json, Prometheus text otherwise)
+        stream: File-like object for progress lines (default: sys.stdout)
+    """
+
+    def __init__(self, total_movies=None, progress_interval=10.0, output_path=None, stream=None):
+        self.total_movies = total_movies
+        self.progress_interval = progress_interval
+        self.output_path = output_path
+        self.stream = stream
+
+        self.counters = dict.fromkeys(COUNTER_NAMES, 0)
+        self.rows_written = {}
+        self.histograms = {name: Histogram() for name in HISTOGRAM_NAMES}
+
+        self.start_time = time.monotonic()
+        self._last_report = self.start_time
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1):
+        """Add amount to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_rows(self, table, count):
+        """Record rows written to a table."""
+        with self._lock:
+            self.rows_written[table] = self.rows_written.get(table, 0) + count
+
+    def observe(self, name, value_ms):
+        """Record one latency observation in milliseconds."""
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(value_ms)
+
+    @contextmanager
+    def timed(self, name):
+        """Context manager recording the duration of its block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def elapsed(self):
+        """Seconds since the metrics were created."""
+        return time.monotonic() - self.start_time
+
+    def rate(self):
+        """Movies processed per second so far."""
+        elapsed = self.elapsed()
+        return self.counters['movies_processed'] / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self):
+        """Estimated seconds until total_movies are processed, or None if unknown."""
+        rate = self.rate()
+        if not self.total_movies or rate <= 0:
+            return None
+        return max(self.total_movies - self.counters['movies_processed'], 0) / rate
+
+    def progress_line(self):
+        """Return a one-line progress summary."""
+        processed = self.counters['movies_processed']
+        total = f"/{self.total_movies}" if self.total_movies else ""
+        eta = self.eta_seconds()
+        eta_text = f"{eta / 60:.1f} min" if eta is not None else "n/a"
+        api = self.histograms['api_latency_ms']
+        return (f"[progress] {processed}{total} movies "
+                f"({self.counters['movies_inserted']} inserted, {self.counters['movies_failed']} failed) | "
+                f"{self.rate():.2f} movies/s | ETA {eta_text} | "
+                f"API calls {self.counters['api_calls']} (p95 {api.percentile(95):.0f} ms, "
+                f"{self.counters['api_rate_limited']} rate-limited) | "
+                f"{self.counters['bytes_downloaded'] / 1e6:.1f} MB")
+
+    def maybe_report_progress(self, force=False):
+        """
+        Print the progress line if progress_interval has elapsed since the last one.
+
+        Args:
+            force (bool): Report regardless of the interval
+        """
+        now = time.monotonic()
+        if not force and (not self.progress_interval or now - self._last_report < self.progress_interval):
+            return
+
+        self._last_report = now
+        print(self.progress_line(), file=self.stream or sys.stdout, flush=True)
+        if self.output_path:
+            self.write(self.output_path)
+
+    def snapshot(self):
+        """
+        Return all metrics as a plain dictionary.
+
+        Returns:
+            dict: counters, rows_written, histograms, elapsed_seconds, rate and ETA
+        """
+        with self._lock:
+            return {
+                'elapsed_seconds': round(self.elapsed(), 3),
+                'movies_per_second': round(self.rate(), 3),
+                'eta_seconds': self.eta_seconds(),
+                'counters': dict(self.counters),
+                'rows_written': dict(self.rows_written),
+                'histograms': {name: h.snapshot() for name, h in self.histograms.items()},
+            }
+
+    def prometheus_lines(self):
+        """Return all metrics in the Prometheus text format."""
+        with self._lock:
+            lines = []
+            for name, value in self.counters.items():
+                lines.append(f'# TYPE moviefinder_ingest_{name}_total counter')
+                lines.append(f'moviefinder_ingest_{name}_total {value}')
+
+            lines.append('# TYPE moviefinder_ingest_rows_written_total counter')
+            for table, value in sorted(self.rows_written.items()):
+                lines.append(f'moviefinder_ingest_rows_written_total{{table="{table}"}} {value}')
+
+            for name, histogram in self.histograms.items():
+                lines.append(f'# TYPE moviefinder_ingest_{name} histogram')
+                lines.extend(format_prometheus_histogram(f'moviefinder_ingest_{name}', histogram))
+            return lines
+
+    def write(self, path):
+        """
+        Write the metrics to a file.
+
+        Args:
+            path (str): Output path; JSON if it ends in .json, Prometheus text otherwise
+        """
+        if path.endswith('.json'):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = '\n'.join(self.prometheus_lines()) + '\n'
+        write_text_atomically(path, text)
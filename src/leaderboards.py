@@ -0,0 +1,261 @@
+"""
+Leaderboards for MovieFinder Application
+Keeps the top LEADERBOARD_SIZE movies per genre, release year and director in
+movie_leaderboards, so "top rated" views read at most N rows in index order
+instead of sorting the movies joined with genres or crew on every request.
+
+Ranking is by vote_average, then vote_count, then movie_id. Movies with fewer
+than LEADERBOARD_MIN_VOTES votes are left out, so a 10.0 from three voters
+does not top a board.
+
+Boards are maintained by api_data_retrieve.py after each movie is written
+(refresh_leaderboards()). A movie that enters, improves, or drops but still
+ranks above the board's last row is updated in place (a new entry then trims
+the board back to N rows). Only a movie that falls below the last row, under
+the vote floor or off a board (changed genres or director) has that board
+refilled from the base tables. `python src/maintenance.py rebuild-leaderboards`
+recomputes every board in one pass.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+from partitioning import year_filters
+
+# Load environment variables
+load_dotenv()
+
+# Movies kept per board
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', 100))
+
+# Minimum vote_count to appear on a board
+LEADERBOARD_MIN_VOTES = int(os.getenv('LEADERBOARD_MIN_VOTES', 200))
+
+BOARDS = ('genre', 'year', 'director')
+
+# Board order, best first, and its reverse
+RANK_ORDER = "vote_average DESC, vote_count DESC, movie_id"
+REVERSE_RANK_ORDER = "vote_average, vote_count, movie_id DESC"
+
+# One movie's board keys, as (board, key) rows, in one round trip
+MOVIE_KEYS = """
+SELECT 'genre', genre_id FROM movie_genres WHERE movie_id = %s
+UNION ALL
+SELECT 'year', YEAR(release_date) FROM movies WHERE movie_id = %s AND release_date IS NOT NULL
+UNION ALL
+SELECT DISTINCT 'director', person_id FROM movie_crew WHERE movie_id = %s AND job = 'Director'
+"""
+
+# Board -> (FROM clause, key expression) used by the full rebuild
+BOARD_SOURCES = {
+    'genre': ("movie_genres mg INNER JOIN movies m ON m.movie_id = mg.movie_id", "mg.genre_id"),
+    'year': ("movies m", "YEAR(m.release_date)"),
+    'director': ("""(SELECT DISTINCT movie_id, person_id FROM movie_crew WHERE job = 'Director') d
+                    INNER JOIN movies m ON m.movie_id = d.movie_id""", "d.person_id"),
+}
+
+INSERT_COLUMNS = "board, board_key, movie_id, title, release_year, vote_average, vote_count"
+
+LEADERBOARD_TABLE = """
+CREATE TABLE IF NOT EXISTS movie_leaderboards (
+    board ENUM('genre', 'year', 'director') NOT NULL,
+    board_key INT NOT NULL,
+    movie_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    release_year SMALLINT,
+    vote_average DECIMAL(3,1) NOT NULL,
+    vote_count INT NOT NULL,
+    PRIMARY KEY (board, board_key, movie_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# Secondary indices of movie_leaderboards: name -> columns
+LEADERBOARD_INDICES = {
+    'idx_leaderboard_rank': "board, board_key, vote_average DESC, vote_count DESC, movie_id",
+    'idx_leaderboard_movie': "movie_id",
+}
+
+
+def group_filter(board, key):
+    """
+    FROM clause and conditions selecting the movies of one board.
+
+    Returns:
+        tuple: (FROM clause, SQL fragment starting with AND, list of parameters)
+    """
+    if board == 'genre':
+        return ("movie_genres mg INNER JOIN movies m ON m.movie_id = mg.movie_id",
+                "AND mg.genre_id = %s", [key])
+    if board == 'year':
+        year_filter, params = year_filters(['m'], key, key)
+        return "movies m", year_filter, params
+    return ("movies m", """AND EXISTS (
+                SELECT 1 FROM movie_crew mc
+                WHERE mc.movie_id = m.movie_id AND mc.job = 'Director' AND mc.person_id = %s
+            )""", [key])
+
+
+def refill_board(cursor, board, key):
+    """Recompute one board from the base tables."""
+    source, conditions, params = group_filter(board, key)
+    cursor.execute("DELETE FROM movie_leaderboards WHERE board = %s AND board_key = %s", (board, key))
+    cursor.execute(f"""
+    INSERT INTO movie_leaderboards ({INSERT_COLUMNS})
+    SELECT %s, %s, m.movie_id, m.title, YEAR(m.release_date), m.vote_average, m.vote_count
+    FROM {source}
+    WHERE m.vote_count >= %s AND m.vote_average IS NOT NULL
+        {conditions}
+    ORDER BY m.{RANK_ORDER.replace(', ', ', m.')}
+    LIMIT %s
+    """, (board, key, LEADERBOARD_MIN_VOTES, *params, LEADERBOARD_SIZE))
+
+
+def trim_board(cursor, board, key):
+    """Delete the rows ranked below LEADERBOARD_SIZE on one board."""
+    cursor.execute(f"""
+    SELECT movie_id FROM movie_leaderboards
+    WHERE board = %s AND board_key = %s
+    ORDER BY {RANK_ORDER}
+    LIMIT %s, 1000
+    """, (board, key, LEADERBOARD_SIZE))
+    surplus = [row[0] for row in cursor.fetchall()]
+    if surplus:
+        cursor.execute(f"""
+        DELETE FROM movie_leaderboards
+        WHERE board = %s AND board_key = %s AND movie_id IN ({', '.join(['%s'] * len(surplus))})
+        """, (board, key, *surplus))
+
+
+def still_ranked(cursor, board, key, movie_id, rating, votes):
+    """
+    Whether a movie already on a board keeps its place with a lower rating or
+    vote count: the board is not full, or the movie still ranks above the last
+    of the other rows (every movie off the board ranks below that row).
+    """
+    cursor.execute(f"""
+    SELECT vote_average, vote_count, movie_id, COUNT(*) OVER () AS others
+    FROM movie_leaderboards
+    WHERE board = %s AND board_key = %s AND movie_id <> %s
+    ORDER BY {REVERSE_RANK_ORDER}
+    LIMIT 1
+    """, (board, key, movie_id))
+    last = cursor.fetchone()
+    if last is None or last[3] + 1 < LEADERBOARD_SIZE:
+        return True
+    return (rating, votes, -movie_id) > (last[0], last[1], -last[2])
+
+
+def refresh_leaderboards(connection, movie_ids):
+    """
+    Bring the boards of some movies up to date after their ratings, votes,
+    genres or directors changed. Commits.
+
+    Args:
+        connection: MySQL connection object
+        movie_ids (list): Movie IDs that were written
+
+    Returns:
+        int: Number of boards touched
+    """
+    cursor = connection.cursor()
+    touched = set()
+
+    try:
+        for movie_id in dict.fromkeys(int(movie_id) for movie_id in movie_ids):
+            cursor.execute("""
+            SELECT title, YEAR(release_date), vote_average, vote_count
+            FROM movies WHERE movie_id = %s
+            """, (movie_id,))
+            movie = cursor.fetchone()
+
+            keys = set()
+            if movie is not None:
+                cursor.execute(MOVIE_KEYS, (movie_id, movie_id, movie_id))
+                keys.update((board, key) for board, key in cursor.fetchall())
+            qualifies = (movie is not None and movie[2] is not None
+                         and (movie[3] or 0) >= LEADERBOARD_MIN_VOTES)
+
+            cursor.execute("""
+            SELECT board, board_key, vote_average, vote_count
+            FROM movie_leaderboards WHERE movie_id = %s
+            """, (movie_id,))
+            current = cursor.fetchall()
+
+            # Boards the movie leaves or falls to the bottom of: a movie outside may now rank higher
+            refilled = set()
+            for board, key, rating, votes in current:
+                if (not qualifies or (board, key) not in keys
+                        or ((movie[2], movie[3]) < (rating, votes)
+                            and not still_ranked(cursor, board, key, movie_id, movie[2], movie[3]))):
+                    refill_board(cursor, board, key)
+                    refilled.add((board, key))
+            present = {(board, key) for board, key, _, _ in current}
+
+            if qualifies:
+                title, year, rating, votes = movie
+                for board, key in keys - refilled:
+                    cursor.execute(f"""
+                    INSERT INTO movie_leaderboards ({INSERT_COLUMNS})
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        title = VALUES(title),
+                        release_year = VALUES(release_year),
+                        vote_average = VALUES(vote_average),
+                        vote_count = VALUES(vote_count)
+                    """, (board, key, movie_id, title, year, rating, votes))
+                    if (board, key) not in present:
+                        trim_board(cursor, board, key)
+                touched.update(keys)
+            touched.update(refilled)
+
+        connection.commit()
+        return len(touched)
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def rebuild_leaderboards(connection):
+    """
+    Recompute every board with one windowed query per board type. Commits.
+
+    Args:
+        connection: MySQL connection object
+
+    Returns:
+        int: Number of leaderboard rows written
+    """
+    cursor = connection.cursor()
+    rows = 0
+
+    try:
+        cursor.execute("DELETE FROM movie_leaderboards")
+        for board in BOARDS:
+            source, key = BOARD_SOURCES[board]
+            cursor.execute(f"""
+            INSERT INTO movie_leaderboards ({INSERT_COLUMNS})
+            SELECT %s, board_key, movie_id, title, release_year, vote_average, vote_count
+            FROM (
+                SELECT {key} AS board_key, m.movie_id, m.title, YEAR(m.release_date) AS release_year,
+                       m.vote_average, m.vote_count,
+                       ROW_NUMBER() OVER (PARTITION BY {key}
+                                          ORDER BY m.{RANK_ORDER.replace(', ', ', m.')}) AS position
+                FROM {source}
+                WHERE m.vote_count >= %s AND m.vote_average IS NOT NULL AND {key} IS NOT NULL
+            ) ranked
+            WHERE position <= %s
+            """, (board, LEADERBOARD_MIN_VOTES, LEADERBOARD_SIZE))
+            rows += cursor.rowcount
+
+        connection.commit()
+        return rows
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
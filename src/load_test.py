@@ -0,0 +1,413 @@
+"""
+Load Test for the MovieFinder Search Service
+Opens many concurrent keep-alive clients against search_service.py and reports
+throughput, latency percentiles and the status codes returned.
+
+The workload mode drives the query functions directly instead, through the same
+db_routing connection pool the service and queries_execution.py use. Closed-loop
+worker threads replay a weighted mix of query_1..query_5 at increasing
+concurrency levels. Parameters are drawn from keys sampled from the database,
+mostly a few hot ones, so coalescing, caches and cold reads are all exercised.
+Each level reports throughput, p50/p95/p99 latency, errors, timeouts and the
+time spent waiting for a pooled connection.
+
+Usage:
+    python src/load_test.py [concurrency] [seconds]
+    python src/load_test.py 200 30
+    python src/load_test.py workload [levels] [seconds]
+    python src/load_test.py workload 1,8,32,100,200 15
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from query_profiling import Histogram
+
+# Load environment variables
+load_dotenv()
+
+SERVICE_HOST = os.getenv('SERVICE_HOST', '127.0.0.1')
+SERVICE_PORT = int(os.getenv('SERVICE_PORT', 8080))
+
+# Requests drawn at random by every client
+REQUESTS = [
+    ('/query_1', {'keywords': 'space exploration'}),
+    ('/query_1', {'keywords': 'time travel'}),
+    ('/query_2', {'title': 'star'}),
+    ('/query_2', {'title': 'dark knight'}),
+    ('/query_3', {'min_movies': 20}),
+    ('/query_4', {'actor': 'Tom Hanks', 'min_collaborations': 1}),
+    ('/query_5', {'director': 'Christopher Nolan', 'min_rating': 7.0}),
+    ('/search', {'text': 'love story', 'genre': 'Drama'}),
+]
+
+# Workload mode: relative weight of each query function
+WORKLOAD_MIX = {
+    'query_1': 25,
+    'query_2': 30,
+    'query_3': 5,
+    'query_4': 20,
+    'query_5': 20,
+}
+
+# Workload mode: concurrency levels and seconds per level
+WORKLOAD_LEVELS = (1, 4, 16, 32, 64, 128, 200)
+WORKLOAD_SECONDS = float(os.getenv('WORKLOAD_SECONDS', 15))
+
+# Pooled connections shared by the workers (mysql.connector allows up to 32)
+WORKLOAD_POOL_SIZE = int(os.getenv('WORKLOAD_POOL_SIZE', 16))
+
+# Share of calls drawn from the WORKLOAD_HOT_KEYS most popular keys of each kind
+WORKLOAD_HOT_RATIO = float(os.getenv('WORKLOAD_HOT_RATIO', 0.8))
+WORKLOAD_HOT_KEYS = 10
+
+# Keys sampled from the database per kind
+WORKLOAD_KEY_SAMPLE = 1000
+
+# Write the per-level results as JSON (e.g. to plot throughput vs concurrency)
+WORKLOAD_RESULTS_FILE = os.getenv('WORKLOAD_RESULTS_FILE')
+
+# Latency buckets (ms) for the client-side histogram
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+async def fetch(reader, writer, path):
+    """
+    Send one GET on a keep-alive connection and read the full response.
+
+    Returns:
+        tuple: (HTTP status code, response body bytes)
+    """
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {SERVICE_HOST}\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def client(deadline, latency, statuses):
+    """Issue requests back to back until the deadline (closed loop)."""
+    reader, writer = await asyncio.open_connection(SERVICE_HOST, SERVICE_PORT)
+
+    try:
+        while time.perf_counter() < deadline:
+            endpoint, params = random.choice(REQUESTS)
+            start = time.perf_counter()
+            try:
+                status, _ = await fetch(reader, writer, f"{endpoint}?{urlencode(params)}")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                statuses['connection error'] = statuses.get('connection error', 0) + 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(SERVICE_HOST, SERVICE_PORT)
+                continue
+            latency.observe((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(concurrency, seconds):
+    """
+    Run the load test.
+
+    Args:
+        concurrency (int): Number of concurrent clients
+        seconds (float): Test duration
+
+    Returns:
+        tuple: (Histogram of latencies, dict of status -> count, elapsed seconds)
+    """
+    latency = Histogram(LATENCY_BUCKETS)
+    statuses = {}
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(client(deadline, latency, statuses) for _ in range(concurrency)))
+    return latency, statuses, time.perf_counter() - start
+
+
+async def fetch_health():
+    """Read the service's /health counters."""
+    reader, writer = await asyncio.open_connection(SERVICE_HOST, SERVICE_PORT)
+    try:
+        _, body = await fetch(reader, writer, '/health')
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+class KeyPool:
+    """
+    Query parameters with a hot/cold split: a call picks one of the first
+    hot_keys values with probability hot_ratio, otherwise any of the rest.
+
+    Args:
+        values (list): Keys ordered from most to least popular
+        hot_ratio (float): Probability of a hot key
+        hot_keys (int): Number of hot keys
+    """
+
+    def __init__(self, values, hot_ratio=WORKLOAD_HOT_RATIO, hot_keys=WORKLOAD_HOT_KEYS):
+        if not values:
+            raise ValueError("No keys to draw from")
+        self.hot = values[:hot_keys]
+        self.cold = values[hot_keys:] or self.hot
+        self.hot_ratio = hot_ratio
+
+    def draw(self, rng):
+        return rng.choice(self.hot if rng.random() < self.hot_ratio else self.cold)
+
+
+def sample_keys(connection, limit=WORKLOAD_KEY_SAMPLE):
+    """
+    Draw workload parameters from the database, most popular first.
+
+    Returns:
+        dict: Kind ('words', 'titles', 'actors', 'directors') -> KeyPool
+    """
+    cursor = connection.cursor()
+
+    try:
+        # LIMIT is inlined so the statements also run on the SQLite backend
+        cursor.execute(f"SELECT title FROM movies ORDER BY popularity DESC LIMIT {int(limit)}")
+        titles = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(f"""
+        SELECT p.name FROM people p
+        WHERE EXISTS (SELECT 1 FROM movie_cast mc WHERE mc.person_id = p.person_id AND mc.cast_order < 3)
+        ORDER BY p.popularity DESC LIMIT {int(limit)}
+        """)
+        actors = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(f"""
+        SELECT p.name FROM people p
+        WHERE EXISTS (SELECT 1 FROM movie_crew mc WHERE mc.person_id = p.person_id AND mc.job = 'Director')
+        ORDER BY p.popularity DESC LIMIT {int(limit)}
+        """)
+        directors = [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+    # Overview keywords: longer title words, in order of first appearance
+    words = list(dict.fromkeys(word.lower() for title in titles for word in title.split()
+                               if len(word) > 4 and word.isalpha()))
+
+    return {'words': KeyPool(words), 'titles': KeyPool(titles),
+            'actors': KeyPool(actors), 'directors': KeyPool(directors)}
+
+
+def workload_call(keys, rng):
+    """
+    Draw one call from WORKLOAD_MIX.
+
+    Returns:
+        tuple: (query name, positional arguments after the connection)
+    """
+    name = rng.choices(list(WORKLOAD_MIX), weights=list(WORKLOAD_MIX.values()))[0]
+    if name == 'query_1':
+        return name, (keys['words'].draw(rng),)
+    if name == 'query_2':
+        return name, (' '.join(keys['titles'].draw(rng).split()[:2]),)
+    if name == 'query_3':
+        return name, (rng.choice((10, 20, 50)),)
+    if name == 'query_4':
+        return name, (keys['actors'].draw(rng), rng.choice((1, 2)))
+    return name, (keys['directors'].draw(rng), rng.choice((6.0, 7.0)))
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list (0 when empty)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))]
+
+
+def run_level(router, slots, keys, concurrency, seconds):
+    """
+    Run one concurrency level: `concurrency` threads issue calls back to back
+    until the deadline. A call waits for one of the pool's slots (as the service
+    does), borrows a connection from the router and runs the query.
+
+    Returns:
+        dict: Throughput, latency and pool-wait percentiles (ms), error and timeout counts
+    """
+    import queries_db_script
+
+    latencies, waits = [], []
+    counts = {'errors': 0, 'timeouts': 0}
+    per_query = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            name, args = workload_call(keys, rng)
+            start = time.perf_counter()
+            slots.acquire()
+            try:
+                connection = router.read_connection()
+                acquired = time.perf_counter()
+                try:
+                    result = getattr(queries_db_script, name)(connection, *args)
+                    error = None
+                except Exception as e:
+                    result, error = None, e
+                finally:
+                    connection.close()
+            except Error as e:
+                acquired, result, error = time.perf_counter(), None, e
+            finally:
+                slots.release()
+            end = time.perf_counter()
+
+            with lock:
+                waits.append((acquired - start) * 1000)
+                latencies.append((end - start) * 1000)
+                per_query[name] = per_query.get(name, 0) + 1
+                # query_failed() results are empty lists flagged failed=True
+                if error is not None or getattr(result, 'failed', False):
+                    counts['errors'] += 1
+                elif getattr(result, 'timed_out', False):
+                    counts['timeouts'] += 1
+
+    threads = [threading.Thread(target=worker, args=(concurrency * 1000 + i,), daemon=True)
+               for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    waits.sort()
+    return {
+        'concurrency': concurrency,
+        'calls': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'errors': counts['errors'],
+        'timeouts': counts['timeouts'],
+        'pool_wait_p50_ms': percentile(waits, 50),
+        'pool_wait_p95_ms': percentile(waits, 95),
+        'pool_wait_mean_ms': sum(waits) / len(waits) if waits else 0.0,
+        'mix': per_query,
+    }
+
+
+def run_workload(levels=WORKLOAD_LEVELS, seconds=WORKLOAD_SECONDS, pool_size=WORKLOAD_POOL_SIZE):
+    """
+    Run the query mix at each concurrency level in turn and print one line per level.
+
+    Args:
+        levels (tuple): Concurrency levels (worker threads)
+        seconds (float): Duration of each level
+        pool_size (int): Pooled connections (and concurrent queries) per router
+
+    Returns:
+        list: Result dict of each level (see run_level)
+    """
+    from db_routing import ConnectionRouter
+
+    router = ConnectionRouter(pool_size=pool_size)
+    connection = router.read_connection()
+    try:
+        keys = sample_keys(connection)
+    finally:
+        connection.close()
+    slots = threading.BoundedSemaphore(pool_size)
+
+    print(f"{'Clients':>8}{'Calls':>9}{'Calls/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'Errors':>8}{'Timeouts':>10}{'Wait p50':>10}{'Wait p95':>10}")
+    print("-"*92)
+
+    results = []
+    for concurrency in levels:
+        level = run_level(router, slots, keys, concurrency, seconds)
+        results.append(level)
+        print(f"{concurrency:>8}{level['calls']:>9,}{level['throughput']:>10,.1f}{level['p50_ms']:>9.1f}"
+              f"{level['p95_ms']:>9.1f}{level['p99_ms']:>9.1f}{level['errors']:>8,}{level['timeouts']:>10,}"
+              f"{level['pool_wait_p50_ms']:>10.1f}{level['pool_wait_p95_ms']:>10.1f}")
+
+    return results
+
+
+def workload_main(arguments):
+    """
+    Run the workload mode: `workload [levels] [seconds]`.
+    """
+    levels = tuple(int(level) for level in arguments[0].split(',')) if arguments else WORKLOAD_LEVELS
+    seconds = float(arguments[1]) if len(arguments) > 1 else WORKLOAD_SECONDS
+
+    print(f"Query mix {WORKLOAD_MIX} on a pool of {WORKLOAD_POOL_SIZE} connections, "
+          f"{seconds:.0f}s per level, {WORKLOAD_HOT_RATIO:.0%} of calls on hot keys\n")
+    try:
+        results = run_workload(levels, seconds)
+    except (Error, ValueError) as e:
+        print(f"\nCould not run the workload: {e}")
+        return 1
+
+    best = max(results, key=lambda level: level['throughput'])
+    print(f"\nPeak throughput: {best['throughput']:,.1f} calls/s at {best['concurrency']} clients")
+
+    if WORKLOAD_RESULTS_FILE:
+        with open(WORKLOAD_RESULTS_FILE, 'w') as f:
+            json.dump({'mix': WORKLOAD_MIX, 'pool_size': WORKLOAD_POOL_SIZE, 'seconds': seconds,
+                       'hot_ratio': WORKLOAD_HOT_RATIO, 'levels': results}, f, indent=2)
+        print(f"Results written to {WORKLOAD_RESULTS_FILE}")
+    return 0
+
+
+def main():
+    """
+    Run the load test and print a summary.
+    """
+    if len(sys.argv) > 1 and sys.argv[1] == 'workload':
+        return workload_main(sys.argv[2:])
+
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"Load testing http://{SERVICE_HOST}:{SERVICE_PORT} with {concurrency} clients for {seconds:.0f}s...")
+    try:
+        latency, statuses, elapsed = asyncio.run(run(concurrency, seconds))
+    except ConnectionError as e:
+        print(f"\nCould not connect to the search service: {e}")
+        return 1
+
+    print(f"\nRequests: {latency.count:,} in {elapsed:.1f}s ({latency.count / elapsed:,.1f} req/s)")
+    print(f"Latency: p50 {latency.percentile(50):.1f} ms, p95 {latency.percentile(95):.1f} ms, "
+          f"p99 {latency.percentile(99):.1f} ms, max {latency.max:.1f} ms")
+    print("Status codes: " + ", ".join(f"{status}: {count:,}" for status, count in sorted(statuses.items(), key=str)))
+
+    coalescing = asyncio.run(fetch_health()).get('coalescing', {})
+    if coalescing:
+        print("Coalescing (since service start):")
+        for name, counts in sorted(coalescing.items()):
+            print(f"  {name:<14} {counts['calls']:>8,} calls, {counts['executions']:>8,} executions, "
+                  f"{counts['coalesced']:>8,} saved ({counts['saved_ratio']:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
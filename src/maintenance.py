@@ -0,0 +1,431 @@
+"""
+Maintenance Jobs for MovieFinder Application
+Backfills and repairs derived data on a populated database without re-crawling.
+
+Usage:
+    python src/maintenance.py rebuild-top-billing
+    python src/maintenance.py rebuild-documents  # rewrite every movie_documents row
+    python src/maintenance.py rebuild-leaderboards  # recompute every top-movies board
+    python src/maintenance.py rebuild-sketches   # recompute the genre sketches of approximate query_3
+    python src/maintenance.py dedup-credits      # remove duplicate cast/crew rows in chunks
+    python src/maintenance.py compact-credits    # dedup, then re-key cast/crew by natural keys
+    python src/maintenance.py split-movie-text   # move movies.overview into movie_texts
+    python src/maintenance.py check-integrity    # delete rows orphaned without foreign keys
+"""
+
+import sys
+import time
+
+from mysql.connector import Error
+
+from api_data_retrieve import get_db_connection, rebuild_top_billing
+from genre_sketches import rebuild_sketches
+from leaderboards import rebuild_leaderboards
+from movie_documents import rebuild_documents
+from partitioning import movie_texts_table
+
+
+# Natural key of each credit table (see create_db_script.create_tables)
+CREDIT_KEYS = {
+    'movie_cast': ('movie_id', 'cast_order'),
+    'movie_crew': ('movie_id', 'person_id', 'job'),
+}
+
+# Redundant secondary indices once a credit table is clustered by its natural key
+CLUSTERED_REDUNDANT_INDICES = {
+    'movie_cast': ('idx_movie_cast_movie_order',),
+    'movie_crew': (),
+}
+
+# Child table -> (column, parent table) references checked by check-integrity.
+# With PARTITION_BY_YEAR these are not declared as foreign keys.
+INTEGRITY_REFERENCES = {
+    'movie_genres': (('movie_id', 'movies'),),
+    'movie_texts': (('movie_id', 'movies'),),
+    'movie_top_billing': (('movie_id', 'movies'),),
+    'movie_documents': (('movie_id', 'movies'),),
+    'movie_leaderboards': (('movie_id', 'movies'),),
+    'movie_metrics_history': (('movie_id', 'movies'),),
+    'movie_metrics_daily': (('movie_id', 'movies'),),
+    'movie_metrics_weekly': (('movie_id', 'movies'),),
+    'movie_cast': (('movie_id', 'movies'), ('person_id', 'people')),
+    'movie_crew': (('movie_id', 'movies'), ('person_id', 'people')),
+}
+
+# Range of movie IDs handled per dedup transaction
+DEDUP_CHUNK_SIZE = 1000
+
+# Pause between chunks (seconds) so interactive queries keep their share of the server
+DEDUP_CHUNK_PAUSE = 0.05
+
+
+def table_has_column(connection, table, column):
+    """
+    Check whether a table in the current database has a column.
+
+    Args:
+        connection: MySQL connection object
+        table (str): Table name
+        column (str): Column name
+
+    Returns:
+        bool: True if the column exists
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        return cursor.fetchone()[0] > 0
+    finally:
+        cursor.close()
+
+
+def table_has_index(connection, table, index):
+    """Check whether a table in the current database has a named index."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table, index))
+        return cursor.fetchone()[0] > 0
+    finally:
+        cursor.close()
+
+
+def dedup_credits(connection, table, chunk_size=DEDUP_CHUNK_SIZE, pause=DEDUP_CHUNK_PAUSE):
+    """
+    Delete duplicate rows of a surrogate-keyed credit table, keeping the newest
+    row (highest id) for each natural key. Works through movie_id ranges with one
+    short transaction per chunk so the table stays usable while the job runs.
+
+    Args:
+        connection: MySQL connection object
+        table (str): 'movie_cast' or 'movie_crew'
+        chunk_size (int): Movie IDs per chunk
+        pause (float): Seconds to sleep between chunks
+
+    Returns:
+        int: Number of rows deleted
+    """
+    keys = CREDIT_KEYS[table]
+    if not table_has_column(connection, table, 'id'):
+        print(f"⚠ {table} is already keyed by {keys}, nothing to deduplicate")
+        return 0
+
+    key_list = ', '.join(keys)
+    join_condition = ' AND '.join(f"t.{key} = d.{key}" for key in keys)
+    null_condition = ' OR '.join(f"{key} IS NULL" for key in keys)
+
+    dedup_query = f"""
+    DELETE t
+    FROM {table} t
+    INNER JOIN (
+        SELECT {key_list}, MAX(id) AS keep_id
+        FROM {table}
+        WHERE movie_id BETWEEN %s AND %s
+        GROUP BY {key_list}
+        HAVING COUNT(*) > 1
+    ) d ON {join_condition}
+    WHERE t.id <> d.keep_id
+    """
+    # Rows without a complete natural key cannot be kept once the table is re-keyed
+    null_query = f"DELETE FROM {table} WHERE movie_id BETWEEN %s AND %s AND ({null_condition})"
+
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(f"SELECT MIN(movie_id), MAX(movie_id) FROM {table}")
+        low, high = cursor.fetchone()
+        if low is None:
+            return 0
+
+        deleted = 0
+        start = time.perf_counter()
+        chunk_start = low
+
+        while chunk_start <= high:
+            chunk_end = chunk_start + chunk_size - 1
+
+            cursor.execute(dedup_query, (chunk_start, chunk_end))
+            deleted += cursor.rowcount
+            cursor.execute(null_query, (chunk_start, chunk_end))
+            deleted += cursor.rowcount
+            connection.commit()
+
+            chunk_start = chunk_end + 1
+            if pause:
+                time.sleep(pause)
+
+        elapsed = time.perf_counter() - start
+        print(f"✓ {table}: deleted {deleted:,} duplicate rows in {elapsed:.2f}s")
+        return deleted
+
+    except Error as e:
+        print(f"Error deduplicating {table}: {e}")
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def credit_rekey_clause(table):
+    """
+    ALTER TABLE clause that replaces the surrogate id of a credit table with its
+    natural primary key (shared with the versioned migration in migrations.py).
+
+    Args:
+        table (str): 'movie_cast' or 'movie_crew'
+
+    Returns:
+        str: Comma-separated alter specifications
+    """
+    keys = CREDIT_KEYS[table]
+    key_types = {'movie_id': 'INT', 'person_id': 'INT', 'cast_order': 'INT', 'job': 'VARCHAR(100)'}
+    not_null = ', '.join(f"MODIFY {key} {key_types[key]} NOT NULL" for key in keys)
+    return f"DROP PRIMARY KEY, DROP COLUMN id, {not_null}, ADD PRIMARY KEY ({', '.join(keys)})"
+
+
+def compact_credits(connection, table):
+    """
+    Re-key a deduplicated credit table by its natural key, dropping the surrogate id.
+    Uses an online (ALGORITHM=INPLACE, LOCK=NONE) table rebuild, so reads and writes
+    continue while InnoDB re-clusters the rows.
+
+    Args:
+        connection: MySQL connection object
+        table (str): 'movie_cast' or 'movie_crew'
+    """
+    keys = CREDIT_KEYS[table]
+    if not table_has_column(connection, table, 'id'):
+        print(f"⚠ {table} is already keyed by {keys}, skipping")
+        return
+
+    cursor = connection.cursor()
+
+    try:
+        start = time.perf_counter()
+        cursor.execute(f"ALTER TABLE {table} {credit_rekey_clause(table)}, ALGORITHM=INPLACE, LOCK=NONE")
+        print(f"✓ {table}: re-keyed by ({', '.join(keys)}) in {time.perf_counter() - start:.2f}s")
+
+        for index in CLUSTERED_REDUNDANT_INDICES[table]:
+            if table_has_index(connection, table, index):
+                cursor.execute(f"ALTER TABLE {table} DROP INDEX {index}, ALGORITHM=INPLACE, LOCK=NONE")
+                print(f"✓ {table}: dropped redundant index {index}")
+
+    except Error as e:
+        print(f"Error compacting {table}: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def split_movie_text(connection, chunk_size=DEDUP_CHUNK_SIZE, pause=DEDUP_CHUNK_PAUSE):
+    """
+    Convert an existing database to the SPLIT_MOVIE_TEXT layout: copy overview
+    into movie_texts in movie_id chunks, index it, then drop movies.overview.
+    Run with ingestion stopped, and set SPLIT_MOVIE_TEXT=1 for every script afterwards.
+
+    Args:
+        connection: MySQL connection object
+        chunk_size (int): Movie IDs copied per transaction
+        pause (float): Seconds to sleep between chunks
+    """
+    if not table_has_column(connection, 'movies', 'overview'):
+        print("⚠ movies.overview is already split out, skipping")
+        return
+
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(movie_texts_table())
+
+        cursor.execute("SELECT MIN(movie_id), MAX(movie_id) FROM movies")
+        low, high = cursor.fetchone()
+
+        copied = 0
+        start = time.perf_counter()
+        chunk_start = low if low is not None else 1
+
+        while high is not None and chunk_start <= high:
+            chunk_end = chunk_start + chunk_size - 1
+            cursor.execute("""
+            INSERT INTO movie_texts (movie_id, title, overview)
+            SELECT movie_id, title, overview
+            FROM movies
+            WHERE movie_id BETWEEN %s AND %s
+            ON DUPLICATE KEY UPDATE
+                title = VALUES(title),
+                overview = VALUES(overview)
+            """, (chunk_start, chunk_end))
+            copied += cursor.rowcount
+            connection.commit()
+
+            chunk_start = chunk_end + 1
+            if pause:
+                time.sleep(pause)
+
+        print(f"✓ Copied overview for {copied:,} movies in {time.perf_counter() - start:.2f}s")
+
+        for index in ('idx_movie_overview', 'idx_movie_title_overview'):
+            if table_has_index(connection, 'movies', index):
+                cursor.execute(f"DROP INDEX {index} ON movies")
+
+        cursor.execute("CREATE FULLTEXT INDEX idx_movie_overview ON movie_texts(overview)")
+        cursor.execute("CREATE FULLTEXT INDEX idx_movie_title_overview ON movie_texts(title, overview)")
+        print("✓ Moved FULLTEXT indices to movie_texts")
+
+        start = time.perf_counter()
+        cursor.execute("ALTER TABLE movies DROP COLUMN overview, ALGORITHM=INPLACE, LOCK=NONE")
+        print(f"✓ Dropped movies.overview in {time.perf_counter() - start:.2f}s")
+
+    except Error as e:
+        print(f"Error splitting movie text: {e}")
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def check_integrity(connection, delete=True):
+    """
+    Find rows whose movie or person no longer exists, the job ON DELETE CASCADE
+    does when foreign keys are declared, and optionally delete them.
+
+    Args:
+        connection: MySQL connection object
+        delete (bool): Delete orphaned rows instead of only reporting them
+
+    Returns:
+        dict: (table, column) -> number of orphaned rows
+    """
+    cursor = connection.cursor()
+    orphans = {}
+
+    try:
+        for table, references in INTEGRITY_REFERENCES.items():
+            cursor.execute("""
+            SELECT COUNT(*)
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """, (table,))
+            if cursor.fetchone()[0] == 0:
+                continue
+
+            for column, parent in references:
+                key = 'movie_id' if parent == 'movies' else 'person_id'
+                condition = f"""
+                FROM {table} c
+                WHERE c.{column} IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM {parent} p WHERE p.{key} = c.{column})
+                """
+                cursor.execute("SELECT COUNT(*) " + condition)
+                count = cursor.fetchone()[0]
+                orphans[(table, column)] = count
+
+                if count and delete:
+                    cursor.execute("DELETE c " + condition)
+                    connection.commit()
+                    print(f"✓ {table}: deleted {count:,} rows without a matching {parent}.{key}")
+                elif count:
+                    print(f"⚠ {table}: {count:,} rows without a matching {parent}.{key}")
+
+        if not any(orphans.values()):
+            print("✓ No orphaned rows found")
+        return orphans
+
+    except Error as e:
+        print(f"Error checking integrity: {e}")
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def run_rebuild_top_billing(connection):
+    """Recompute movie_top_billing from movie_cast."""
+    start = time.perf_counter()
+    rows = rebuild_top_billing(connection)
+    print(f"✓ Rebuilt movie_top_billing ({rows:,} rows affected) in {time.perf_counter() - start:.2f}s")
+
+
+def run_rebuild_documents(connection):
+    """Rebuild every movie document from the normalized tables."""
+    start = time.perf_counter()
+    rows = rebuild_documents(connection)
+    print(f"✓ Rebuilt movie_documents ({rows:,} documents) in {time.perf_counter() - start:.2f}s")
+
+
+def run_rebuild_leaderboards(connection):
+    """Recompute every genre, year and director leaderboard."""
+    start = time.perf_counter()
+    rows = rebuild_leaderboards(connection)
+    print(f"✓ Rebuilt movie_leaderboards ({rows:,} rows) in {time.perf_counter() - start:.2f}s")
+
+
+def run_rebuild_sketches(connection):
+    """Recompute every genre sketch, dropping movies no longer in the genre."""
+    start = time.perf_counter()
+    genres = rebuild_sketches(connection)
+    print(f"✓ Rebuilt genre_sketches ({genres:,} genres) in {time.perf_counter() - start:.2f}s")
+
+
+def run_dedup_credits(connection):
+    """Remove duplicate rows from movie_cast and movie_crew."""
+    for table in CREDIT_KEYS:
+        dedup_credits(connection, table)
+
+
+def run_compact_credits(connection):
+    """Deduplicate, then re-key movie_cast and movie_crew by their natural keys."""
+    for table in CREDIT_KEYS:
+        dedup_credits(connection, table)
+        compact_credits(connection, table)
+
+
+# Command name -> job function taking a connection
+COMMANDS = {
+    'rebuild-top-billing': run_rebuild_top_billing,
+    'rebuild-documents': run_rebuild_documents,
+    'rebuild-leaderboards': run_rebuild_leaderboards,
+    'rebuild-sketches': run_rebuild_sketches,
+    'dedup-credits': run_dedup_credits,
+    'compact-credits': run_compact_credits,
+    'split-movie-text': split_movie_text,
+    'check-integrity': check_integrity,
+}
+
+
+def main():
+    """
+    Run the maintenance job named on the command line.
+    """
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(f"Usage: python src/maintenance.py <{'|'.join(COMMANDS)}>")
+        return 1
+
+    connection = None
+
+    try:
+        connection = get_db_connection()
+        COMMANDS[sys.argv[1]](connection)
+
+    except Error as e:
+        print(f"\nFATAL ERROR: {e}")
+        return 1
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
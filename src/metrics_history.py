@@ -0,0 +1,294 @@
+"""
+Metrics History for MovieFinder Application
+Keeps the vote_average, vote_count and popularity of every movie over time,
+which insert_movie() overwrites in movies on each sync.
+
+    movie_metrics_history   append-only, one row per movie per sync in which a
+                            value changed (unchanged movies cost nothing); all
+                            rows of a sync share its captured_at timestamp
+    movie_metrics_daily     per movie and day: samples, popularity sum/max and
+    movie_metrics_weekly    per movie and ISO week (Monday): the same, plus the
+                            last rating and vote count seen
+
+History rows are about 20 bytes before InnoDB overhead. The rollups are
+updated on every sync, changed or not, with additive upserts, so they never
+have to be recomputed from the history. api_data_retrieve.py buffers one page of
+movies and writes them with record_snapshots(); trending_movies() in
+queries_db_script.py compares recent and prior windows of the rollups.
+
+The history outlives dataset generations: blue_green.py never swaps these
+tables out. A staging load records its sync in the staging copies, which are
+merged into the live tables (merge_history()) right before the swap. The staging
+history starts empty, so it holds a row for every movie; the merge drops those
+equal to the movie's latest live row, keeping unchanged movies free there too.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Movies seeded per batch when the history is first created
+HISTORY_SEED_BATCH_SIZE = 5000
+
+# Rollup table and period length (days) of each granularity
+ROLLUPS = {
+    'daily': ('movie_metrics_daily', 1),
+    'weekly': ('movie_metrics_weekly', 7),
+}
+
+# Windows of at least this many days are compared on weekly rollups
+TRENDING_WEEKLY_FROM_DAYS = int(os.getenv('TRENDING_WEEKLY_FROM_DAYS', 28))
+
+# Prior-window average popularity a movie needs to be ranked by growth
+TRENDING_MIN_POPULARITY = float(os.getenv('TRENDING_MIN_POPULARITY', 1.0))
+
+HISTORY_TABLE = """
+CREATE TABLE IF NOT EXISTS movie_metrics_history (
+    movie_id INT NOT NULL,
+    captured_at TIMESTAMP NOT NULL,
+    vote_average DECIMAL(3,1),
+    vote_count INT,
+    popularity DECIMAL(10,3),
+    PRIMARY KEY (movie_id, captured_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci ROW_FORMAT=COMPRESSED
+"""
+
+ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    movie_id INT NOT NULL,
+    period_start DATE NOT NULL,
+    samples SMALLINT UNSIGNED NOT NULL,
+    popularity_sum DECIMAL(14,3) NOT NULL,
+    popularity_max DECIMAL(10,3) NOT NULL,
+    vote_average_last DECIMAL(3,1),
+    vote_count_last INT,
+    PRIMARY KEY (movie_id, period_start),
+    INDEX idx_{table}_period (period_start, movie_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def history_tables():
+    """Names of the history and rollup tables."""
+    return ('movie_metrics_history', *(table for table, _ in ROLLUPS.values()))
+
+
+def create_history_tables(cursor):
+    """Create the history and rollup tables if they do not exist."""
+    cursor.execute(HISTORY_TABLE)
+    for table, _ in ROLLUPS.values():
+        cursor.execute(ROLLUP_TABLE.format(table=table))
+
+
+def merge_history(connection, source_schema, target_schema):
+    """
+    Add the history and rollups recorded in another schema (a staging load) to
+    the tables of target_schema. Source history rows equal to the movie's latest
+    target row are skipped and rows already present are kept; rollup samples and
+    sums are added, and the source's last values win. Commits.
+
+    Args:
+        connection: MySQL connection object
+        source_schema (str): Schema holding the new observations
+        target_schema (str): Schema holding the long-term history
+
+    Returns:
+        int: History rows added
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(f"""
+        INSERT IGNORE INTO {target_schema}.movie_metrics_history
+            (movie_id, captured_at, vote_average, vote_count, popularity)
+        SELECT s.movie_id, s.captured_at, s.vote_average, s.vote_count, s.popularity
+        FROM {source_schema}.movie_metrics_history s
+        LEFT JOIN (
+            SELECT h.movie_id, h.vote_average, h.vote_count, h.popularity
+            FROM {target_schema}.movie_metrics_history h
+            INNER JOIN (
+                SELECT movie_id, MAX(captured_at) AS captured_at
+                FROM {target_schema}.movie_metrics_history
+                GROUP BY movie_id
+            ) last ON last.movie_id = h.movie_id AND last.captured_at = h.captured_at
+        ) live ON live.movie_id = s.movie_id
+        WHERE live.movie_id IS NULL
+            OR NOT (s.vote_average <=> live.vote_average
+                    AND s.vote_count <=> live.vote_count
+                    AND s.popularity <=> live.popularity)
+        """)
+        added = cursor.rowcount
+
+        for table, _ in ROLLUPS.values():
+            cursor.execute(f"""
+            INSERT INTO {target_schema}.{table}
+                (movie_id, period_start, samples, popularity_sum, popularity_max,
+                 vote_average_last, vote_count_last)
+            SELECT movie_id, period_start, samples, popularity_sum, popularity_max,
+                   vote_average_last, vote_count_last
+            FROM {source_schema}.{table} AS source
+            ON DUPLICATE KEY UPDATE
+                samples = {target_schema}.{table}.samples + source.samples,
+                popularity_sum = {target_schema}.{table}.popularity_sum + source.popularity_sum,
+                popularity_max = GREATEST({target_schema}.{table}.popularity_max, source.popularity_max),
+                vote_average_last = source.vote_average_last,
+                vote_count_last = source.vote_count_last
+            """)
+
+        connection.commit()
+        return added
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def period_start(day, granularity):
+    """First day of the rollup period containing a date."""
+    if granularity == 'weekly':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def record_snapshots(connection, snapshots, captured_at=None):
+    """
+    Append one sync's metrics for a batch of movies and update the rollups.
+    Commits.
+
+    Args:
+        connection: MySQL connection object
+        snapshots (list): Tuples (movie_id, vote_average, vote_count, popularity)
+        captured_at (datetime): Sync timestamp shared by the batch (default: now)
+
+    Returns:
+        int: History rows appended (movies whose values changed)
+    """
+    latest = {}
+    for movie_id, rating, votes, popularity in snapshots:
+        latest[int(movie_id)] = (rating, votes or 0, popularity or 0.0)
+    if not latest:
+        return 0
+
+    captured_at = (captured_at or datetime.now()).replace(microsecond=0)
+    cursor = connection.cursor()
+
+    try:
+        # Last stored values of the batch, to skip movies that did not change
+        placeholders = ', '.join(['%s'] * len(latest))
+        cursor.execute(f"""
+        SELECT h.movie_id, h.vote_average, h.vote_count, h.popularity
+        FROM movie_metrics_history h
+        INNER JOIN (
+            SELECT movie_id, MAX(captured_at) AS captured_at
+            FROM movie_metrics_history
+            WHERE movie_id IN ({placeholders})
+            GROUP BY movie_id
+        ) last ON last.movie_id = h.movie_id AND last.captured_at = h.captured_at
+        """, list(latest))
+        stored = {movie_id: (rating, votes, popularity) for movie_id, rating, votes, popularity in cursor.fetchall()}
+
+        changed = [
+            (movie_id, captured_at, rating, votes, popularity)
+            for movie_id, (rating, votes, popularity) in latest.items()
+            if movie_id not in stored or not same_values(stored[movie_id], (rating, votes, popularity))
+        ]
+        if changed:
+            cursor.executemany("""
+            INSERT IGNORE INTO movie_metrics_history
+                (movie_id, captured_at, vote_average, vote_count, popularity)
+            VALUES (%s, %s, %s, %s, %s)
+            """, changed)
+
+        for granularity, (table, _) in ROLLUPS.items():
+            start = period_start(captured_at.date(), granularity)
+            cursor.executemany(f"""
+            INSERT INTO {table}
+                (movie_id, period_start, samples, popularity_sum, popularity_max,
+                 vote_average_last, vote_count_last)
+            VALUES (%s, %s, 1, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                samples = samples + 1,
+                popularity_sum = popularity_sum + VALUES(popularity_sum),
+                popularity_max = GREATEST(popularity_max, VALUES(popularity_max)),
+                vote_average_last = VALUES(vote_average_last),
+                vote_count_last = VALUES(vote_count_last)
+            """, [(movie_id, start, popularity, popularity, rating, votes)
+                  for movie_id, (rating, votes, popularity) in latest.items()])
+
+        connection.commit()
+        return len(changed)
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def same_values(stored, current):
+    """Compare stored and fetched metrics at the precision of the columns."""
+    (old_rating, old_votes, old_popularity), (rating, votes, popularity) = stored, current
+    if (old_rating is None) != (rating is None):
+        return False
+    return ((rating is None or round(float(old_rating), 1) == round(float(rating), 1))
+            and int(old_votes or 0) == int(votes)
+            and round(float(old_popularity or 0), 3) == round(float(popularity), 3))
+
+
+def seed_history(connection, batch_size=HISTORY_SEED_BATCH_SIZE):
+    """
+    Record the current values of every movie as the first snapshot.
+
+    Args:
+        connection: MySQL connection object
+        batch_size (int): Movies per batch
+
+    Returns:
+        int: History rows written
+    """
+    captured_at = datetime.now()
+    written = 0
+    last_id = -1
+
+    while True:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+            SELECT movie_id, vote_average, vote_count, popularity
+            FROM movies WHERE movie_id > %s ORDER BY movie_id LIMIT %s
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        if not rows:
+            break
+        written += record_snapshots(connection, rows, captured_at)
+        last_id = rows[-1][0]
+
+    return written
+
+
+def rollup_window(days):
+    """
+    Rollup granularity and period boundaries for a trending comparison.
+
+    Args:
+        days (int): Window length; the recent window ends today
+
+    Returns:
+        tuple: (rollup table, prior window start, recent window start, recent window end)
+    """
+    granularity = 'weekly' if days >= TRENDING_WEEKLY_FROM_DAYS else 'daily'
+    table, period_days = ROLLUPS[granularity]
+    periods = max(1, days // period_days)
+
+    recent_end = period_start(datetime.now().date(), granularity) + timedelta(days=period_days)
+    recent_start = recent_end - timedelta(days=periods * period_days)
+    prior_start = recent_start - timedelta(days=periods * period_days)
+    return table, prior_start, recent_start, recent_end
@@ -0,0 +1,614 @@
+"""
+Online Schema Migrations for MovieFinder Application
+Applies versioned schema changes to a populated database without dropping it.
+
+Each ALTER is tried in the least disruptive way MySQL accepts:
+    1. ALGORITHM=INSTANT              metadata-only change
+    2. ALGORITHM=INPLACE, LOCK=NONE   online rebuild, reads and writes continue
+    3. Shadow-table copy              new table altered empty, filled in throttled
+                                      primary-key chunks while triggers mirror
+                                      live writes, then swapped in with RENAME TABLE
+    4. ALGORITHM=INPLACE, LOCK=SHARED reads continue, writes wait (last resort)
+
+Applied versions are recorded in schema_migrations together with the method,
+rows copied, copy rate and the time writes were blocked. Migrations tied to an
+opt-in layout (migration 3: CLUSTERED_CREDITS) are skipped, and stay pending,
+while that layout is not selected.
+
+Usage:
+    python src/migrations.py status   # applied and pending migrations
+    python src/migrations.py migrate  # apply pending migrations
+"""
+
+import os
+import sys
+import time
+
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from api_data_retrieve import DB_CONFIG, get_db_connection, rebuild_top_billing, top_billing_table
+from create_db_script import CLUSTERED_CREDITS
+from db_routing import DB_REPLICAS, parse_endpoints, replica_lag
+from maintenance import (CREDIT_KEYS, CLUSTERED_REDUNDANT_INDICES, credit_rekey_clause,
+                         dedup_credits, table_has_column, table_has_index)
+from genre_sketches import SKETCH_TABLE, rebuild_sketches
+from leaderboards import LEADERBOARD_INDICES, LEADERBOARD_TABLE, rebuild_leaderboards
+from metrics_history import create_history_tables, seed_history
+from movie_documents import documents_table, rebuild_documents
+from partitioning import PARTITION_BY_YEAR, SPLIT_MOVIE_TEXT
+
+# Load environment variables
+load_dotenv()
+
+# Primary-key range copied per shadow-copy chunk
+MIGRATION_CHUNK_SIZE = int(os.getenv('MIGRATION_CHUNK_SIZE', 1000))
+
+# Pause copying while more threads than this are running on the server
+MIGRATION_MAX_THREADS_RUNNING = int(os.getenv('MIGRATION_MAX_THREADS_RUNNING', 25))
+
+# Pause copying while any replica is further behind than this (seconds)
+MIGRATION_MAX_REPLICA_LAG = float(os.getenv('MIGRATION_MAX_REPLICA_LAG', 5))
+
+# Replicas to watch for lag, as "host:port,host:port" (default: DB_REPLICAS)
+MIGRATION_REPLICAS = os.getenv('MIGRATION_REPLICAS', DB_REPLICAS)
+
+# Seconds to wait before re-checking the throttle signals
+THROTTLE_SLEEP = 0.5
+
+# MySQL errors meaning "this ALGORITHM/LOCK combination is not possible"
+ALTER_NOT_SUPPORTED_ERRORS = {1845, 1846}
+
+
+class MigrationReport:
+    """Measurements of one applied migration."""
+
+    def __init__(self):
+        self.methods = []
+        self.rows_copied = 0
+        self.copy_seconds = 0.0
+        self.throttled_seconds = 0.0
+        self.lock_ms = 0.0
+        self.start = time.perf_counter()
+
+    @property
+    def rows_per_second(self):
+        return self.rows_copied / self.copy_seconds if self.copy_seconds else 0.0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def summary(self):
+        return (f"method: {', '.join(self.methods) or 'none'}, "
+                f"{self.rows_copied:,} rows copied ({self.rows_per_second:,.0f} rows/s), "
+                f"throttled {self.throttled_seconds:.1f}s, "
+                f"writes blocked {self.lock_ms:.1f} ms, total {self.elapsed:.2f}s")
+
+
+def ensure_migrations_table(connection):
+    """Create schema_migrations if it does not exist."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            method VARCHAR(100),
+            rows_copied BIGINT NOT NULL DEFAULT 0,
+            rows_per_second DECIMAL(12,1),
+            lock_ms DECIMAL(12,1),
+            duration_seconds DECIMAL(12,2)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def applied_versions(connection):
+    """Return the set of recorded migration versions."""
+    ensure_migrations_table(connection)
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def record_migration(connection, migration, report, method=None):
+    """Store a migration as applied."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        INSERT INTO schema_migrations
+            (version, name, method, rows_copied, rows_per_second, lock_ms, duration_seconds)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (migration['version'], migration['name'], method or ', '.join(report.methods),
+              report.rows_copied, report.rows_per_second, report.lock_ms, report.elapsed))
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def stamp_all(connection):
+    """
+    Mark every migration whose change the current schema already has as
+    applied. Used by create_db_script.py, whose fresh schema matches the latest
+    migrations except for opt-in layouts it was not asked to create.
+    """
+    applied = applied_versions(connection)
+    for migration in MIGRATIONS:
+        if migration['version'] not in applied and migration.get('present', always)(connection):
+            record_migration(connection, migration, MigrationReport(), method='baseline')
+
+
+def threads_running(connection):
+    """Read the server's Threads_running status variable."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+        row = cursor.fetchone()
+        return int(row[1]) if row else 0
+    finally:
+        cursor.close()
+
+
+def connect_replicas():
+    """Open connections to the replicas listed in MIGRATION_REPLICAS."""
+    replicas = []
+    for host, port in parse_endpoints(MIGRATION_REPLICAS, DB_CONFIG['port']):
+        replicas.append(mysql.connector.connect(**{**DB_CONFIG, 'host': host, 'port': port}))
+    return replicas
+
+
+def wait_for_capacity(connection, replicas):
+    """
+    Block until the server and its replicas have capacity for the next chunk.
+
+    Args:
+        connection: MySQL connection object (primary)
+        replicas (list): Replica connections to watch for lag
+
+    Returns:
+        float: Seconds spent waiting
+    """
+    waited = 0.0
+    while True:
+        running = threads_running(connection)
+        lag = max((replica_lag(replica) for replica in replicas), default=0.0)
+        if running <= MIGRATION_MAX_THREADS_RUNNING and lag <= MIGRATION_MAX_REPLICA_LAG:
+            return waited
+        time.sleep(THROTTLE_SLEEP)
+        waited += THROTTLE_SLEEP
+
+
+def table_columns(connection, table):
+    """Return the column names of a table in ordinal order."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+        """, (table,))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def primary_key_columns(connection, table):
+    """Return the primary key columns of a table in key order."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = 'PRIMARY'
+        ORDER BY SEQ_IN_INDEX
+        """, (table,))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def has_foreign_keys(connection, table):
+    """Check whether a table references, or is referenced by, a foreign key."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+        """, (table, table))
+        return cursor.fetchone()[0] > 0
+    finally:
+        cursor.close()
+
+
+def timed_execute(cursor, statement, params=None):
+    """Execute a statement and return its duration in milliseconds."""
+    start = time.perf_counter()
+    cursor.execute(statement, params)
+    return (time.perf_counter() - start) * 1000
+
+
+def shadow_copy(connection, table, clause, report, replicas=(), chunk_size=MIGRATION_CHUNK_SIZE):
+    """
+    Apply an ALTER by copying the table into an altered shadow table.
+    Triggers keep the shadow in sync while rows are copied in primary-key chunks;
+    the final RENAME TABLE swaps both tables atomically. Writes are only blocked
+    while the triggers are created and during the rename.
+
+    Tables in foreign-key relationships are not supported, because the constraints
+    would keep pointing at the original table after the swap.
+
+    Args:
+        connection: MySQL connection object
+        table (str): Table to alter
+        clause (str): ALTER TABLE specifications
+        report (MigrationReport): Receives rows copied, copy time and lock time
+        replicas (list): Replica connections used for lag throttling
+        chunk_size (int): Primary-key range copied per chunk
+    """
+    if has_foreign_keys(connection, table):
+        raise Error(msg=f"{table} has foreign keys; shadow copy is not possible")
+
+    shadow = f"_{table}_new"
+    retired = f"_{table}_old"
+    triggers = [f"_{table}_mig_{event}" for event in ('ins', 'upd', 'del')]
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {shadow}, {retired}")
+        cursor.execute(f"CREATE TABLE {shadow} LIKE {table}")
+        cursor.execute(f"ALTER TABLE {shadow} {clause}")
+
+        shadow_columns = set(table_columns(connection, shadow))
+        columns = [c for c in table_columns(connection, table) if c in shadow_columns]
+        keys = primary_key_columns(connection, table)
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"NEW.{c}" for c in columns)
+        old_key = ' AND '.join(f"{k} = OLD.{k}" for k in keys)
+
+        # Mirror live writes into the shadow table while it is being filled
+        report.lock_ms += timed_execute(cursor, f"""
+        CREATE TRIGGER {triggers[0]} AFTER INSERT ON {table} FOR EACH ROW
+            REPLACE INTO {shadow} ({column_list}) VALUES ({new_values})
+        """)
+        report.lock_ms += timed_execute(cursor, f"""
+        CREATE TRIGGER {triggers[1]} AFTER UPDATE ON {table} FOR EACH ROW
+        BEGIN
+            DELETE FROM {shadow} WHERE {old_key};
+            REPLACE INTO {shadow} ({column_list}) VALUES ({new_values});
+        END
+        """)
+        report.lock_ms += timed_execute(cursor, f"""
+        CREATE TRIGGER {triggers[2]} AFTER DELETE ON {table} FOR EACH ROW
+            DELETE FROM {shadow} WHERE {old_key}
+        """)
+
+        cursor.execute(f"SELECT MIN({keys[0]}), MAX({keys[0]}) FROM {table}")
+        low, high = cursor.fetchone()
+
+        copy_start = time.perf_counter()
+        throttled = 0.0
+        chunk_start = low
+        while low is not None and chunk_start <= high:
+            throttled += wait_for_capacity(connection, replicas)
+            chunk_end = chunk_start + chunk_size - 1
+            # INSERT IGNORE keeps rows the triggers already wrote, which are newer
+            cursor.execute(f"""
+            INSERT IGNORE INTO {shadow} ({column_list})
+            SELECT {column_list} FROM {table}
+            WHERE {keys[0]} BETWEEN %s AND %s
+            """, (chunk_start, chunk_end))
+            report.rows_copied += cursor.rowcount
+            connection.commit()
+            chunk_start = chunk_end + 1
+        report.copy_seconds += time.perf_counter() - copy_start - throttled
+        report.throttled_seconds += throttled
+
+        report.lock_ms += timed_execute(cursor, f"RENAME TABLE {table} TO {retired}, {shadow} TO {table}")
+        # The triggers moved with the retired table and are dropped along with it
+        cursor.execute(f"DROP TABLE {retired}")
+        report.methods.append(f"{table}: shadow copy")
+
+    except Error:
+        connection.rollback()
+        for trigger in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+        raise
+    finally:
+        cursor.close()
+
+
+def online_alter(connection, table, clause, report, replicas=()):
+    """
+    Apply ALTER TABLE specifications with the least blocking method available.
+
+    Args:
+        connection: MySQL connection object
+        table (str): Table to alter
+        clause (str): ALTER TABLE specifications (without ALGORITHM/LOCK)
+        report (MigrationReport): Receives method and lock time
+        replicas (list): Replica connections used for lag throttling
+    """
+    cursor = connection.cursor()
+
+    try:
+        for algorithm, lock in (('INSTANT', None), ('INPLACE', 'NONE')):
+            options = f"ALGORITHM={algorithm}" + (f", LOCK={lock}" if lock else "")
+            try:
+                elapsed = timed_execute(cursor, f"ALTER TABLE {table} {clause}, {options}")
+            except Error as e:
+                if e.errno not in ALTER_NOT_SUPPORTED_ERRORS:
+                    raise
+                continue
+            # INSTANT holds the metadata lock for the whole (short) statement;
+            # INPLACE with LOCK=NONE only briefly at its start and end
+            if algorithm == 'INSTANT':
+                report.lock_ms += elapsed
+            report.methods.append(f"{table}: {algorithm.lower()}")
+            return
+
+        if not has_foreign_keys(connection, table):
+            shadow_copy(connection, table, clause, report, replicas)
+            return
+
+        report.lock_ms += timed_execute(cursor, f"ALTER TABLE {table} {clause}, ALGORITHM=INPLACE, LOCK=SHARED")
+        report.methods.append(f"{table}: inplace (writes blocked)")
+
+    finally:
+        cursor.close()
+
+
+def create_top_billing(connection, report, replicas):
+    """Migration 1: add and backfill movie_top_billing."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(top_billing_table())
+    finally:
+        cursor.close()
+
+    start = time.perf_counter()
+    report.rows_copied += rebuild_top_billing(connection)
+    report.copy_seconds += time.perf_counter() - start
+    report.methods.append("movie_top_billing: create + backfill")
+
+
+def create_movie_documents(connection, report, replicas):
+    """Migration 4: add and backfill movie_documents."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(documents_table())
+    finally:
+        cursor.close()
+
+    start = time.perf_counter()
+    report.rows_copied += rebuild_documents(connection)
+    report.copy_seconds += time.perf_counter() - start
+    report.methods.append("movie_documents: create + backfill")
+
+
+def add_title_overview_index(connection, report, replicas):
+    """Migration 2: composite FULLTEXT index used by search_movies()."""
+    text_table = 'movie_texts' if SPLIT_MOVIE_TEXT else 'movies'
+    if table_has_index(connection, text_table, 'idx_movie_title_overview'):
+        return
+    online_alter(connection, text_table,
+                 "ADD FULLTEXT INDEX idx_movie_title_overview (title, overview)", report, replicas)
+
+
+def cluster_credit_keys(connection, report, replicas):
+    """Migration 3: key movie_cast/movie_crew by their natural keys."""
+    for table in CREDIT_KEYS:
+        if not table_has_column(connection, table, 'id'):
+            continue
+        dedup_credits(connection, table)
+        online_alter(connection, table, credit_rekey_clause(table), report, replicas)
+        for index in CLUSTERED_REDUNDANT_INDICES[table]:
+            if table_has_index(connection, table, index):
+                online_alter(connection, table, f"DROP INDEX {index}", report, replicas)
+
+
+def clustered_credits_selected(connection):
+    """Whether the clustered credit layout is configured (migration 3 runs only then)."""
+    return CLUSTERED_CREDITS or PARTITION_BY_YEAR
+
+
+def clustered_credits_present(connection):
+    """Whether both credit tables are already keyed by their natural keys."""
+    return not any(table_has_column(connection, table, 'id') for table in CREDIT_KEYS)
+
+
+def always(connection):
+    """Default 'enabled'/'present' check of a migration."""
+    return True
+
+
+def add_browse_indices(connection, report, replicas):
+    """Migration 5: indices behind browse_movies() filters, facets and sort."""
+    for index, columns in (('idx_movie_date_rating_popularity', 'release_date, vote_average, popularity'),
+                           ('idx_movie_popularity', 'popularity')):
+        if not table_has_index(connection, 'movies', index):
+            online_alter(connection, 'movies', f"ADD INDEX {index} ({columns})", report, replicas)
+
+
+def create_leaderboards(connection, report, replicas):
+    """Migration 6: add and backfill movie_leaderboards."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(LEADERBOARD_TABLE)
+        for name, columns in LEADERBOARD_INDICES.items():
+            if not table_has_index(connection, 'movie_leaderboards', name):
+                cursor.execute(f"CREATE INDEX {name} ON movie_leaderboards({columns})")
+    finally:
+        cursor.close()
+
+    start = time.perf_counter()
+    report.rows_copied += rebuild_leaderboards(connection)
+    report.copy_seconds += time.perf_counter() - start
+    report.methods.append("movie_leaderboards: create + backfill")
+
+
+def create_metrics_history(connection, report, replicas):
+    """Migration 7: add the metrics history and rollups, seeded with current values."""
+    cursor = connection.cursor()
+
+    try:
+        create_history_tables(cursor)
+    finally:
+        cursor.close()
+
+    start = time.perf_counter()
+    report.rows_copied += seed_history(connection)
+    report.copy_seconds += time.perf_counter() - start
+    report.methods.append("movie_metrics_history: create + seed")
+
+
+def create_genre_sketches(connection, report, replicas):
+    """Migration 8: add and build genre_sketches."""
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(SKETCH_TABLE)
+    finally:
+        cursor.close()
+
+    start = time.perf_counter()
+    report.rows_copied += rebuild_sketches(connection)
+    report.copy_seconds += time.perf_counter() - start
+    report.methods.append("genre_sketches: create + build")
+
+
+# Ordered schema history; create_db_script.py creates the final state directly.
+# Optional keys: 'enabled' (run only when it returns True) and 'present' (the
+# schema already has the change, so stamp_all() may record it); both take the connection
+MIGRATIONS = [
+    {'version': 1, 'name': 'create_movie_top_billing', 'apply': create_top_billing},
+    {'version': 2, 'name': 'add_title_overview_fulltext', 'apply': add_title_overview_index},
+    {'version': 3, 'name': 'cluster_credit_keys', 'apply': cluster_credit_keys,
+     'enabled': clustered_credits_selected, 'present': clustered_credits_present},
+    {'version': 4, 'name': 'create_movie_documents', 'apply': create_movie_documents},
+    {'version': 5, 'name': 'add_browse_indices', 'apply': add_browse_indices},
+    {'version': 6, 'name': 'create_movie_leaderboards', 'apply': create_leaderboards},
+    {'version': 7, 'name': 'create_metrics_history', 'apply': create_metrics_history},
+    {'version': 8, 'name': 'create_genre_sketches', 'apply': create_genre_sketches},
+]
+
+
+def migrate(connection, replicas=()):
+    """
+    Apply all pending migrations in version order.
+
+    Args:
+        connection: MySQL connection object
+        replicas (list): Replica connections used for lag throttling
+
+    Returns:
+        list: List of tuples (migration, MigrationReport) for applied migrations
+    """
+    applied = applied_versions(connection)
+    results = []
+
+    for migration in MIGRATIONS:
+        if migration['version'] in applied:
+            continue
+        if not migration.get('enabled', always)(connection):
+            print(f"\n⚠ Skipping migration {migration['version']}: {migration['name']} (not enabled)")
+            continue
+
+        print(f"\nApplying migration {migration['version']}: {migration['name']}")
+        report = MigrationReport()
+        try:
+            migration['apply'](connection, report, replicas)
+        except Error as e:
+            print(f"✗ Migration {migration['version']} failed: {e}")
+            raise
+
+        record_migration(connection, migration, report)
+        print(f"✓ {report.summary()}")
+        results.append((migration, report))
+
+    if not results:
+        print("✓ Schema is up to date")
+    return results
+
+
+def show_status(connection):
+    """Print applied and pending migrations."""
+    applied = applied_versions(connection)
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT version, applied_at, method, rows_copied, rows_per_second, lock_ms
+        FROM schema_migrations
+        """)
+        history = {row[0]: row[1:] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+    for migration in MIGRATIONS:
+        version = migration['version']
+        if version in applied:
+            applied_at, method, rows, rate, lock_ms = history[version]
+            print(f"  [x] {version:>3} {migration['name']:<32} {applied_at}  {method} "
+                  f"({rows:,} rows, {rate or 0:,.0f} rows/s, {lock_ms or 0:.1f} ms blocked)")
+        elif not migration.get('enabled', always)(connection):
+            print(f"  [-] {version:>3} {migration['name']} (not enabled)")
+        else:
+            print(f"  [ ] {version:>3} {migration['name']}")
+
+
+def main():
+    """
+    Show migration status or apply pending migrations.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    if command not in ('status', 'migrate'):
+        print("Usage: python src/migrations.py <status|migrate>")
+        return 1
+
+    connection = None
+    replicas = []
+
+    try:
+        connection = get_db_connection()
+        if command == 'migrate':
+            replicas = connect_replicas()
+            migrate(connection, replicas)
+        else:
+            show_status(connection)
+
+    except Error as e:
+        print(f"\nFATAL ERROR: {e}")
+        return 1
+
+    finally:
+        for replica in replicas:
+            replica.close()
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
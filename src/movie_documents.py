@@ -0,0 +1,218 @@
+"""
+Movie Documents for MovieFinder Application
+Keeps one JSON document per movie in movie_documents, holding everything a
+detail page shows (movie fields, genres, directors and crew, top cast), so a
+movie is read with a single primary-key lookup instead of joins across six
+tables.
+
+Documents are written by api_data_retrieve.py after each movie's genres and
+credits are stored. Changes made outside ingestion (direct edits, renamed
+people or genres) are picked up with refresh_documents() for the affected
+movies or `python src/maintenance.py rebuild-documents` for all of them.
+"""
+
+import json
+
+from partitioning import PARTITION_BY_YEAR, SPLIT_MOVIE_TEXT
+
+# Cast members kept in a document (ingestion stores the top 8)
+DOCUMENT_CAST_SIZE = 8
+
+# Movies assembled per round of queries during a rebuild
+DOCUMENT_BATCH_SIZE = 1000
+
+DOCUMENTS_TABLE = """
+CREATE TABLE IF NOT EXISTS movie_documents (
+    movie_id INT PRIMARY KEY,
+    document JSON NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP{movie_fk}
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def documents_table(partition_by_year=PARTITION_BY_YEAR):
+    """CREATE TABLE statement of movie_documents (no foreign key when movies is partitioned)."""
+    movie_fk = "" if partition_by_year else \
+        ",\n    FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE"
+    return DOCUMENTS_TABLE.format(movie_fk=movie_fk)
+
+
+def _number(value):
+    """JSON-friendly number (mysql.connector returns DECIMAL as Decimal)."""
+    return float(value) if value is not None and not isinstance(value, int) else value
+
+
+def _fetch(connection, query, params):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def build_documents(connection, movie_ids):
+    """
+    Assemble the documents of several movies from the normalized tables,
+    with one query per component for the whole batch.
+
+    Args:
+        connection: MySQL connection object
+        movie_ids (list): Movie IDs
+
+    Returns:
+        dict: movie_id -> document dict (movies that do not exist are left out)
+    """
+    movie_ids = list(dict.fromkeys(int(movie_id) for movie_id in movie_ids))
+    if not movie_ids:
+        return {}
+
+    placeholders = ', '.join(['%s'] * len(movie_ids))
+    if SPLIT_MOVIE_TEXT:
+        source, t = "movies m LEFT JOIN movie_texts t ON t.movie_id = m.movie_id", 't'
+    else:
+        source, t = "movies m", 'm'
+
+    documents = {}
+    for row in _fetch(connection, f"""
+        SELECT m.movie_id, m.title, {t}.overview, m.release_date, m.runtime, m.budget, m.revenue,
+               m.vote_average, m.vote_count, m.popularity, m.original_language
+        FROM {source}
+        WHERE m.movie_id IN ({placeholders})
+        """, movie_ids):
+        movie_id, title, overview, release_date, runtime, budget, revenue, rating, votes, popularity, language = row
+        documents[movie_id] = {
+            'movie_id': movie_id,
+            'title': title,
+            'overview': overview,
+            'release_date': release_date.isoformat() if release_date else None,
+            'year': release_date.year if release_date else None,
+            'runtime': runtime,
+            'budget': budget,
+            'revenue': revenue,
+            'vote_average': _number(rating),
+            'vote_count': votes,
+            'popularity': _number(popularity),
+            'original_language': language,
+            'genres': [],
+            'directors': [],
+            'crew': [],
+            'cast': [],
+        }
+
+    for movie_id, genre_id, genre_name in _fetch(connection, f"""
+        SELECT mg.movie_id, g.genre_id, g.genre_name
+        FROM movie_genres mg
+        INNER JOIN genres g ON mg.genre_id = g.genre_id
+        WHERE mg.movie_id IN ({placeholders})
+        ORDER BY mg.movie_id, g.genre_name
+        """, movie_ids):
+        if movie_id in documents:
+            documents[movie_id]['genres'].append({'genre_id': genre_id, 'name': genre_name})
+
+    for movie_id, person_id, name, job in _fetch(connection, f"""
+        SELECT mcr.movie_id, p.person_id, p.name, mcr.job
+        FROM movie_crew mcr
+        INNER JOIN people p ON mcr.person_id = p.person_id
+        WHERE mcr.movie_id IN ({placeholders})
+        ORDER BY mcr.movie_id, mcr.job, p.name
+        """, movie_ids):
+        if movie_id in documents:
+            person = {'person_id': person_id, 'name': name}
+            documents[movie_id]['crew'].append({**person, 'job': job})
+            if job == 'Director':
+                documents[movie_id]['directors'].append(person)
+
+    for movie_id, person_id, name, character, order in _fetch(connection, f"""
+        SELECT mc.movie_id, p.person_id, p.name, mc.character_name, mc.cast_order
+        FROM movie_cast mc
+        INNER JOIN people p ON mc.person_id = p.person_id
+        WHERE mc.movie_id IN ({placeholders}) AND mc.cast_order < %s
+        ORDER BY mc.movie_id, mc.cast_order
+        """, (*movie_ids, DOCUMENT_CAST_SIZE)):
+        if movie_id in documents:
+            documents[movie_id]['cast'].append(
+                {'person_id': person_id, 'name': name, 'character': character, 'order': order})
+
+    return documents
+
+
+def refresh_documents(connection, movie_ids):
+    """
+    Rebuild and store the documents of some movies; documents of movies that
+    no longer exist are removed. Commits.
+
+    Args:
+        connection: MySQL connection object
+        movie_ids (list): Movie IDs whose data changed
+
+    Returns:
+        int: Number of documents written
+    """
+    movie_ids = list(dict.fromkeys(int(movie_id) for movie_id in movie_ids))
+    if not movie_ids:
+        return 0
+
+    documents = build_documents(connection, movie_ids)
+    cursor = connection.cursor()
+
+    try:
+        if documents:
+            cursor.executemany("""
+            INSERT INTO movie_documents (movie_id, document)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE document = VALUES(document)
+            """, [(movie_id, json.dumps(document, ensure_ascii=False))
+                  for movie_id, document in documents.items()])
+
+        missing = [movie_id for movie_id in movie_ids if movie_id not in documents]
+        if missing:
+            cursor.execute(f"DELETE FROM movie_documents WHERE movie_id IN ({', '.join(['%s'] * len(missing))})",
+                           missing)
+
+        connection.commit()
+        return len(documents)
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def rebuild_documents(connection, batch_size=DOCUMENT_BATCH_SIZE):
+    """
+    Rebuild the document of every movie, in movie_id order and batches, and
+    remove documents of deleted movies.
+
+    Args:
+        connection: MySQL connection object
+        batch_size (int): Movies per batch
+
+    Returns:
+        int: Number of documents written
+    """
+    written = 0
+    last_id = -1
+
+    while True:
+        movie_ids = [row[0] for row in _fetch(connection, """
+            SELECT movie_id FROM movies WHERE movie_id > %s ORDER BY movie_id LIMIT %s
+            """, (last_id, batch_size))]
+        if not movie_ids:
+            break
+        written += refresh_documents(connection, movie_ids)
+        last_id = movie_ids[-1]
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+        DELETE d FROM movie_documents d
+        LEFT JOIN movies m ON m.movie_id = d.movie_id
+        WHERE m.movie_id IS NULL
+        """)
+        connection.commit()
+    finally:
+        cursor.close()
+
+    return written
@@ -0,0 +1,334 @@
+"""
+Release-Year Partitioning for MovieFinder Application
+Optional RANGE partitioning of movies, movie_cast and movie_crew by release year,
+plus tooling to add future partitions and measure partition pruning.
+
+MySQL does not allow foreign keys or FULLTEXT indices on partitioned tables, so in
+this mode referential integrity is enforced by api_data_retrieve.py (and checked by
+`maintenance.py check-integrity`), and all FULLTEXT search runs on movie_texts.
+Every partitioned table carries a release_year column (0 = unknown) that is part
+of its primary key.
+
+Usage:
+    python src/partitioning.py list                 # partitions and row counts
+    python src/partitioning.py add-partitions 2030  # yearly partitions through 2030
+    python src/partitioning.py bench                # pruning benchmark for query_3..5
+"""
+
+import os
+import re
+import statistics
+import sys
+import time
+from datetime import date
+
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from query_profiling import QueryProfiler, enable_profiling, disable_profiling, get_profiler
+
+# Load environment variables
+load_dotenv()
+
+# Partition movies and credit tables by release year (implies SPLIT_MOVIE_TEXT)
+PARTITION_BY_YEAR = os.getenv('PARTITION_BY_YEAR', '0') == '1'
+
+# Keep large text fields in movie_texts so movies stays narrow for analytic scans
+SPLIT_MOVIE_TEXT = os.getenv('SPLIT_MOVIE_TEXT', '0') == '1' or PARTITION_BY_YEAR
+
+# Tables partitioned by release_year
+PARTITIONED_TABLES = ('movies', 'movie_cast', 'movie_crew')
+
+# Decade partitions before this year, yearly partitions from it on
+FIRST_YEARLY_PARTITION = 2000
+
+# Catch-all partition that new yearly partitions are split from
+FUTURE_PARTITION = 'p_future'
+
+PARTITION_NAME_RE = re.compile(r"^p(\d{4})$")
+
+# Side table of the SPLIT_MOVIE_TEXT layout (see create_db_script.create_tables())
+MOVIE_TEXTS_TABLE = """
+CREATE TABLE IF NOT EXISTS movie_texts (
+    movie_id INT PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    overview TEXT{movie_fk}
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+
+def movie_texts_table(partition_by_year=PARTITION_BY_YEAR):
+    """CREATE TABLE statement of movie_texts (no foreign key when movies is partitioned)."""
+    movie_fk = "" if partition_by_year else \
+        ",\n    FOREIGN KEY (movie_id) REFERENCES movies(movie_id) ON DELETE CASCADE"
+    return MOVIE_TEXTS_TABLE.format(movie_fk=movie_fk)
+
+
+def partition_clause(through_year=None):
+    """
+    Build the PARTITION BY clause shared by all partitioned tables.
+
+    Args:
+        through_year (int): Last year with its own partition (default: next year)
+
+    Returns:
+        str: PARTITION BY RANGE (release_year) (...) clause
+    """
+    if through_year is None:
+        through_year = date.today().year + 1
+
+    partitions = ["PARTITION p_unknown VALUES LESS THAN (1)",
+                  "PARTITION p_pre1950 VALUES LESS THAN (1950)"]
+    for decade in range(1950, FIRST_YEARLY_PARTITION, 10):
+        partitions.append(f"PARTITION p{decade}s VALUES LESS THAN ({decade + 10})")
+    for year in range(FIRST_YEARLY_PARTITION, through_year + 1):
+        partitions.append(f"PARTITION p{year} VALUES LESS THAN ({year + 1})")
+    partitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+
+    return "PARTITION BY RANGE (release_year) (\n            " + ",\n            ".join(partitions) + "\n        )"
+
+
+def year_filters(aliases, year_from=None, year_to=None):
+    """
+    Build release-year conditions that allow partition pruning.
+
+    With PARTITION_BY_YEAR every alias is filtered on its release_year column (the
+    partition key). Otherwise only the first alias, which must be movies, is filtered
+    with a sargable release_date range.
+
+    Args:
+        aliases (list): Table aliases; the first one is the movies alias
+        year_from (int): Earliest release year (inclusive)
+        year_to (int): Latest release year (inclusive)
+
+    Returns:
+        tuple: (SQL fragment starting with AND, or "", list of parameters)
+    """
+    conditions = []
+    params = []
+
+    if PARTITION_BY_YEAR:
+        for alias in aliases:
+            if year_from is not None:
+                conditions.append(f"{alias}.release_year >= %s")
+                params.append(int(year_from))
+            if year_to is not None:
+                conditions.append(f"{alias}.release_year <= %s")
+                params.append(int(year_to))
+    else:
+        alias = aliases[0]
+        if year_from is not None:
+            conditions.append(f"{alias}.release_date >= %s")
+            params.append(f"{int(year_from)}-01-01")
+        if year_to is not None:
+            conditions.append(f"{alias}.release_date < %s")
+            params.append(f"{int(year_to) + 1}-01-01")
+
+    if not conditions:
+        return "", []
+    return "AND " + " AND ".join(conditions), params
+
+
+def list_partitions(connection, table='movies'):
+    """
+    Read the partitions of a table.
+
+    Args:
+        connection: MySQL connection object
+        table (str): Table name
+
+    Returns:
+        list: List of tuples (partition_name, upper_bound, table_rows)
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """, (table,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def add_year_partitions(connection, through_year):
+    """
+    Split yearly partitions out of the catch-all partition up to through_year.
+    REORGANIZE PARTITION only touches rows in p_future, which is normally empty.
+
+    Args:
+        connection: MySQL connection object
+        through_year (int): Last year that should have its own partition
+
+    Returns:
+        int: Number of partitions added per table
+    """
+    cursor = connection.cursor()
+
+    try:
+        added = 0
+        for table in PARTITIONED_TABLES:
+            years = []
+            for name, _, _ in list_partitions(connection, table):
+                match = PARTITION_NAME_RE.match(name or '')
+                if match:
+                    years.append(int(match.group(1)))
+            if not years:
+                print(f"⚠ {table} is not partitioned by year, skipping")
+                continue
+
+            new_years = list(range(max(years) + 1, through_year + 1))
+            if not new_years:
+                print(f"✓ {table} already has partitions through {max(years)}")
+                continue
+
+            definitions = [f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in new_years]
+            definitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+            cursor.execute(f"""
+            ALTER TABLE {table}
+            REORGANIZE PARTITION {FUTURE_PARTITION} INTO ({', '.join(definitions)})
+            """)
+            added = len(new_years)
+            print(f"✓ {table}: added partitions p{new_years[0]}..p{new_years[-1]}")
+
+        return added
+
+    except Error as e:
+        print(f"Error adding partitions: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def explain_partitions(connection, func, args, kwargs):
+    """
+    Count the partitions each table access touches for one query call.
+
+    Args:
+        connection: MySQL connection object
+        func: Query function from queries_db_script
+        args (tuple): Positional arguments after the connection
+        kwargs (dict): Keyword arguments
+
+    Returns:
+        dict: Table alias -> number of partitions read
+    """
+    statements = []
+
+    class StatementSink:
+        def emit(self, sample):
+            statements.append((sample['statement'], sample['params']))
+
+    previous = get_profiler()
+    enable_profiling(QueryProfiler(sinks=[StatementSink()]))
+    try:
+        func(connection, *args, **kwargs)
+    finally:
+        if previous is None:
+            disable_profiling()
+        else:
+            enable_profiling(previous)
+
+    touched = {}
+    cursor = connection.cursor(dictionary=True)
+
+    try:
+        for statement, params in statements:
+            if not statement:
+                continue
+            cursor.execute("EXPLAIN " + statement, params)
+            for row in cursor.fetchall():
+                if row.get('partitions'):
+                    touched[row['table']] = len(row['partitions'].split(','))
+        return touched
+    finally:
+        cursor.close()
+
+
+def benchmark(connection, year_from=2015, year_to=2020, repeats=5):
+    """
+    Compare query_3..query_5 with and without a year range.
+
+    Args:
+        connection: MySQL connection object
+        year_from (int): Start of the year range
+        year_to (int): End of the year range
+        repeats (int): Timed calls per variant
+
+    Returns:
+        list: List of tuples (query, variant, median ms, partitions touched)
+    """
+    import queries_db_script
+
+    calls = [
+        ('query_3', queries_db_script.query_3, (5,)),
+        ('query_4', queries_db_script.query_4, ("Tom Hanks", 1)),
+        ('query_5', queries_db_script.query_5, ("Steven Spielberg", 6.0)),
+    ]
+
+    results = []
+    for name, func, args in calls:
+        for variant, kwargs in (('all years', {}),
+                                (f'{year_from}-{year_to}', {'year_from': year_from, 'year_to': year_to})):
+            func(connection, *args, **kwargs)  # Warm-up
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                func(connection, *args, **kwargs)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            partitions = explain_partitions(connection, func, args, kwargs)
+            results.append((name, variant, statistics.median(timings), partitions))
+
+    return results
+
+
+def main():
+    """
+    List partitions, add future partitions, or run the pruning benchmark.
+    """
+    from api_data_retrieve import get_db_connection
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    connection = None
+
+    try:
+        connection = get_db_connection()
+
+        if command == 'list':
+            for table in PARTITIONED_TABLES:
+                print(f"\n{table}:")
+                for name, bound, rows in list_partitions(connection, table):
+                    print(f"  {name:<12} < {bound:<10} {rows:>10,} rows")
+
+        elif command == 'add-partitions':
+            through_year = int(sys.argv[2]) if len(sys.argv) > 2 else date.today().year + 2
+            add_year_partitions(connection, through_year)
+
+        elif command == 'bench':
+            print(f"{'Query':<10}{'Years':<14}{'Median ms':<12}{'Partitions read'}")
+            print("-"*60)
+            for name, variant, median_ms, partitions in benchmark(connection):
+                touched = ', '.join(f"{alias}={count}" for alias, count in sorted(partitions.items()))
+                print(f"{name:<10}{variant:<14}{median_ms:<12.2f}{touched or 'n/a'}")
+
+        else:
+            print("Usage: python src/partitioning.py <list|add-partitions [year]|bench>")
+            return 1
+
+    except Error as e:
+        print(f"\nDatabase Error: {e}")
+        return 1
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
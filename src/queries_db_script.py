@@ -3,10 +3,103 @@ Database Query Functions for MovieFinder Application
 Implements 5 main queries: 2 full-text searches and 3 complex queries.
 """
 
+import json
+import os
+import sqlite3
+
 import mysql.connector
 from mysql.connector import Error
+from dotenv import load_dotenv
+
+import genre_sketches
+import movie_documents
+import search_index
+import similarity_index
+import sqlite_backend
+from leaderboards import BOARDS, LEADERBOARD_SIZE
+from metrics_history import TRENDING_MIN_POPULARITY, rollup_window
+from partitioning import PARTITION_BY_YEAR, SPLIT_MOVIE_TEXT, year_filters
+from query_budgets import budgeted, budget_hint, query_failed
+from query_profiling import profiled, execute_statement
+from request_coalescing import coalesced
+
+# Load environment variables
+load_dotenv()
+
+# Extra weight given to title matches in search_movies()
+TITLE_MATCH_WEIGHT = 2.0
+
+# Engine used by query_1/query_2: 'mysql' (FULLTEXT) or 'local' (embedded BM25 index)
+SEARCH_ENGINES = ('mysql', 'local')
+SEARCH_ENGINE = os.getenv('SEARCH_ENGINE', 'mysql')
+
+# Sort orders accepted by browse_movies(): name -> ORDER BY expression
+BROWSE_SORTS = {
+    'popularity': 'm.popularity DESC',
+    'rating': 'm.vote_average DESC',
+    'votes': 'm.vote_count DESC',
+    'newest': 'm.release_date DESC',
+    'oldest': 'm.release_date ASC',
+}
+
+# Largest page returned by browse_movies()
+BROWSE_MAX_PAGE_SIZE = 100
+
+
+def set_search_engine(engine):
+    """
+    Select the engine used by query_1 and query_2.
+
+    Args:
+        engine (str): 'mysql' for InnoDB FULLTEXT, 'local' for the embedded index
+    """
+    global SEARCH_ENGINE
+
+    if engine not in SEARCH_ENGINES:
+        raise ValueError(f"Unknown search engine: {engine}")
+    SEARCH_ENGINE = engine
 
 
+def text_source():
+    """
+    FROM clause and alias for queries that read the overview text.
+
+    Returns:
+        tuple: (from_clause, alias of the table holding title/overview for FULLTEXT)
+    """
+    if SPLIT_MOVIE_TEXT:
+        return "movie_texts t INNER JOIN movies m ON m.movie_id = t.movie_id", 't'
+    return "movies m", 'm'
+
+
+def title_source():
+    """
+    FROM clause and alias for queries that search the title.
+    Partitioned movies cannot carry a FULLTEXT index, so the title copy in
+    movie_texts is searched instead.
+
+    Returns:
+        tuple: (from_clause, alias of the table holding the title FULLTEXT index)
+    """
+    if PARTITION_BY_YEAR:
+        return text_source()
+    return "movies m", 'm'
+
+
+def local_search(name, method, text):
+    """
+    Run a query_1/query_2 search on the embedded index (search_index.py). The
+    index is only loaded from its file, never built on the request path.
+    """
+    index = search_index.shared_index()
+    if index is None:
+        return query_failed(name, FileNotFoundError(f"No search index at {search_index.SEARCH_INDEX_PATH}"))
+    return getattr(index, method)(text)
+
+
+@coalesced('query_1')
+@budgeted('query_1')
+@profiled('query_1')
 def query_1(connection, keywords):
     """
     Query 1: Full-Text Search for Movies by Overview Keywords (FULLTEXT)
@@ -21,37 +114,46 @@ def query_1(connection, keywords):
     Returns:
         list: List of tuples (title, rating, year, overview_snippet)
     """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.query_1(connection, keywords)
+
+    if SEARCH_ENGINE == 'local':
+        return local_search('query_1', 'search_overview', keywords)
+
     cursor = connection.cursor()
+    source, t = text_source()
 
     try:
         # Full-text search with MATCH AGAINST
         # Uses natural language mode for relevance ranking
-        query = """
-        SELECT
+        query = f"""
+        SELECT {budget_hint('query_1')}
             m.title,
             m.vote_average AS rating,
             YEAR(m.release_date) AS year,
-            LEFT(m.overview, 150) AS overview_snippet,
-            MATCH(m.overview) AGAINST(%s) AS relevance_score
-        FROM movies m
-        WHERE MATCH(m.overview) AGAINST(%s IN NATURAL LANGUAGE MODE)
+            LEFT({t}.overview, 150) AS overview_snippet,
+            MATCH({t}.overview) AGAINST(%s) AS relevance_score
+        FROM {source}
+        WHERE MATCH({t}.overview) AGAINST(%s IN NATURAL LANGUAGE MODE)
         ORDER BY relevance_score DESC, m.vote_average DESC
         LIMIT 20
         """
 
-        cursor.execute(query, (keywords, keywords))
+        execute_statement(cursor, query, (keywords, keywords))
         results = cursor.fetchall()
 
         return results
 
     except Error as e:
-        print(f"Error executing query_1: {e}")
-        return []
+        return query_failed('query_1', e)
 
     finally:
         cursor.close()
 
 
+@coalesced('query_2')
+@budgeted('query_2')
+@profiled('query_2')
 def query_2(connection, search_term):
     """
     Query 2: Full-Text Search for Movies by Title (FULLTEXT)
@@ -66,37 +168,46 @@ def query_2(connection, search_term):
     Returns:
         list: List of tuples (title, rating, year, popularity)
     """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.query_2(connection, search_term)
+
+    if SEARCH_ENGINE == 'local':
+        return local_search('query_2', 'search_title', search_term)
+
     cursor = connection.cursor()
+    source, t = title_source()
 
     try:
         # Full-text search on title with relevance scoring
-        query = """
-        SELECT
+        query = f"""
+        SELECT {budget_hint('query_2')}
             m.title,
             m.vote_average AS rating,
             YEAR(m.release_date) AS year,
             m.popularity,
-            MATCH(m.title) AGAINST(%s) AS relevance_score
-        FROM movies m
-        WHERE MATCH(m.title) AGAINST(%s IN NATURAL LANGUAGE MODE)
+            MATCH({t}.title) AGAINST(%s) AS relevance_score
+        FROM {source}
+        WHERE MATCH({t}.title) AGAINST(%s IN NATURAL LANGUAGE MODE)
         ORDER BY relevance_score DESC, m.popularity DESC
         LIMIT 20
         """
 
-        cursor.execute(query, (search_term, search_term))
+        execute_statement(cursor, query, (search_term, search_term))
         results = cursor.fetchall()
 
         return results
 
     except Error as e:
-        print(f"Error executing query_2: {e}")
-        return []
+        return query_failed('query_2', e)
 
     finally:
         cursor.close()
 
 
-def query_3(connection, min_movies=20):
+@coalesced('query_3')
+@budgeted('query_3')
+@profiled('query_3')
+def query_3(connection, min_movies=20, year_from=None, year_to=None):
     """
     Query 3: Top-Rated Movies by Genre with Revenue Analysis (Complex - GROUP BY, Aggregation)
 
@@ -106,16 +217,22 @@ def query_3(connection, min_movies=20):
     Args:
         connection: MySQL connection object
         min_movies (int): Minimum number of movies required for a genre (default: 20)
+        year_from (int): Only count movies released in or after this year
+        year_to (int): Only count movies released in or before this year
 
     Returns:
         list: List of tuples (genre_name, avg_rating, movie_count, total_revenue)
     """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.query_3(connection, min_movies, year_from, year_to)
+
     cursor = connection.cursor()
+    year_filter, year_params = year_filters(['m'], year_from, year_to)
 
     try:
         # Complex query with joins, grouping, aggregation, and HAVING clause
-        query = """
-        SELECT
+        query = f"""
+        SELECT {budget_hint('query_3')}
             g.genre_name,
             ROUND(AVG(m.vote_average), 2) AS avg_rating,
             COUNT(DISTINCT m.movie_id) AS movie_count,
@@ -125,25 +242,80 @@ def query_3(connection, min_movies=20):
         INNER JOIN movie_genres mg ON g.genre_id = mg.genre_id
         INNER JOIN movies m ON mg.movie_id = m.movie_id
         WHERE m.vote_average IS NOT NULL
+            {year_filter}
         GROUP BY g.genre_id, g.genre_name
         HAVING COUNT(DISTINCT m.movie_id) >= %s
         ORDER BY avg_rating DESC, movie_count DESC
         """
 
-        cursor.execute(query, (min_movies,))
+        execute_statement(cursor, query, (*year_params, min_movies))
         results = cursor.fetchall()
 
         return results
 
     except Error as e:
-        print(f"Error executing query_3: {e}")
-        return []
+        return query_failed('query_3', e)
 
     finally:
         cursor.close()
 
 
-def query_4(connection, actor_name, min_collaborations=2):
+@coalesced('query_3_approximate')
+@budgeted('query_3_approximate')
+@profiled('query_3_approximate')
+def query_3_approximate(connection, min_movies=20, year_from=None, year_to=None):
+    """
+    Query 3 (Approximate): Genre Analysis from Maintained Sketches
+
+    Answers query_3 from the per-genre HyperLogLog and movie sample in
+    genre_sketches (see genre_sketches.py). Only a version check runs when the
+    sketches have not changed since the last call, so the cost does not grow
+    with the number of movies or credits.
+
+    Args:
+        connection: MySQL connection object
+        min_movies (int): Minimum estimated number of movies in a genre (default: 20)
+        year_from (int): Only count movies released in or after this year
+        year_to (int): Only count movies released in or before this year
+
+    Returns:
+        list: List of tuples (genre_name, avg_rating, movie_count, total_revenue, avg_revenue,
+            quantiles, errors); quantiles holds the median and p90 of rating and revenue,
+            errors the 95% half-width of each estimate and the 95% interval of each
+            quantile (exact when the genre's sample is complete)
+    """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.query_3_approximate(connection, min_movies, year_from, year_to)
+
+    cursor = connection.cursor()
+
+    try:
+        execute_statement(cursor, f"SELECT {budget_hint('query_3_approximate')} "
+                                  f"COALESCE(SUM(version), 0), COUNT(*) FROM genre_sketches", ())
+        version = tuple(int(value) for value in cursor.fetchone())
+
+        def load():
+            execute_statement(cursor, """
+            SELECT g.genre_name, s.hll_registers, s.sample
+            FROM genre_sketches s
+            INNER JOIN genres g ON g.genre_id = s.genre_id
+            """, ())
+            return cursor.fetchall()
+
+        sketches = genre_sketches.cached_sketches('mysql', version, load)
+        return genre_sketches.estimate_genre_stats(sketches, min_movies, year_from, year_to)
+
+    except Error as e:
+        return query_failed('query_3_approximate', e)
+
+    finally:
+        cursor.close()
+
+
+@coalesced('query_4')
+@budgeted('query_4')
+@profiled('query_4')
+def query_4(connection, actor_name, min_collaborations=2, year_from=None, year_to=None):
     """
     Query 4: Actor Collaboration Finder (Complex - Self-Join, GROUP BY, HAVING)
 
@@ -154,16 +326,23 @@ def query_4(connection, actor_name, min_collaborations=2):
         connection: MySQL connection object
         actor_name (str): Name of the actor to find collaborators for
         min_collaborations (int): Minimum number of movies together (default: 2)
+        year_from (int): Only count movies released in or after this year
+        year_to (int): Only count movies released in or before this year
 
     Returns:
         list: List of tuples (collaborator_name, collaboration_count, movie_titles)
     """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.query_4(connection, actor_name, min_collaborations, year_from, year_to)
+
     cursor = connection.cursor()
+    # Filtering every partitioned alias lets MySQL prune each table access
+    year_filter, year_params = year_filters(['m', 'mc1', 'mc2'], year_from, year_to)
 
     try:
         # Complex query with self-join and aggregation
-        query = """
-        SELECT
+        query = f"""
+        SELECT {budget_hint('query_4')}
             p2.name AS collaborator_name,
             COUNT(DISTINCT mc2.movie_id) AS collaboration_count,
             GROUP_CONCAT(
@@ -179,6 +358,7 @@ def query_4(connection, actor_name, min_collaborations=2):
         WHERE
             p1.name LIKE %s
             AND p2.person_id != p1.person_id
+            {year_filter}
         GROUP BY p2.person_id, p2.name
         HAVING COUNT(DISTINCT mc2.movie_id) >= %s
         ORDER BY collaboration_count DESC, p2.name
@@ -187,74 +367,569 @@ def query_4(connection, actor_name, min_collaborations=2):
 
         # Use LIKE for partial name matching
         search_pattern = f"%{actor_name}%"
-        cursor.execute(query, (search_pattern, min_collaborations))
+        execute_statement(cursor, query, (search_pattern, *year_params, min_collaborations))
         results = cursor.fetchall()
 
         return results
 
     except Error as e:
-        print(f"Error executing query_4: {e}")
-        return []
+        return query_failed('query_4', e)
 
     finally:
         cursor.close()
 
 
-def query_5(connection, director_name, min_rating=7.0):
+@coalesced('query_5')
+@budgeted('query_5')
+@profiled('query_5')
+def query_5(connection, director_name, min_rating=7.0, year_from=None, year_to=None):
     """
     Query 5: Director's Highest-Rated Films with Cast (Complex - Nested Query, Aggregation)
 
     Find all movies directed by a specific person where the movie rating is above a threshold,
     showing the movie title, rating, year, and top 3 cast members (by billing order).
+    The cast names come from movie_top_billing, which ingestion keeps up to date, so
+    each film costs one primary-key lookup instead of a correlated subquery.
 
     Args:
         connection: MySQL connection object
         director_name (str): Name of the director
         min_rating (float): Minimum movie rating (default: 7.0)
+        year_from (int): Only return movies released in or after this year
+        year_to (int): Only return movies released in or before this year
 
     Returns:
         list: List of tuples (title, rating, year, revenue, cast_names)
     """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.query_5(connection, director_name, min_rating, year_from, year_to)
+
     cursor = connection.cursor()
+    year_filter, year_params = year_filters(['m', 'mcr'], year_from, year_to)
 
     try:
-        # Complex query with multiple joins, nested query, and aggregation
-        query = """
-        SELECT DISTINCT
+        # Complex query with multiple joins; top cast is precomputed per movie
+        query = f"""
+        SELECT {budget_hint('query_5')} DISTINCT
             m.title,
             m.vote_average AS rating,
             YEAR(m.release_date) AS year,
             m.revenue,
-            (
-                SELECT GROUP_CONCAT(p_cast.name ORDER BY mc.cast_order SEPARATOR ', ')
-                FROM movie_cast mc
-                INNER JOIN people p_cast ON mc.person_id = p_cast.person_id
-                WHERE mc.movie_id = m.movie_id
-                  AND mc.cast_order < 3
-                ORDER BY mc.cast_order
-            ) AS top_cast
+            tb.top_cast
         FROM movies m
         INNER JOIN movie_crew mcr ON m.movie_id = mcr.movie_id
         INNER JOIN people p_dir ON mcr.person_id = p_dir.person_id
+        LEFT JOIN movie_top_billing tb ON tb.movie_id = m.movie_id
         WHERE
             p_dir.name LIKE %s
             AND mcr.job = 'Director'
             AND m.vote_average >= %s
+            {year_filter}
         ORDER BY m.vote_average DESC, m.popularity DESC
         LIMIT 20
         """
 
         # Use LIKE for partial name matching
         search_pattern = f"%{director_name}%"
-        cursor.execute(query, (search_pattern, min_rating))
+        execute_statement(cursor, query, (search_pattern, min_rating, *year_params))
         results = cursor.fetchall()
 
         return results
 
     except Error as e:
-        print(f"Error executing query_5: {e}")
+        return query_failed('query_5', e)
+
+    finally:
+        cursor.close()
+
+
+@coalesced('search_movies')
+@budgeted('search_movies')
+@profiled('search_movies')
+def search_movies(connection, text, genre=None, year_from=None, year_to=None, limit=20):
+    """
+    Combined Search: Ranked Full-Text Search across Title and Overview (FULLTEXT)
+
+    Runs a single query driven by the composite FULLTEXT index on (title, overview).
+    Title matches are boosted by TITLE_MATCH_WEIGHT, popularity breaks ties, and the
+    optional genre and year filters are applied in the same query.
+
+    The title boost costs a second FULLTEXT lookup, on the title-only index
+    (idx_movie_title, or the one on movie_texts when the text is split out):
+    MySQL runs that search as well and reads each matched row's title relevance
+    from it.
+
+    Args:
+        connection: MySQL connection object
+        text (str): Search text (e.g. "dark knight", "space exploration")
+        genre (str): Only return movies in this genre (e.g. "Action")
+        year_from (int): Earliest release year (inclusive)
+        year_to (int): Latest release year (inclusive)
+        limit (int): Maximum number of results (default: 20)
+
+    Returns:
+        list: List of tuples (movie_id, title, rating, year, popularity, overview_snippet, score)
+    """
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.search_movies(connection, text, genre, year_from, year_to, limit)
+
+    cursor = connection.cursor()
+    source, t = text_source()
+    title_alias = title_source()[1]
+
+    try:
+        # Sargable year range (release_date, or the partition key when partitioned)
+        year_filter, filter_params = year_filters(['m'], year_from, year_to)
+        filters = [year_filter] if year_filter else []
+
+        if genre is not None:
+            filters.append("""AND EXISTS (
+                SELECT 1
+                FROM movie_genres mg
+                INNER JOIN genres g ON mg.genre_id = g.genre_id
+                WHERE mg.movie_id = m.movie_id AND g.genre_name = %s
+            )""")
+            filter_params.append(genre)
+
+        # The combined MATCH in SELECT and WHERE is identical and is searched once;
+        # the title MATCH is a second FULLTEXT lookup on the title index
+        query = f"""
+        SELECT {budget_hint('search_movies')}
+            m.movie_id,
+            m.title,
+            m.vote_average AS rating,
+            YEAR(m.release_date) AS year,
+            m.popularity,
+            LEFT({t}.overview, 150) AS overview_snippet,
+            MATCH({t}.title, {t}.overview) AGAINST(%s IN NATURAL LANGUAGE MODE)
+                + %s * MATCH({title_alias}.title) AGAINST(%s IN NATURAL LANGUAGE MODE) AS score
+        FROM {source}
+        WHERE MATCH({t}.title, {t}.overview) AGAINST(%s IN NATURAL LANGUAGE MODE)
+            {' '.join(filters)}
+        ORDER BY score DESC, m.popularity DESC
+        LIMIT %s
+        """
+
+        params = (text, TITLE_MATCH_WEIGHT, text, text, *filter_params, int(limit))
+        execute_statement(cursor, query, params)
+        results = cursor.fetchall()
+
+        return results
+
+    except Error as e:
+        return query_failed('search_movies', e)
+
+    finally:
+        cursor.close()
+
+
+@coalesced('get_movie')
+@budgeted('get_movie')
+@profiled('get_movie')
+def get_movie(connection, movie_ids):
+    """
+    Movie Details: Bulk Fetch of Precomputed Movie Documents (Primary-Key Lookup)
+
+    Reads the movie_documents rows of all requested movies in one round trip.
+    Movies whose document has not been written yet are assembled from the
+    normalized tables instead.
+
+    Args:
+        connection: MySQL connection object
+        movie_ids (list): Movie IDs (a single ID is accepted too)
+
+    Returns:
+        list: List of tuples (movie_id, document) in request order; unknown IDs are left out
+    """
+    if isinstance(movie_ids, int):
+        movie_ids = [movie_ids]
+    movie_ids = list(dict.fromkeys(int(movie_id) for movie_id in movie_ids))
+    if not movie_ids:
+        return []
+
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.get_movie(connection, movie_ids)
+
+    cursor = connection.cursor()
+
+    try:
+        query = f"""
+        SELECT {budget_hint('get_movie')} movie_id, document
+        FROM movie_documents
+        WHERE movie_id IN ({', '.join(['%s'] * len(movie_ids))})
+        """
+
+        execute_statement(cursor, query, movie_ids)
+        documents = {movie_id: json.loads(document) for movie_id, document in cursor.fetchall()}
+
+        missing = [movie_id for movie_id in movie_ids if movie_id not in documents]
+        if missing:
+            documents.update(movie_documents.build_documents(connection, missing))
+
+        return [(movie_id, documents[movie_id]) for movie_id in movie_ids if movie_id in documents]
+
+    except Error as e:
+        return query_failed('get_movie', e)
+
+    finally:
+        cursor.close()
+
+
+@coalesced('similar_movies')
+@budgeted('similar_movies')
+@profiled('similar_movies')
+def similar_movies(connection, movie_id, limit=10):
+    """
+    Recommendations: Movies Sharing Cast, Crew and Genres (MinHash/LSH Index)
+
+    Candidates come from the in-process similarity index (similarity_index.py),
+    loaded from its file on first use; only the details of the top matches are
+    read from the database, with one primary-key lookup. The index is never
+    built here: without a file (`python src/similarity_index.py build`) there
+    are no results.
+
+    Args:
+        connection: MySQL connection object
+        movie_id (int): Movie to find similar movies for
+        limit (int): Maximum number of results (default: 10)
+
+    Returns:
+        list: List of tuples (movie_id, title, rating, year, similarity), most similar
+            first; similarity is the estimated Jaccard similarity of the feature sets
+    """
+    index = similarity_index.shared_index()
+    if index is None:
+        print(f"Error executing similar_movies: no similarity index at {similarity_index.SIMILARITY_INDEX_PATH}")
         return []
 
+    matches = index.similar(movie_id, int(limit))
+    if not matches:
+        return []
+
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.similar_movies(connection, matches)
+
+    cursor = connection.cursor()
+
+    try:
+        query = f"""
+        SELECT {budget_hint('similar_movies')}
+            m.movie_id,
+            m.title,
+            m.vote_average AS rating,
+            YEAR(m.release_date) AS year
+        FROM movies m
+        WHERE m.movie_id IN ({', '.join(['%s'] * len(matches))})
+        """
+
+        execute_statement(cursor, query, [match_id for match_id, _ in matches])
+        details = {row[0]: row for row in cursor.fetchall()}
+
+        return [(*details[match_id], round(similarity, 3))
+                for match_id, similarity in matches if match_id in details]
+
+    except Error as e:
+        return query_failed('similar_movies', e)
+
+    finally:
+        cursor.close()
+
+
+@coalesced('top_movies')
+@budgeted('top_movies')
+@profiled('top_movies')
+def top_movies(connection, board, key, limit=20):
+    """
+    Leaderboards: Top Rated Movies per Genre, Year or Director (Precomputed)
+
+    Reads the maintained movie_leaderboards rows of one board in rank order
+    (index idx_leaderboard_rank), so at most `limit` rows are touched. Only
+    movies with at least LEADERBOARD_MIN_VOTES votes are ranked.
+
+    Args:
+        connection: MySQL connection object
+        board (str): 'genre', 'year' or 'director'
+        key: Genre name, release year or director name (e.g. "Drama", 1994, "Christopher Nolan")
+        limit (int): Maximum number of results (at most LEADERBOARD_SIZE)
+
+    Returns:
+        list: List of tuples (movie_id, title, rating, vote_count, year), best first
+    """
+    if board not in BOARDS:
+        raise ValueError(f"Unknown leaderboard: {board}")
+    limit = min(int(limit), LEADERBOARD_SIZE)
+
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.top_movies(connection, board, key, limit)
+
+    cursor = connection.cursor()
+
+    try:
+        # Names resolve to IDs first; a director name shared by several people lists all their films
+        if board == 'genre':
+            key_filter = "l.board_key = (SELECT genre_id FROM genres WHERE genre_name = %s)"
+        elif board == 'director':
+            key_filter = "l.board_key IN (SELECT person_id FROM people WHERE name = %s)"
+        else:
+            key_filter, key = "l.board_key = %s", int(key)
+
+        query = f"""
+        SELECT {budget_hint('top_movies')}
+            l.movie_id,
+            l.title,
+            l.vote_average AS rating,
+            l.vote_count,
+            l.release_year AS year
+        FROM movie_leaderboards l
+        WHERE l.board = %s AND {key_filter}
+        ORDER BY l.vote_average DESC, l.vote_count DESC, l.movie_id
+        LIMIT %s
+        """
+
+        execute_statement(cursor, query, (board, key, limit))
+        results = cursor.fetchall()
+
+        return results
+
+    except Error as e:
+        return query_failed('top_movies', e)
+
+    finally:
+        cursor.close()
+
+
+@coalesced('trending_movies')
+@budgeted('trending_movies')
+@profiled('trending_movies')
+def trending_movies(connection, days=7, limit=20):
+    """
+    Trending: Popularity Growth of the Recent Window over the Prior Window (Rollups)
+
+    Compares each movie's average popularity over the last `days` days with the
+    `days` before, reading only the daily rollups of those two windows (weekly
+    rollups for windows of TRENDING_WEEKLY_FROM_DAYS days or more). Movies below
+    TRENDING_MIN_POPULARITY in the prior window are left out, so small absolute
+    changes on obscure titles do not dominate.
+
+    Args:
+        connection: MySQL connection object
+        days (int): Window length in days (default: 7)
+        limit (int): Maximum number of results (default: 20)
+
+    Returns:
+        list: List of tuples (movie_id, title, recent_popularity, prior_popularity,
+            growth, votes_gained), fastest growing first
+    """
+    table, prior_start, recent_start, recent_end = rollup_window(int(days))
+
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.trending_movies(connection, table, prior_start, recent_start, recent_end, limit)
+
+    cursor = connection.cursor()
+
+    try:
+        query = f"""
+        SELECT {budget_hint('trending_movies')}
+            w.movie_id,
+            m.title,
+            ROUND(w.recent, 3) AS recent_popularity,
+            ROUND(w.prior, 3) AS prior_popularity,
+            ROUND(w.recent / w.prior - 1, 4) AS growth,
+            w.recent_votes - w.prior_votes AS votes_gained
+        FROM (
+            SELECT
+                r.movie_id,
+                SUM(CASE WHEN r.period_start >= %s THEN r.popularity_sum END)
+                    / SUM(CASE WHEN r.period_start >= %s THEN r.samples END) AS recent,
+                SUM(CASE WHEN r.period_start < %s THEN r.popularity_sum END)
+                    / SUM(CASE WHEN r.period_start < %s THEN r.samples END) AS prior,
+                MAX(CASE WHEN r.period_start >= %s THEN r.vote_count_last END) AS recent_votes,
+                MAX(CASE WHEN r.period_start < %s THEN r.vote_count_last END) AS prior_votes
+            FROM {table} r
+            WHERE r.period_start >= %s AND r.period_start < %s
+            GROUP BY r.movie_id
+        ) w
+        INNER JOIN movies m ON m.movie_id = w.movie_id
+        WHERE w.recent IS NOT NULL AND w.prior >= %s
+        ORDER BY growth DESC, w.recent DESC
+        LIMIT %s
+        """
+
+        params = (*[recent_start] * 6, prior_start, recent_end, TRENDING_MIN_POPULARITY, int(limit))
+        execute_statement(cursor, query, params)
+        results = cursor.fetchall()
+
+        return results
+
+    except Error as e:
+        return query_failed('trending_movies', e)
+
+    finally:
+        cursor.close()
+
+
+class BrowsePage(list):
+    """
+    One page of browse_movies() results with the facet counts of the whole result set.
+
+    Attributes:
+        total (int): Movies matching all filters
+        facets (dict): 'genres', 'years' and 'ratings' lists of counts; each facet
+            is counted with every filter except its own, so the counts show what
+            changing that filter would return
+        page (int): Page number (1-based)
+        page_size (int): Movies per page
+    """
+
+    def __init__(self, rows=(), total=0, facets=None, page=1, page_size=20):
+        super().__init__(rows)
+        self.total = total
+        self.facets = facets if facets is not None else {'genres': [], 'years': [], 'ratings': []}
+        self.page = page
+        self.page_size = page_size
+
+
+def browse_filters(genre, min_rating, year_from, year_to, exclude=None):
+    """
+    WHERE conditions of browse_movies() on movies m, leaving out one facet's own filter.
+
+    Args:
+        exclude (str): 'genre', 'rating' or 'year' to leave out
+
+    Returns:
+        tuple: (SQL fragment of AND conditions, list of parameters)
+    """
+    conditions = []
+    params = []
+
+    if genre is not None and exclude != 'genre':
+        conditions.append("""AND EXISTS (
+            SELECT 1
+            FROM movie_genres mg
+            WHERE mg.movie_id = m.movie_id
+                AND mg.genre_id = (SELECT genre_id FROM genres WHERE genre_name = %s)
+        )""")
+        params.append(genre)
+    if min_rating is not None and exclude != 'rating':
+        conditions.append("AND m.vote_average >= %s")
+        params.append(float(min_rating))
+    if exclude != 'year':
+        year_filter, year_params = year_filters(['m'], year_from, year_to)
+        if year_filter:
+            conditions.append(year_filter)
+            params.extend(year_params)
+
+    return ' '.join(conditions), params
+
+
+@coalesced('browse_movies')
+@budgeted('browse_movies')
+@profiled('browse_movies')
+def browse_movies(connection, genre=None, year_from=None, year_to=None, min_rating=None,
+                  sort='popularity', page=1, page_size=20):
+    """
+    Faceted Browse: Filtered, Sorted Listing with Genre/Year/Rating Facet Counts
+
+    Returns one page of movies matching the filters, plus the total and the
+    facet counts, in a fixed four queries regardless of the number of facet
+    values: the page, genre counts, year counts, and rating counts (which also
+    yield the total). Served by idx_movie_genres_genre for the genre filter and
+    idx_movie_date_rating_popularity / idx_movie_popularity for the movie filters,
+    facets and sort.
+
+    Args:
+        connection: MySQL connection object
+        genre (str): Only movies in this genre (e.g. "Action")
+        year_from (int): Earliest release year (inclusive)
+        year_to (int): Latest release year (inclusive)
+        min_rating (float): Minimum vote_average
+        sort (str): One of BROWSE_SORTS (default: 'popularity')
+        page (int): Page number, 1-based
+        page_size (int): Movies per page (at most BROWSE_MAX_PAGE_SIZE)
+
+    Returns:
+        BrowsePage: List of tuples (movie_id, title, rating, year, popularity, vote_count)
+            with total and facets attributes
+    """
+    if sort not in BROWSE_SORTS:
+        raise ValueError(f"Unknown sort order: {sort}")
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), BROWSE_MAX_PAGE_SIZE)
+
+    if isinstance(connection, sqlite3.Connection):
+        return sqlite_backend.browse_movies(connection, genre, year_from, year_to, min_rating,
+                                            sort, page, page_size)
+
+    cursor = connection.cursor()
+    hint = budget_hint('browse_movies')
+
+    try:
+        filters, params = browse_filters(genre, min_rating, year_from, year_to)
+        query = f"""
+        SELECT {hint}
+            m.movie_id,
+            m.title,
+            m.vote_average AS rating,
+            YEAR(m.release_date) AS year,
+            m.popularity,
+            m.vote_count
+        FROM movies m
+        WHERE 1 = 1
+            {filters}
+        ORDER BY {BROWSE_SORTS[sort]}, m.movie_id
+        LIMIT %s OFFSET %s
+        """
+        execute_statement(cursor, query, (*params, page_size, (page - 1) * page_size))
+        rows = cursor.fetchall()
+
+        facets = {}
+
+        filters, params = browse_filters(genre, min_rating, year_from, year_to, exclude='genre')
+        execute_statement(cursor, f"""
+        SELECT {hint} g.genre_id, g.genre_name, COUNT(*) AS movie_count
+        FROM movie_genres mg
+        INNER JOIN movies m ON m.movie_id = mg.movie_id
+        INNER JOIN genres g ON g.genre_id = mg.genre_id
+        WHERE 1 = 1
+            {filters}
+        GROUP BY g.genre_id, g.genre_name
+        ORDER BY movie_count DESC, g.genre_name
+        """, params)
+        facets['genres'] = [{'genre_id': genre_id, 'name': name, 'count': count}
+                            for genre_id, name, count in cursor.fetchall()]
+
+        filters, params = browse_filters(genre, min_rating, year_from, year_to, exclude='year')
+        execute_statement(cursor, f"""
+        SELECT {hint} YEAR(m.release_date) AS year, COUNT(*) AS movie_count
+        FROM movies m
+        WHERE m.release_date IS NOT NULL
+            {filters}
+        GROUP BY year
+        ORDER BY year DESC
+        """, params)
+        facets['years'] = [{'year': year, 'count': count} for year, count in cursor.fetchall()]
+
+        # Each rating bucket also counts its movies passing min_rating; their sum is the total
+        filters, params = browse_filters(genre, min_rating, year_from, year_to, exclude='rating')
+        matching = "COUNT(*)" if min_rating is None else "SUM(m.vote_average >= %s)"
+        execute_statement(cursor, f"""
+        SELECT {hint} FLOOR(m.vote_average) AS bucket, COUNT(*) AS movie_count, {matching} AS matching
+        FROM movies m
+        WHERE 1 = 1
+            {filters}
+        GROUP BY bucket
+        ORDER BY bucket DESC
+        """, ((float(min_rating),) if min_rating is not None else ()) + tuple(params))
+        buckets = cursor.fetchall()
+        facets['ratings'] = [{'rating': int(bucket), 'count': count}
+                             for bucket, count, _ in buckets if bucket is not None]
+        total = sum(int(matched or 0) for _, _, matched in buckets)
+
+        return BrowsePage(rows, total, facets, page, page_size)
+
+    except Error as e:
+        return query_failed('browse_movies', e)
+
     finally:
         cursor.close()
 
@@ -286,7 +961,7 @@ def test_connection(connection):
 
         return movie_count > 0
 
-    except Error as e:
+    except (Error, sqlite3.Error) as e:
         print(f"Database connection test failed: {e}")
         return False
 
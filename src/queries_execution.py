@@ -3,23 +3,24 @@ Query Execution Examples for MovieFinder Application
 Demonstrates usage of all 5 main queries with example parameters.
 """
 
-import mysql.connector
 from mysql.connector import Error
-from queries_db_script import query_1, query_2, query_3, query_4, query_5, test_connection
+from db_routing import get_read_connection
+from queries_db_script import (query_1, query_2, query_3, query_4, query_5, search_movies, browse_movies,
+                               test_connection)
+from query_budgets import TimedOut
+from query_profiling import (QueryProfiler, LogSink, HistogramSink, PrometheusFileSink,
+                             enable_profiling)
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Database configuration (should match other scripts)
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST', '127.0.0.1'),
-    'port': int(os.getenv('DB_PORT', 3305)),
-    'user': os.getenv('DB_USER', 'yarony'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME', 'yarony')
-}
+# Optional query profiling (set QUERY_PROFILE=1 to enable)
+QUERY_PROFILE = os.getenv('QUERY_PROFILE', '0') == '1'
+QUERY_SLOW_MS = float(os.getenv('QUERY_SLOW_MS', 500))
+QUERY_EXPLAIN = os.getenv('QUERY_EXPLAIN') or None  # 'plan' or 'analyze'
+QUERY_PROFILE_PROM_FILE = os.getenv('QUERY_PROFILE_PROM_FILE')
 
 
 def print_separator(title=""):
@@ -166,6 +167,9 @@ def execute_query_4_examples(connection):
 
                 print(f"   Movies: {display_movies}")
                 print()
+        elif isinstance(results, TimedOut):
+            print(f"⏱ Query stopped after {results.elapsed_ms:.0f} ms "
+                  f"(budget {results.budget_ms} ms); try a more specific name.\n")
         else:
             print(f"No collaborators found for '{actor_name}' with {min_collab}+ movies together.")
             print("This could mean:")
@@ -212,11 +216,112 @@ def execute_query_5_examples(connection):
             print("  - Try lowering min_rating or checking the exact name\n")
 
 
+def execute_search_examples(connection):
+    """Execute and display results for the combined title/overview search."""
+
+    print_separator("COMBINED SEARCH: Ranked Title and Overview Search")
+    print("Purpose: One ranked search box over titles and plots, with filters\n")
+
+    test_cases = [
+        ("dark knight", {}),
+        ("space", {'genre': 'Science Fiction'}),
+        ("love", {'year_from': 2000, 'year_to': 2015}),
+    ]
+
+    for text, filters in test_cases:
+        filter_text = f" {filters}" if filters else ""
+        print(f"\n🔍 Searching for: '{text}'{filter_text}")
+        print_separator()
+
+        results = search_movies(connection, text, **filters)
+
+        if results:
+            print(f"Found {len(results)} movies:\n")
+            for i, (movie_id, title, rating, year, popularity, snippet, score) in enumerate(results[:10], 1):
+                year_str = year if year else "N/A"
+                rating_str = f"{rating}/10" if rating else "N/A"
+                print(f"{i}. {title} ({year_str}) - Rating: {rating_str} | Score: {score:.2f}")
+        else:
+            print("No movies found for this search.")
+
+        print()
+
+
+def execute_browse_examples(connection):
+    """Execute and display results for faceted browsing."""
+
+    print_separator("FACETED BROWSE: Filtered Listing with Facet Counts")
+    print("Purpose: Browse by genre, year and rating, with counts for every facet\n")
+
+    test_cases = [
+        {'genre': 'Action', 'year_from': 2000, 'min_rating': 7.0},
+        {'genre': 'Comedy', 'sort': 'newest'},
+        {'year_from': 1990, 'year_to': 1999, 'sort': 'rating'},
+    ]
+
+    for filters in test_cases:
+        print(f"\n🔍 Browsing: {filters}")
+        print_separator()
+
+        page = browse_movies(connection, page_size=10, **filters)
+
+        if page:
+            print(f"{page.total:,} movies match, showing {len(page)}:\n")
+            for i, (movie_id, title, rating, year, popularity, vote_count) in enumerate(page, 1):
+                year_str = year if year else "N/A"
+                rating_str = f"{rating}/10" if rating else "N/A"
+                print(f"{i}. {title} ({year_str}) - Rating: {rating_str} | Votes: {vote_count or 0:,}")
+            print("\nGenres: " + ", ".join(f"{g['name']} ({g['count']:,})" for g in page.facets['genres'][:8]))
+            print("Years: " + ", ".join(f"{y['year']} ({y['count']:,})" for y in page.facets['years'][:8]))
+            print("Ratings: " + ", ".join(f"{r['rating']}+ ({r['count']:,})" for r in page.facets['ratings']))
+        else:
+            print("No movies match these filters.")
+
+        print()
+
+
+def setup_profiling():
+    """
+    Enable query profiling according to the QUERY_* environment variables.
+
+    Returns:
+        HistogramSink: Sink holding the per-query summary, or None if disabled
+    """
+    if not QUERY_PROFILE:
+        return None
+
+    histogram = (PrometheusFileSink(QUERY_PROFILE_PROM_FILE) if QUERY_PROFILE_PROM_FILE
+                 else HistogramSink())
+    enable_profiling(QueryProfiler(
+        sinks=[LogSink(slow_only=True), histogram],
+        slow_threshold_ms=QUERY_SLOW_MS,
+        explain=QUERY_EXPLAIN,
+        handler_stats=True,
+    ))
+    return histogram
+
+
+def print_profile_summary(histogram):
+    """Print per-query latency statistics collected during the run."""
+    print_separator("Query Profile Summary")
+    print(f"{'Query':<10}{'Calls':<8}{'Mean ms':<10}{'p95 ms':<10}{'Max ms':<10}{'Rows':<8}{'Slow':<6}{'Errors'}")
+    print("-"*70)
+
+    for name, stats in sorted(histogram.snapshot().items()):
+        print(f"{name:<10}{stats['count']:<8}{stats['mean']:<10}{stats['p95']:<10}"
+              f"{stats['max']:<10}{stats['rows']:<8}{stats['slow']:<6}{stats['errors']}")
+
+    if isinstance(histogram, PrometheusFileSink):
+        histogram.flush()
+        print(f"\nMetrics written to {histogram.path}")
+
+
 def main():
     """
     Main function to demonstrate all queries.
     """
     connection = None
+    profile = setup_profiling()
 
     try:
         print("\n" + "="*70)
@@ -225,7 +330,7 @@ def main():
 
         # Connect to database
         print("\nConnecting to database...")
-        connection = mysql.connector.connect(**DB_CONFIG)
+        connection = get_read_connection()
 
         if not connection.is_connected():
             print("Failed to connect to database!")
@@ -243,6 +348,11 @@ def main():
         execute_query_3_examples(connection)
         execute_query_4_examples(connection)
         execute_query_5_examples(connection)
+        execute_search_examples(connection)
+        execute_browse_examples(connection)
+
+        if profile is not None:
+            print_profile_summary(profile)
 
         print_separator("All Query Demonstrations Completed Successfully!")
 
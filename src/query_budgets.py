@@ -0,0 +1,385 @@
+"""
+Query Execution Budgets for MovieFinder Application
+Per-query time budgets enforced by the server, caller-side cancellation, and a
+structured result for queries that were stopped.
+
+Budgets are enforced two ways:
+    - a MAX_EXECUTION_TIME optimizer hint in each SELECT (budget_hint()), which
+      makes MySQL abort the statement itself;
+    - a watchdog thread that sends KILL QUERY for calls still running
+      WATCHDOG_GRACE_MS after their budget, covering anything the hint does not.
+
+A stopped query returns a TimedOut result, and a query that failed otherwise
+prints the error and returns a QueryFailed result. Both are empty lists, so
+existing callers keep working, but TimedOut carries timed_out=True, the budget,
+the elapsed time and whether it was cancelled by the caller, and QueryFailed
+carries failed=True and the error.
+
+Configuration:
+    QUERY_BUDGETS=0                 disable budgets
+    QUERY_BUDGET_MS_<NAME>=<ms>     override one budget, e.g. QUERY_BUDGET_MS_QUERY_4=1500
+    QUERY_WATCHDOG=0                rely on the optimizer hint only
+"""
+
+import functools
+import os
+import sqlite3
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+QUERY_BUDGETS = os.getenv('QUERY_BUDGETS', '1') == '1'
+QUERY_WATCHDOG = os.getenv('QUERY_WATCHDOG', '1') == '1'
+
+# Default budget of each query function in milliseconds
+DEFAULT_BUDGETS_MS = {
+    'query_1': 2000,
+    'query_2': 1000,
+    'query_3': 5000,
+    'query_3_approximate': 500,
+    'query_4': 3000,
+    'query_5': 2000,
+    'search_movies': 2000,
+    'get_movie': 500,
+    'browse_movies': 3000,
+    'similar_movies': 500,
+    'top_movies': 500,
+    'trending_movies': 2000,
+}
+
+# The watchdog leaves this much time for the optimizer hint to fire first
+WATCHDOG_GRACE_MS = 250
+
+# Seconds between watchdog checks
+WATCHDOG_INTERVAL = 0.05
+
+# MySQL errors for a statement stopped by MAX_EXECUTION_TIME or KILL QUERY
+TIMEOUT_ERRORS = {3024, 1317, 1028}
+
+_budgets = {
+    name: int(os.getenv(f"QUERY_BUDGET_MS_{name.upper()}", default))
+    for name, default in DEFAULT_BUDGETS_MS.items()
+}
+
+
+def budget_ms(name):
+    """
+    Time budget of a query function.
+
+    Args:
+        name (str): Query name (e.g. "query_4")
+
+    Returns:
+        int or None: Budget in milliseconds, None when budgets are disabled
+    """
+    if not QUERY_BUDGETS:
+        return None
+    return _budgets.get(name)
+
+
+def set_budget(name, milliseconds):
+    """Change the budget of a query function at runtime (None removes it)."""
+    if milliseconds is None:
+        _budgets.pop(name, None)
+    else:
+        _budgets[name] = int(milliseconds)
+
+
+def budget_hint(name):
+    """
+    Optimizer hint enforcing a query's budget, to place right after SELECT.
+
+    Args:
+        name (str): Query name
+
+    Returns:
+        str: "/*+ MAX_EXECUTION_TIME(n) */" or "" when there is no budget
+    """
+    budget = budget_ms(name)
+    return f"/*+ MAX_EXECUTION_TIME({budget}) */" if budget else ""
+
+
+class TimedOut(list):
+    """
+    Empty result of a query stopped by its budget or by the caller.
+
+    Attributes:
+        query (str): Query name
+        budget_ms (int): Budget in force
+        elapsed_ms (float): Time until the query was stopped
+        cancelled (bool): True if the caller cancelled it (cancel_query())
+    """
+
+    timed_out = True
+
+    def __init__(self, query, budget_ms=None, elapsed_ms=None, cancelled=False):
+        super().__init__()
+        self.query = query
+        self.budget_ms = budget_ms
+        self.elapsed_ms = elapsed_ms
+        self.cancelled = cancelled
+
+    def to_dict(self):
+        return {
+            'error': 'cancelled' if self.cancelled else 'timed_out',
+            'query': self.query,
+            'budget_ms': self.budget_ms,
+            'elapsed_ms': round(self.elapsed_ms, 2) if self.elapsed_ms is not None else None,
+        }
+
+    def __repr__(self):
+        state = 'cancelled' if self.cancelled else f"exceeded {self.budget_ms} ms"
+        return f"TimedOut({self.query}: {state})"
+
+
+class QueryFailed(list):
+    """
+    Empty result of a query whose statement raised an error.
+
+    Attributes:
+        query (str): Query name
+        error (Exception): The error raised
+    """
+
+    failed = True
+
+    def __init__(self, query, error):
+        super().__init__()
+        self.query = query
+        self.error = error
+
+    def __repr__(self):
+        return f"QueryFailed({self.query}: {self.error})"
+
+
+def is_timeout_error(error):
+    """Check whether a MySQL error means the statement was stopped."""
+    return getattr(error, 'errno', None) in TIMEOUT_ERRORS
+
+
+def query_failed(name, error):
+    """
+    Result of a query function whose statement raised a MySQL error.
+
+    Args:
+        name (str): Query name
+        error (Error): The error raised
+
+    Returns:
+        list: TimedOut for stopped statements; otherwise the error is printed
+            and an empty QueryFailed returned
+    """
+    if is_timeout_error(error):
+        return TimedOut(name, budget_ms(name))
+    print(f"Error executing {name}: {error}")
+    return QueryFailed(name, error)
+
+
+class _Watch:
+    """A running budgeted call."""
+
+    __slots__ = ('server', 'connection_id', 'deadline', 'killed', 'cancelled', 'killing')
+
+    def __init__(self, server, connection_id, deadline):
+        self.server = server
+        self.connection_id = connection_id
+        self.deadline = deadline
+        self.killed = False
+        self.cancelled = False
+        self.killing = False
+
+
+class QueryWatchdog:
+    """
+    Background thread that sends KILL QUERY for calls past their deadline.
+
+    KILL QUERY must come from another session on the same server, so the
+    watchdog keeps one connection per server (primary or replica), opened on
+    first use. A call stays registered while a KILL for it is being sent, and
+    unwatch() waits for that KILL, so it can never reach the next call made on
+    the same pooled connection.
+
+    Args:
+        connect: Callable taking (host, port) and returning a new MySQL connection
+            (default: DB_CONFIG with that host and port)
+    """
+
+    def __init__(self, connect=None):
+        self._connect = connect
+        self._admin = {}
+        self._admin_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._kill_sent = threading.Condition(self._lock)
+        self._watches = {}
+        self._thread = None
+        self.kills = 0
+
+    def _connection(self, server):
+        admin = self._admin.get(server)
+        if admin is None or not admin.is_connected():
+            host, port = server
+            if self._connect is not None:
+                admin = self._connect(host, port)
+            else:
+                from db_routing import DB_CONFIG
+                admin = mysql.connector.connect(**{**DB_CONFIG, 'host': host, 'port': port})
+            self._admin[server] = admin
+        return admin
+
+    def kill(self, server, connection_id):
+        """
+        Stop the statement running on a connection (the connection stays usable).
+
+        Args:
+            server (tuple): (host, port) the connection belongs to
+            connection_id (int): Server-side connection ID
+        """
+        with self._admin_lock:
+            cursor = self._connection(server).cursor()
+            try:
+                cursor.execute(f"KILL QUERY {int(connection_id)}")
+                self.kills += 1
+            except Error as e:
+                # Unknown thread: the statement already finished
+                if e.errno != 1094:
+                    raise
+            finally:
+                cursor.close()
+
+    def watch(self, connection, budget):
+        """
+        Start watching a call.
+
+        Args:
+            connection: MySQL connection running the call
+            budget (int): Budget in milliseconds (None: only caller cancellation)
+
+        Returns:
+            _Watch: Handle to pass to unwatch()
+        """
+        deadline = None
+        if budget:
+            deadline = time.monotonic() + (budget + WATCHDOG_GRACE_MS) / 1000
+        entry = _Watch((connection.server_host, connection.server_port), connection.connection_id, deadline)
+
+        with self._lock:
+            self._watches[entry.server, entry.connection_id] = entry
+            if deadline is not None and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name='query-watchdog', daemon=True)
+                self._thread.start()
+        return entry
+
+    def unwatch(self, entry):
+        """Stop watching a call, once any KILL being sent for it has been sent."""
+        with self._lock:
+            while entry.killing:
+                self._kill_sent.wait()
+            key = (entry.server, entry.connection_id)
+            if self._watches.get(key) is entry:
+                del self._watches[key]
+
+    def cancel(self, connection):
+        """
+        Cancel the budgeted call running on a connection, if any.
+
+        Returns:
+            bool: True if a running call was cancelled
+        """
+        with self._lock:
+            entry = self._watches.get(((connection.server_host, connection.server_port),
+                                       connection.connection_id))
+            if entry is None:
+                return False
+            entry.cancelled = True
+            if entry.killing:
+                return True
+            entry.killing = True
+        self._kill_watched(entry)
+        return True
+
+    def _kill_watched(self, entry):
+        """Kill a registered call whose killing flag is set, then let unwatch() proceed."""
+        try:
+            self.kill(entry.server, entry.connection_id)
+        finally:
+            with self._lock:
+                entry.killing = False
+                self._kill_sent.notify_all()
+
+    def _run(self):
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            now = time.monotonic()
+            with self._lock:
+                overdue = [e for e in self._watches.values()
+                           if e.deadline is not None and not e.killed and not e.killing and e.deadline <= now]
+                for entry in overdue:
+                    entry.killed = True
+                    entry.killing = True
+            for entry in overdue:
+                try:
+                    self._kill_watched(entry)
+                except Error as e:
+                    print(f"Query watchdog could not kill connection {entry.connection_id}: {e}")
+
+
+# Shared watchdog used by budgeted()
+WATCHDOG = QueryWatchdog()
+
+
+def cancel_query(connection):
+    """
+    Cancel the query function currently running on a connection, from any thread.
+    The interrupted call returns TimedOut with cancelled=True.
+
+    Args:
+        connection: MySQL or SQLite connection the call is running on
+
+    Returns:
+        bool: True if a running call was cancelled
+    """
+    if isinstance(connection, sqlite3.Connection):
+        connection.interrupt()
+        return True
+    return WATCHDOG.cancel(connection)
+
+
+def budgeted(name):
+    """
+    Decorator that registers each call of a query function with the watchdog
+    and fills in the timing of TimedOut results.
+
+    The query function itself adds budget_hint(name) to its SELECT and returns
+    query_failed(name, e) from its error handler.
+
+    Args:
+        name (str): Query name (e.g. "query_4")
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(connection, *args, **kwargs):
+            budget = budget_ms(name)
+            entry = None
+            if QUERY_WATCHDOG and hasattr(connection, 'connection_id'):
+                entry = WATCHDOG.watch(connection, budget)
+
+            start = time.perf_counter()
+            try:
+                results = func(connection, *args, **kwargs)
+            finally:
+                if entry is not None:
+                    WATCHDOG.unwatch(entry)
+
+            if isinstance(results, TimedOut):
+                results.elapsed_ms = (time.perf_counter() - start) * 1000
+                results.cancelled = results.cancelled or (entry is not None and entry.cancelled)
+            return results
+
+        return wrapper
+    return decorator
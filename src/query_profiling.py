@@ -0,0 +1,466 @@
+"""
+Query Profiling and Instrumentation for MovieFinder Application
+Records per-call wall time, row counts, Handler_read_* deltas and optional
+EXPLAIN plans for the query functions and exports them through pluggable sinks.
+Calls served by the SQLite backend are timed only: the handler counters and
+plans are MySQL statements.
+
+Profiling is disabled by default. While disabled, the only cost added to a
+query call is a single global lookup in the profiled() wrapper.
+"""
+
+import functools
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from mysql.connector import Error
+
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Active profiler (None means profiling is disabled)
+_profiler = None
+
+# Per-thread stack of in-flight calls, used by execute_statement()
+_local = threading.local()
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram with running count, sum and max.
+
+    Args:
+        buckets (tuple): Sorted bucket upper bounds (e.g. milliseconds)
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """Record one observation."""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """
+        Estimate a percentile from the bucket counts.
+
+        Args:
+            p (float): Percentile between 0 and 100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile (max for +Inf)
+        """
+        if self.count == 0:
+            return 0.0
+
+        target = self.count * p / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Return the histogram as a plain dictionary."""
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'max': round(self.max, 3),
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+def format_prometheus_histogram(metric, histogram, labels=None):
+    """
+    Format a Histogram in the Prometheus text exposition format.
+
+    Args:
+        metric (str): Metric name (e.g. "moviefinder_query_duration_ms")
+        histogram (Histogram): Histogram to format
+        labels (dict): Extra labels attached to every sample
+
+    Returns:
+        list: Lines of text (without trailing newlines)
+    """
+    label_text = ','.join(f'{k}="{v}"' for k, v in (labels or {}).items())
+    prefix = label_text + ',' if label_text else ''
+
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+        cumulative += bucket_count
+        lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+
+    suffix = '{' + label_text + '}' if label_text else ''
+    lines.append(f'{metric}_sum{suffix} {histogram.total:.3f}')
+    lines.append(f'{metric}_count{suffix} {histogram.count}')
+    return lines
+
+
+def write_text_atomically(path, text):
+    """Write text to path via a temporary file so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class LogSink:
+    """
+    Print one line per profiled call.
+
+    Args:
+        stream: File-like object to write to (default: sys.stdout)
+        slow_only (bool): Only print calls flagged as slow
+    """
+
+    def __init__(self, stream=None, slow_only=False):
+        self.stream = stream
+        self.slow_only = slow_only
+
+    def emit(self, sample):
+        if self.slow_only and not sample['slow']:
+            return
+
+        tag = "SLOW " if sample['slow'] else ""
+        line = (f"[profile] {tag}{sample['query']}: {sample['elapsed_ms']:.2f} ms, "
+                f"{sample['rows']} rows")
+        if sample['handler_deltas']:
+            reads = sum(sample['handler_deltas'].values())
+            line += f", {reads} handler reads"
+        if sample['error']:
+            line += f", error: {sample['error']}"
+        print(line, file=self.stream or sys.stdout)
+
+        if sample['explain']:
+            print(sample['explain'], file=self.stream or sys.stdout)
+
+
+class HistogramSink:
+    """
+    Keep in-memory latency histograms and counters per query function.
+
+    Args:
+        buckets (tuple): Histogram bucket upper bounds in milliseconds
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.rows = {}
+        self.errors = {}
+        self.slow = {}
+        self._lock = threading.Lock()
+
+    def emit(self, sample):
+        name = sample['query']
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(self.buckets)
+                self.rows[name] = 0
+                self.errors[name] = 0
+                self.slow[name] = 0
+
+            self.histograms[name].observe(sample['elapsed_ms'])
+            self.rows[name] += sample['rows']
+            self.errors[name] += 1 if sample['error'] else 0
+            self.slow[name] += 1 if sample['slow'] else 0
+
+    def snapshot(self):
+        """
+        Return a summary of everything recorded so far.
+
+        Returns:
+            dict: Query name -> histogram snapshot plus rows/errors/slow counters
+        """
+        with self._lock:
+            summary = {}
+            for name, histogram in self.histograms.items():
+                entry = histogram.snapshot()
+                entry['rows'] = self.rows[name]
+                entry['errors'] = self.errors[name]
+                entry['slow'] = self.slow[name]
+                summary[name] = entry
+            return summary
+
+    def prometheus_lines(self):
+        """Return all recorded metrics in the Prometheus text format."""
+        with self._lock:
+            lines = [
+                '# TYPE moviefinder_query_duration_ms histogram',
+            ]
+            for name, histogram in sorted(self.histograms.items()):
+                lines.extend(format_prometheus_histogram(
+                    'moviefinder_query_duration_ms', histogram, {'query': name}))
+
+            for metric, values in (('moviefinder_query_rows_total', self.rows),
+                                   ('moviefinder_query_errors_total', self.errors),
+                                   ('moviefinder_query_slow_total', self.slow)):
+                lines.append(f'# TYPE {metric} counter')
+                for name, value in sorted(values.items()):
+                    lines.append(f'{metric}{{query="{name}"}} {value}')
+            return lines
+
+
+class PrometheusFileSink(HistogramSink):
+    """
+    Histogram sink that periodically rewrites a Prometheus text file,
+    suitable for the node_exporter textfile collector.
+
+    Args:
+        path (str): Output file path
+        flush_interval (float): Minimum seconds between file rewrites
+        buckets (tuple): Histogram bucket upper bounds in milliseconds
+    """
+
+    def __init__(self, path, flush_interval=5.0, buckets=DEFAULT_BUCKETS_MS):
+        super().__init__(buckets)
+        self.path = path
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+
+    def emit(self, sample):
+        super().emit(sample)
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the current metrics to the output file."""
+        self._last_flush = time.monotonic()
+        write_text_atomically(self.path, '\n'.join(self.prometheus_lines()) + '\n')
+
+
+class QueryProfiler:
+    """
+    Collects one sample per profiled query call and forwards it to the sinks.
+
+    Args:
+        sinks (list): Objects with an emit(sample) method
+        slow_threshold_ms (float): Calls at or above this duration are flagged as slow
+        explain (str): None, 'plan' (EXPLAIN FORMAT=JSON) or 'analyze' (EXPLAIN ANALYZE)
+        explain_slow_only (bool): Only capture plans for slow calls
+        handler_stats (bool): Capture Handler_read_* deltas (two extra round trips per call)
+    """
+
+    def __init__(self, sinks=None, slow_threshold_ms=None, explain=None,
+                 explain_slow_only=True, handler_stats=False):
+        if explain not in (None, 'plan', 'analyze'):
+            raise ValueError(f"Unknown explain mode: {explain}")
+
+        self.sinks = list(sinks) if sinks is not None else [LogSink()]
+        self.slow_threshold_ms = slow_threshold_ms
+        self.explain = explain
+        self.explain_slow_only = explain_slow_only
+        self.handler_stats = handler_stats
+
+    def begin(self, name, connection):
+        """Start timing a call and return its context."""
+        call = {
+            'query': name,
+            'connection': connection,
+            'statement': None,
+            'params': None,
+            'error': None,
+            'handler_before': None,
+            'mysql': not isinstance(connection, sqlite3.Connection),
+        }
+        if self.handler_stats and call['mysql']:
+            call['handler_before'] = read_handler_status(connection)
+        call['start'] = time.perf_counter()
+        return call
+
+    def end(self, call, results):
+        """Finish a call, build its sample and emit it to every sink."""
+        elapsed_ms = (time.perf_counter() - call['start']) * 1000
+        connection = call['connection']
+
+        handler_deltas = {}
+        if call['handler_before'] is not None:
+            after = read_handler_status(connection)
+            handler_deltas = {key: after.get(key, 0) - value
+                              for key, value in call['handler_before'].items()
+                              if after.get(key, 0) - value}
+
+        slow = self.slow_threshold_ms is not None and elapsed_ms >= self.slow_threshold_ms
+
+        explain = None
+        if self.explain and call['mysql'] and call['statement'] and (slow or not self.explain_slow_only
+                                                   or self.slow_threshold_ms is None):
+            explain = capture_explain(connection, call['statement'], call['params'],
+                                      analyze=self.explain == 'analyze')
+
+        sample = {
+            'query': call['query'],
+            'timestamp': time.time(),
+            'elapsed_ms': elapsed_ms,
+            'rows': len(results) if results is not None else 0,
+            'slow': slow,
+            'error': call['error'],
+            'statement': call['statement'],
+            'params': call['params'],
+            'handler_deltas': handler_deltas,
+            'explain': explain,
+        }
+
+        for sink in self.sinks:
+            sink.emit(sample)
+
+
+def read_handler_status(connection):
+    """
+    Read the session Handler_read_* counters.
+
+    Args:
+        connection: MySQL connection object
+
+    Returns:
+        dict: Counter name -> value (empty if the status could not be read)
+    """
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+        return {name: int(value) for name, value in cursor.fetchall()}
+    except Error as e:
+        print(f"Error reading handler status: {e}")
+        return {}
+    finally:
+        cursor.close()
+
+
+def capture_explain(connection, statement, params, analyze=False):
+    """
+    Capture the execution plan of a statement.
+
+    EXPLAIN ANALYZE (MySQL 8.0.18+) executes the statement a second time.
+
+    Args:
+        connection: MySQL connection object
+        statement (str): SQL statement that was profiled
+        params (tuple): Parameters used for the statement
+        analyze (bool): Use EXPLAIN ANALYZE instead of EXPLAIN FORMAT=JSON
+
+    Returns:
+        str: Plan text, or None if it could not be captured
+    """
+    prefix = "EXPLAIN ANALYZE " if analyze else "EXPLAIN FORMAT=JSON "
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(prefix + statement, params)
+        return '\n'.join(str(row[0]) for row in cursor.fetchall())
+    except Error as e:
+        print(f"Error capturing plan: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def enable_profiling(profiler=None):
+    """
+    Turn on profiling for all profiled() query functions.
+
+    Args:
+        profiler (QueryProfiler): Profiler to use (default: one printing every call)
+
+    Returns:
+        QueryProfiler: The active profiler
+    """
+    global _profiler
+    _profiler = profiler if profiler is not None else QueryProfiler()
+    return _profiler
+
+
+def disable_profiling():
+    """Turn off profiling."""
+    global _profiler
+    _profiler = None
+
+
+def get_profiler():
+    """Return the active profiler, or None when profiling is disabled."""
+    return _profiler
+
+
+def profiled(name):
+    """
+    Decorator that reports each call of a query function to the active profiler.
+
+    The wrapped function must take the connection as its first argument and
+    should run its SQL through execute_statement() so plans can be captured.
+
+    Args:
+        name (str): Query name used in samples (e.g. "query_1")
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(connection, *args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(connection, *args, **kwargs)
+
+            call = profiler.begin(name, connection)
+            stack = getattr(_local, 'calls', None)
+            if stack is None:
+                stack = _local.calls = []
+            stack.append(call)
+
+            results = None
+            try:
+                results = func(connection, *args, **kwargs)
+                return results
+            finally:
+                stack.pop()
+                profiler.end(call, results)
+
+        return wrapper
+    return decorator
+
+
+def execute_statement(cursor, statement, params=None):
+    """
+    Execute a statement on a cursor, remembering it for the profiled call in progress.
+
+    Errors are recorded on the call and re-raised unchanged.
+
+    Args:
+        cursor: MySQL cursor object
+        statement (str): SQL statement
+        params (tuple): Statement parameters
+    """
+    stack = getattr(_local, 'calls', None)
+    if not stack:
+        cursor.execute(statement, params)
+        return
+
+    call = stack[-1]
+    call['statement'] = statement
+    call['params'] = params
+    try:
+        cursor.execute(statement, params)
+    except Error as e:
+        call['error'] = str(e)
+        raise
@@ -0,0 +1,194 @@
+"""
+Request Coalescing for MovieFinder Application
+Single-flight layer for the query functions: concurrent calls with the same
+normalized parameters share one database execution and all receive its result.
+
+Only calls that overlap in time are merged; nothing is cached once the leading
+call returns. Coalescing is on by default and can be disabled with
+QUERY_COALESCING=0 or disable_coalescing().
+"""
+
+import copy
+import functools
+import os
+import threading
+from decimal import Decimal
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Active single-flight group (None means coalescing is disabled)
+_group = None
+
+
+def normalize(value):
+    """
+    Canonical form of a query argument, so equivalent calls get the same key.
+    Strings are compared case-insensitively with collapsed whitespace, matching
+    the case-insensitive collation the FULLTEXT and LIKE filters run under.
+
+    Args:
+        value: Argument value
+
+    Returns:
+        Hashable normalized value
+    """
+    if isinstance(value, str):
+        return ' '.join(value.split()).lower()
+    if isinstance(value, (float, Decimal)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(v) for v in value)
+    return value
+
+
+class _Flight:
+    """One in-progress execution and the callers waiting for it."""
+
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Merges concurrent identical calls into one execution.
+
+    Thread-safe: the first caller for a key runs the function, later callers
+    with the same key block until it finishes and receive a copy of its result
+    (or its exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.stats = {}
+
+    def _count(self, name, field):
+        counts = self.stats.setdefault(name, {'calls': 0, 'executions': 0, 'coalesced': 0})
+        counts[field] += 1
+
+    def do(self, name, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) unless an identical call is already running.
+
+        Args:
+            name (str): Query name used in stats
+            key (tuple): Normalized call key
+            func: Function to execute
+
+        Returns:
+            The function result
+        """
+        with self._lock:
+            self._count(name, 'calls')
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._count(name, 'executions')
+            else:
+                flight.followers += 1
+                self._count(name, 'coalesced')
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # Shallow copy keeps list subclasses such as query_budgets.TimedOut intact
+            return copy.copy(flight.result)
+
+        try:
+            flight.result = func(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def snapshot(self):
+        """
+        Per-query counters.
+
+        Returns:
+            dict: name -> {'calls', 'executions', 'coalesced', 'saved_ratio'}
+        """
+        with self._lock:
+            return {
+                name: {**counts, 'saved_ratio': counts['coalesced'] / counts['calls'] if counts['calls'] else 0.0}
+                for name, counts in self.stats.items()
+            }
+
+    def in_flight(self):
+        """Number of distinct executions currently running."""
+        with self._lock:
+            return len(self._flights)
+
+
+def enable_coalescing(group=None):
+    """
+    Turn on coalescing for all coalesced() query functions.
+
+    Args:
+        group (SingleFlight): Group to use (default: a new one)
+
+    Returns:
+        SingleFlight: The active group
+    """
+    global _group
+    _group = group if group is not None else SingleFlight()
+    return _group
+
+
+def disable_coalescing():
+    """Turn off coalescing; every call executes on its own."""
+    global _group
+    _group = None
+
+
+def get_coalescing():
+    """Return the active SingleFlight group, or None if coalescing is disabled."""
+    return _group
+
+
+def coalescing_stats():
+    """Per-query coalescing counters of the active group ({} when disabled)."""
+    return _group.snapshot() if _group is not None else {}
+
+
+def coalesced(name):
+    """
+    Decorator that merges concurrent identical calls of a query function.
+
+    The connection (first argument) is not part of the key: a coalesced caller's
+    own connection is simply not used. All callers must therefore read the same
+    database.
+
+    Args:
+        name (str): Query name used in the key and in stats (e.g. "query_2")
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(connection, *args, **kwargs):
+            group = _group
+            if group is None:
+                return func(connection, *args, **kwargs)
+
+            key = (name, normalize(args), tuple(sorted((k, normalize(v)) for k, v in kwargs.items())))
+            return group.do(name, key, func, connection, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+if os.getenv('QUERY_COALESCING', '1') == '1':
+    enable_coalescing()
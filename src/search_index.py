@@ -0,0 +1,621 @@
+"""
+Embedded Search Index for MovieFinder Application
+In-process inverted index over movies.title and movies.overview with BM25
+scoring, phrase and prefix queries. Serves query_1/query_2 without a MySQL
+round trip when SEARCH_ENGINE=local (see queries_db_script.set_search_engine).
+
+Query syntax:
+    space exploration      terms are OR'ed and ranked by BM25
+    "time travel"          quoted phrases must appear verbatim
+    star*                  trailing * matches every term with that prefix
+
+Usage:
+    python src/search_index.py build              # build from MySQL and save
+    python src/search_index.py bench [terms...]   # compare with MySQL FULLTEXT
+"""
+
+import bisect
+import math
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from array import array
+
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from partitioning import SPLIT_MOVIE_TEXT
+
+# Load environment variables
+load_dotenv()
+
+# Where the index is persisted between runs
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'search_index.bin')
+
+# Indexed fields and their weights when searching several fields at once
+FIELDS = ('title', 'overview')
+DEFAULT_FIELD_WEIGHTS = {'title': 2.0, 'overview': 1.0}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Maximum number of vocabulary terms a prefix query expands to
+MAX_PREFIX_EXPANSION = 50
+
+# On-disk format version
+INDEX_FORMAT_VERSION = 1
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+# Index shared by the query functions (loaded from SEARCH_INDEX_PATH on first use)
+_index = None
+_index_lock = threading.Lock()
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Tokens in order of appearance
+    """
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query):
+    """
+    Parse a search string into terms, prefixes and phrases.
+
+    Args:
+        query (str): Search string
+
+    Returns:
+        tuple: (terms, prefixes, phrases) where phrases is a list of token lists
+    """
+    terms, prefixes, phrases = [], [], []
+
+    for phrase, word in QUERY_RE.findall(query or ''):
+        if phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) > 1:
+                phrases.append(tokens)
+            terms.extend(tokens)
+        elif word.endswith('*') and len(word) > 1:
+            prefixes.extend(tokenize(word[:-1])[:1])
+        else:
+            terms.extend(tokenize(word))
+
+    return terms, prefixes, phrases
+
+
+def encode_varints(values):
+    """Encode non-negative integers as LEB128 varints."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data):
+    """Decode LEB128 varints produced by encode_varints()."""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+class SearchIndex:
+    """
+    Positional inverted index with BM25 ranking.
+
+    Postings are kept per field as term -> {movie_id: array of positions}.
+    Each document also keeps the fields needed to answer query_1 and query_2.
+
+    Args:
+        k1 (float): BM25 term-frequency saturation
+        b (float): BM25 length normalisation
+        field_weights (dict): Field name -> weight for multi-field searches
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B, field_weights=None):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+
+        self.postings = {field: {} for field in FIELDS}
+        self.doc_lengths = {field: {} for field in FIELDS}
+        self.total_lengths = dict.fromkeys(FIELDS, 0)
+        self.doc_terms = {field: {} for field in FIELDS}
+        self.docs = {}
+        self._sorted_terms = dict.fromkeys(FIELDS)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_document(self, movie_id, title, overview, rating=None, year=None, popularity=None):
+        """
+        Add or replace one movie.
+
+        Args:
+            movie_id (int): Movie ID
+            title (str): Movie title
+            overview (str): Movie overview
+            rating: vote_average
+            year (int): Release year
+            popularity: TMDb popularity
+        """
+        if movie_id in self.docs:
+            self.remove_document(movie_id)
+
+        for field, text in (('title', title), ('overview', overview)):
+            tokens = tokenize(text)
+            positions = {}
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, array('I')).append(position)
+
+            postings = self.postings[field]
+            for token, token_positions in positions.items():
+                if token not in postings:
+                    self._sorted_terms[field] = None
+                    postings[token] = {}
+                postings[token][movie_id] = token_positions
+
+            self.doc_lengths[field][movie_id] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+            self.doc_terms[field][movie_id] = tuple(positions)
+
+        snippet = overview[:150] if overview else overview
+        self.docs[movie_id] = (title, rating, year, popularity, snippet)
+
+    def remove_document(self, movie_id):
+        """Remove one movie if it is indexed."""
+        if movie_id not in self.docs:
+            return
+
+        for field in FIELDS:
+            postings = self.postings[field]
+            for token in self.doc_terms[field].pop(movie_id, ()):
+                token_postings = postings.get(token)
+                if token_postings is None:
+                    continue
+                token_postings.pop(movie_id, None)
+                if not token_postings:
+                    del postings[token]
+                    self._sorted_terms[field] = None
+
+            self.total_lengths[field] -= self.doc_lengths[field].pop(movie_id, 0)
+
+        del self.docs[movie_id]
+
+    def expand_prefix(self, field, prefix):
+        """
+        Return vocabulary terms of a field starting with prefix.
+
+        Args:
+            field (str): Field name
+            prefix (str): Lowercase prefix
+
+        Returns:
+            list: At most MAX_PREFIX_EXPANSION matching terms
+        """
+        if self._sorted_terms[field] is None:
+            self._sorted_terms[field] = sorted(self.postings[field])
+        terms = self._sorted_terms[field]
+
+        matches = []
+        for i in range(bisect.bisect_left(terms, prefix), len(terms)):
+            if not terms[i].startswith(prefix) or len(matches) >= MAX_PREFIX_EXPANSION:
+                break
+            matches.append(terms[i])
+        return matches
+
+    def _phrase_docs(self, field, tokens):
+        """Return the movie IDs whose field contains tokens as a contiguous phrase."""
+        postings = self.postings[field]
+        if any(token not in postings for token in tokens):
+            return set()
+
+        candidates = set(postings[tokens[0]])
+        for token in tokens[1:]:
+            candidates &= postings[token].keys()
+
+        matches = set()
+        for movie_id in candidates:
+            starts = set(postings[tokens[0]][movie_id])
+            for offset, token in enumerate(tokens[1:], 1):
+                starts &= {p - offset for p in postings[token][movie_id]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(movie_id)
+        return matches
+
+    def search(self, query, fields=FIELDS, limit=20):
+        """
+        Rank movies against a query with BM25.
+
+        Args:
+            query (str): Search string (terms, "phrases" and prefix*)
+            fields (tuple): Fields to search
+            limit (int): Maximum number of results
+
+        Returns:
+            list: List of (movie_id, score) tuples, best first
+        """
+        terms, prefixes, phrases = parse_query(query)
+        num_docs = len(self.docs)
+        if num_docs == 0:
+            return []
+
+        scores = {}
+        for field in fields:
+            postings = self.postings[field]
+            doc_lengths = self.doc_lengths[field]
+            avg_length = self.total_lengths[field] / num_docs or 1.0
+            weight = self.field_weights.get(field, 1.0) if len(fields) > 1 else 1.0
+
+            field_terms = set(terms)
+            for prefix in prefixes:
+                field_terms.update(self.expand_prefix(field, prefix))
+
+            for term in field_terms:
+                term_postings = postings.get(term)
+                if not term_postings:
+                    continue
+
+                df = len(term_postings)
+                idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+                for movie_id, positions in term_postings.items():
+                    tf = len(positions)
+                    norm = self.k1 * (1 - self.b + self.b * doc_lengths[movie_id] / avg_length)
+                    scores[movie_id] = scores.get(movie_id, 0.0) + weight * idf * tf * (self.k1 + 1) / (tf + norm)
+
+        for phrase in phrases:
+            allowed = set()
+            for field in fields:
+                allowed |= self._phrase_docs(field, phrase)
+            scores = {movie_id: score for movie_id, score in scores.items() if movie_id in allowed}
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def search_overview(self, keywords, limit=20):
+        """
+        Local equivalent of query_1.
+
+        Returns:
+            list: List of tuples (title, rating, year, overview_snippet, relevance_score)
+        """
+        rows = []
+        for movie_id, score in self.search(keywords, fields=('overview',), limit=None):
+            title, rating, year, popularity, snippet = self.docs[movie_id]
+            rows.append((title, rating, year, snippet, score))
+        rows.sort(key=lambda row: (row[4], row[1] or 0), reverse=True)
+        return rows[:limit]
+
+    def search_title(self, search_term, limit=20):
+        """
+        Local equivalent of query_2.
+
+        Returns:
+            list: List of tuples (title, rating, year, popularity, relevance_score)
+        """
+        rows = []
+        for movie_id, score in self.search(search_term, fields=('title',), limit=None):
+            title, rating, year, popularity, snippet = self.docs[movie_id]
+            rows.append((title, rating, year, popularity, score))
+        rows.sort(key=lambda row: (row[4], row[3] or 0), reverse=True)
+        return rows[:limit]
+
+    def save(self, path=SEARCH_INDEX_PATH):
+        """
+        Save the index with delta+varint encoded posting lists.
+
+        Args:
+            path (str): Output file path
+        """
+        encoded = {}
+        for field in FIELDS:
+            encoded[field] = {}
+            for term, term_postings in self.postings[field].items():
+                values = []
+                previous = 0
+                for movie_id in sorted(term_postings):
+                    positions = term_postings[movie_id]
+                    values.append(movie_id - previous)
+                    values.append(len(positions))
+                    last = 0
+                    for position in positions:
+                        values.append(position - last)
+                        last = position
+                    previous = movie_id
+                encoded[field][term] = encode_varints(values)
+
+        state = {
+            'version': INDEX_FORMAT_VERSION,
+            'k1': self.k1,
+            'b': self.b,
+            'field_weights': self.field_weights,
+            'docs': self.docs,
+            'postings': encoded,
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=SEARCH_INDEX_PATH):
+        """
+        Load an index written by save(). Only load files you created yourself.
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            SearchIndex: Loaded index
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+
+        if state.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index version: {state.get('version')}")
+
+        index = cls(k1=state['k1'], b=state['b'], field_weights=state['field_weights'])
+        index.docs = state['docs']
+
+        for field in FIELDS:
+            postings = index.postings[field]
+            doc_lengths = index.doc_lengths[field]
+            doc_terms = {}
+
+            for term, data in state['postings'][field].items():
+                values = decode_varints(data)
+                term_postings = {}
+                movie_id = i = 0
+                while i < len(values):
+                    movie_id += values[i]
+                    count = values[i + 1]
+                    positions = array('I')
+                    last = 0
+                    for delta in values[i + 2:i + 2 + count]:
+                        last += delta
+                        positions.append(last)
+                    term_postings[movie_id] = positions
+                    doc_terms.setdefault(movie_id, []).append(term)
+                    i += 2 + count
+                postings[term] = term_postings
+
+            # Document length is the sum of term frequencies over its terms
+            for movie_id in index.docs:
+                terms = doc_terms.get(movie_id, [])
+                index.doc_terms[field][movie_id] = tuple(terms)
+                doc_lengths[movie_id] = sum(len(postings[term][movie_id]) for term in terms)
+            index.total_lengths[field] = sum(doc_lengths.values())
+
+        return index
+
+
+def build_from_database(connection, batch_size=5000):
+    """
+    Build a SearchIndex from the movies table.
+
+    Args:
+        connection: MySQL connection object
+        batch_size (int): Rows fetched per round trip
+
+    Returns:
+        SearchIndex: Index over every movie
+    """
+    index = SearchIndex()
+    cursor = connection.cursor()
+
+    try:
+        if SPLIT_MOVIE_TEXT:
+            cursor.execute("""
+            SELECT m.movie_id, m.title, t.overview, m.vote_average, YEAR(m.release_date), m.popularity
+            FROM movies m
+            LEFT JOIN movie_texts t ON t.movie_id = m.movie_id
+            """)
+        else:
+            cursor.execute("""
+            SELECT movie_id, title, overview, vote_average, YEAR(release_date), popularity
+            FROM movies
+            """)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for movie_id, title, overview, rating, year, popularity in rows:
+                index.add_document(movie_id, title, overview, rating, year, popularity)
+
+        return index
+
+    except Error as e:
+        print(f"Error building search index: {e}")
+        raise
+
+    finally:
+        cursor.close()
+
+
+def load_or_create(connection, path=SEARCH_INDEX_PATH):
+    """
+    Load the index at path, or build it from the database if the file does
+    not exist, so an index that is updated and saved always covers every movie.
+
+    Args:
+        connection: Connection used if the index has to be built
+        path (str): Index file
+
+    Returns:
+        SearchIndex: Index to update
+    """
+    if os.path.exists(path):
+        return SearchIndex.load(path)
+    print(f"No index at {path}, building it from the database...")
+    return build_from_database(connection)
+
+
+def get_index(connection=None):
+    """
+    Return the shared index, loading it from SEARCH_INDEX_PATH or building it
+    from the database on first use.
+
+    Args:
+        connection: MySQL connection used if the index has to be built
+
+    Returns:
+        SearchIndex: Shared index
+    """
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            if os.path.exists(SEARCH_INDEX_PATH):
+                _index = SearchIndex.load(SEARCH_INDEX_PATH)
+            elif connection is not None:
+                _index = build_from_database(connection)
+            else:
+                raise RuntimeError("No search index file found and no connection to build one")
+        return _index
+
+
+def shared_index():
+    """
+    Return the shared index without ever building it: the index file is loaded
+    once (concurrent first callers wait for that load), and None is returned
+    while there is no file. The query functions use this; a build reads every
+    title and overview and is left to the CLI and ingestion.
+
+    Returns:
+        SearchIndex: Shared index, or None
+    """
+    global _index
+
+    if _index is None and os.path.exists(SEARCH_INDEX_PATH):
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex.load(SEARCH_INDEX_PATH)
+    return _index
+
+
+def set_index(index):
+    """Replace the shared index (e.g. after a rebuild)."""
+    global _index
+    _index = index
+
+
+def benchmark(connection, search_terms, repeats=20):
+    """
+    Compare query_1/query_2 latency between the MySQL and local engines.
+
+    Args:
+        connection: MySQL connection object
+        search_terms (list): Terms used for both queries
+        repeats (int): Calls per term and engine
+
+    Returns:
+        dict: (query, engine) -> mean latency in milliseconds
+    """
+    import queries_db_script
+
+    results = {}
+    previous_engine = queries_db_script.SEARCH_ENGINE
+
+    try:
+        for engine in ('mysql', 'local'):
+            queries_db_script.set_search_engine(engine)
+            for name, func in (('query_1', queries_db_script.query_1),
+                               ('query_2', queries_db_script.query_2)):
+                func(connection, search_terms[0])  # Warm-up
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    for term in search_terms:
+                        func(connection, term)
+                elapsed = time.perf_counter() - start
+                results[(name, engine)] = elapsed * 1000 / (repeats * len(search_terms))
+    finally:
+        queries_db_script.set_search_engine(previous_engine)
+
+    return results
+
+
+def main():
+    """
+    Build the index from MySQL, or benchmark it against MySQL FULLTEXT.
+    """
+    import mysql.connector
+
+    db_config = {
+        'host': os.getenv('DB_HOST', '127.0.0.1'),
+        'port': int(os.getenv('DB_PORT', 3305)),
+        'user': os.getenv('DB_USER', 'yarony'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME', 'yarony')
+    }
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    connection = None
+
+    try:
+        connection = mysql.connector.connect(**db_config)
+
+        if command == 'build':
+            start = time.perf_counter()
+            index = build_from_database(connection)
+            index.save(SEARCH_INDEX_PATH)
+            print(f"✓ Indexed {len(index):,} movies in {time.perf_counter() - start:.2f}s")
+            print(f"✓ Saved to {SEARCH_INDEX_PATH} ({os.path.getsize(SEARCH_INDEX_PATH) / 1e6:.1f} MB)")
+
+        elif command == 'bench':
+            set_index(get_index(connection))
+            terms = sys.argv[2:] or ["space", "time travel", "love", "star", "dark knight"]
+            results = benchmark(connection, terms)
+
+            print(f"{'Query':<10}{'MySQL ms':<12}{'Local ms':<12}{'Speedup'}")
+            print("-"*44)
+            for name in ('query_1', 'query_2'):
+                mysql_ms = results[(name, 'mysql')]
+                local_ms = results[(name, 'local')]
+                speedup = mysql_ms / local_ms if local_ms else float('inf')
+                print(f"{name:<10}{mysql_ms:<12.3f}{local_ms:<12.3f}{speedup:.1f}x")
+
+        else:
+            print(f"Unknown command '{command}'. Use 'build' or 'bench'.")
+            return 1
+
+    except Error as e:
+        print(f"\nDatabase Error: {e}")
+        return 1
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,420 @@
+"""
+HTTP Search Service for MovieFinder Application
+Serves query_1..query_5 and search_movies as JSON over HTTP from one asyncio process.
+
+The query functions stay synchronous: each request borrows a pooled read
+connection from db_routing (a replica when DB_REPLICAS is set) and runs on a
+worker thread, so the event loop only parses
+requests and writes responses. At most SERVICE_POOL_SIZE queries run at once;
+up to SERVICE_MAX_QUEUE more wait for a connection, and anything beyond that is
+answered immediately with 503 instead of piling up. Requests that take longer
+than SERVICE_TIMEOUT seconds are answered with 504.
+
+Endpoints (GET, parameters in the query string):
+    /query_1?keywords=space+exploration
+    /query_2?title=dark+knight
+    /query_3?min_movies=20[&year_from=&year_to=]
+    /query_3_approx?min_movies=20[&year_from=&year_to=]
+    /query_4?actor=Tom+Hanks&min_collaborations=2[&year_from=&year_to=]
+    /query_5?director=Christopher+Nolan&min_rating=7.0[&year_from=&year_to=]
+    /search?text=dark+knight[&genre=&year_from=&year_to=&limit=]
+    /movie?ids=155,157336
+    /browse?genre=Action&year_from=2000&min_rating=7[&year_to=&sort=popularity&page=1&page_size=20]
+    /similar?movie_id=155[&limit=10]         (needs a prebuilt similarity_index.npz)
+    /top?board=genre&key=Drama[&limit=20]
+    /trending?days=7[&limit=20]
+    /health
+
+Usage:
+    python src/search_service.py
+"""
+
+import asyncio
+import json
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from urllib.parse import urlsplit, parse_qs
+
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+import queries_db_script
+import search_index
+import similarity_index
+from db_routing import ConnectionRouter, ReplicaUnavailable
+from queries_db_script import (query_1, query_2, query_3, query_3_approximate, query_4, query_5,
+                               search_movies, get_movie, browse_movies, BrowsePage, BROWSE_SORTS,
+                               similar_movies, top_movies, BOARDS, trending_movies)
+from query_budgets import TimedOut, cancel_query
+from request_coalescing import coalescing_stats
+
+# Load environment variables
+load_dotenv()
+
+SERVICE_HOST = os.getenv('SERVICE_HOST', '127.0.0.1')
+SERVICE_PORT = int(os.getenv('SERVICE_PORT', 8080))
+
+# Pooled MySQL connections per server, which is also the number of queries run
+# concurrently (mysql.connector caps a pool at 32)
+SERVICE_POOL_SIZE = int(os.getenv('SERVICE_POOL_SIZE', 16))
+
+# Requests allowed to wait for a connection before new ones get 503
+SERVICE_MAX_QUEUE = int(os.getenv('SERVICE_MAX_QUEUE', 256))
+
+# Seconds before a request is answered with 504
+SERVICE_TIMEOUT = float(os.getenv('SERVICE_TIMEOUT', 5.0))
+
+# Seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT = 15.0
+
+MAX_HEADER_BYTES = 16384
+
+# Movies fetched by one /movie request
+MAX_MOVIE_IDS = 100
+
+
+def optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def optional_float(value):
+    return float(value) if value not in (None, '') else None
+
+
+def sort_order(value):
+    if value not in BROWSE_SORTS:
+        raise ValueError(value)
+    return value
+
+
+def board_name(value):
+    if value not in BOARDS:
+        raise ValueError(value)
+    return value
+
+
+def board_key(arguments):
+    """Check the key of a /top request against its board (year keys are years)."""
+    if arguments['board'] == 'year':
+        try:
+            arguments['key'] = int(arguments['key'])
+        except ValueError:
+            raise BadRequest("Invalid value for 'key': the year board takes a year")
+
+
+def id_list(value):
+    ids = [int(v) for v in value.split(',') if v.strip()]
+    if not ids or len(ids) > MAX_MOVIE_IDS:
+        raise ValueError(value)
+    return ids
+
+
+# Endpoint -> (query function, [(parameter, converter, default)], result field names).
+# A default of ... marks a required parameter.
+ENDPOINTS = {
+    '/query_1': (query_1, [('keywords', str, ...)],
+                 ('title', 'rating', 'year', 'overview_snippet', 'relevance_score')),
+    '/query_2': (query_2, [('title', str, ...)],
+                 ('title', 'rating', 'year', 'popularity', 'relevance_score')),
+    '/query_3': (query_3, [('min_movies', int, 20), ('year_from', optional_int, None),
+                           ('year_to', optional_int, None)],
+                 ('genre_name', 'avg_rating', 'movie_count', 'total_revenue', 'avg_revenue')),
+    '/query_3_approx': (query_3_approximate, [('min_movies', int, 20), ('year_from', optional_int, None),
+                                              ('year_to', optional_int, None)],
+                        ('genre_name', 'avg_rating', 'movie_count', 'total_revenue', 'avg_revenue',
+                         'quantiles', 'errors')),
+    '/query_4': (query_4, [('actor', str, ...), ('min_collaborations', int, 2),
+                           ('year_from', optional_int, None), ('year_to', optional_int, None)],
+                 ('collaborator_name', 'collaboration_count', 'movie_titles')),
+    '/query_5': (query_5, [('director', str, ...), ('min_rating', float, 7.0),
+                           ('year_from', optional_int, None), ('year_to', optional_int, None)],
+                 ('title', 'rating', 'year', 'revenue', 'top_cast')),
+    '/search': (search_movies, [('text', str, ...), ('genre', str, None),
+                                ('year_from', optional_int, None), ('year_to', optional_int, None),
+                                ('limit', int, 20)],
+                ('movie_id', 'title', 'rating', 'year', 'popularity', 'overview_snippet', 'score')),
+    '/movie': (get_movie, [('ids', id_list, ...)], ('movie_id', 'document')),
+    '/browse': (browse_movies, [('genre', str, None), ('year_from', optional_int, None),
+                                ('year_to', optional_int, None), ('min_rating', optional_float, None),
+                                ('sort', sort_order, 'popularity'), ('page', int, 1), ('page_size', int, 20)],
+                ('movie_id', 'title', 'rating', 'year', 'popularity', 'vote_count')),
+    '/similar': (similar_movies, [('movie_id', int, ...), ('limit', int, 10)],
+                 ('movie_id', 'title', 'rating', 'year', 'similarity')),
+    '/top': (top_movies, [('board', board_name, ...), ('key', str, ...), ('limit', int, 20)],
+             ('movie_id', 'title', 'rating', 'vote_count', 'year')),
+    '/trending': (trending_movies, [('days', int, 7), ('limit', int, 20)],
+                  ('movie_id', 'title', 'recent_popularity', 'prior_popularity', 'growth', 'votes_gained')),
+}
+
+# Endpoint -> check of the parsed arguments taken together (raises BadRequest)
+CHECKS = {
+    '/top': board_key,
+}
+
+STATUS_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class BadRequest(Exception):
+    """Invalid or missing request parameter."""
+
+
+def json_default(value):
+    """Serialize the non-JSON types returned by mysql.connector."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', 'replace')
+    return str(value)
+
+
+def parse_arguments(spec, query_string):
+    """
+    Convert query-string values into keyword arguments for a query function.
+
+    Args:
+        spec (list): [(parameter, converter, default)] from ENDPOINTS
+        query_string (str): Raw URL query string
+
+    Returns:
+        dict: Keyword arguments, in spec order
+    """
+    values = parse_qs(query_string, keep_blank_values=False)
+    arguments = {}
+
+    for name, convert, default in spec:
+        if name in values:
+            try:
+                arguments[name] = convert(values[name][0])
+            except ValueError:
+                raise BadRequest(f"Invalid value for '{name}'")
+        elif default is ...:
+            raise BadRequest(f"Missing parameter '{name}'")
+        else:
+            arguments[name] = default
+
+    return arguments
+
+
+class SearchService:
+    """Asyncio HTTP server running the query functions on a pooled thread executor."""
+
+    def __init__(self, pool_size=SERVICE_POOL_SIZE, max_queue=SERVICE_MAX_QUEUE, timeout=SERVICE_TIMEOUT):
+        self.router = ConnectionRouter(pool_size=pool_size)
+        self.pool_size = pool_size
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='query')
+        self.slots = asyncio.Semaphore(pool_size)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.waiting = 0
+        self.in_flight = 0
+        self.stats = {'served': 0, 'rejected': 0, 'timed_out': 0, 'errors': 0}
+        self.server = None
+
+    def run_query(self, func, arguments, running):
+        """
+        Run one query on a pooled connection (executes on a worker thread).
+        The connection is published in running['connection'] so the request
+        can cancel the query if it gives up waiting.
+        """
+        connection = self.router.read_connection()
+        running['connection'] = connection
+        try:
+            return func(connection, *arguments.values())
+        finally:
+            running.pop('connection', None)
+            connection.close()  # Returns the connection to the pool
+
+    def release_slot(self, future):
+        """Free a query slot once its worker thread is done."""
+        self.in_flight -= 1
+        self.slots.release()
+        if not future.cancelled():
+            future.exception()  # Mark an abandoned failure as retrieved
+
+    async def execute(self, path, query_string):
+        """
+        Run the query behind an endpoint under the concurrency and time limits.
+
+        Returns:
+            tuple: (HTTP status, response body dict)
+        """
+        if path == '/health':
+            return 200, {'status': 'ok', 'in_flight': self.in_flight, 'waiting': self.waiting,
+                         **self.stats, 'coalescing': coalescing_stats(), 'routing': self.router.status()}
+        if path not in ENDPOINTS:
+            return 404, {'error': f"Unknown endpoint {path}"}
+
+        func, spec, fields = ENDPOINTS[path]
+        try:
+            arguments = parse_arguments(spec, query_string)
+            if path in CHECKS:
+                CHECKS[path](arguments)
+        except BadRequest as e:
+            return 400, {'error': str(e)}
+
+        if self.waiting >= self.max_queue:
+            self.stats['rejected'] += 1
+            return 503, {'error': 'Too many concurrent requests'}
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        deadline = loop.time() + self.timeout
+
+        # The deadline covers both waiting for a connection and running the query
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            return 504, {'error': f"No connection available within {self.timeout:.1f}s"}
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        running = {}
+        future = loop.run_in_executor(self.executor, self.run_query, func, arguments, running)
+        # The slot is released when the thread finishes, even if the client was
+        # already answered with 504, so the pool is never oversubscribed
+        future.add_done_callback(self.release_slot)
+
+        try:
+            rows = await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            # Stop the abandoned statement so it frees its connection early
+            connection = running.get('connection')
+            if connection is not None:
+                loop.run_in_executor(None, cancel_query, connection)
+            return 504, {'error': 'timed_out', 'query': func.__name__,
+                         'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)}
+        except ReplicaUnavailable as e:
+            self.stats['rejected'] += 1
+            return 503, {'error': str(e)}
+        except Error as e:
+            self.stats['errors'] += 1
+            return 500, {'error': str(e)}
+        except Exception as e:
+            # Any other failure still gets an answer instead of a dropped connection
+            self.stats['errors'] += 1
+            print(f"Error serving {path}: {type(e).__name__}: {e}")
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+        if isinstance(rows, TimedOut):
+            self.stats['timed_out'] += 1
+            return 504, rows.to_dict()
+
+        # Query functions catch their database errors and return QueryFailed
+        if getattr(rows, 'failed', False):
+            self.stats['errors'] += 1
+            return 500, {'error': str(rows.error), 'query': rows.query}
+
+        self.stats['served'] += 1
+
+        body = {
+            'results': [dict(zip(fields, row)) for row in rows],
+            'count': len(rows),
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+        if isinstance(rows, BrowsePage):
+            body.update(total=rows.total, page=rows.page, page_size=rows.page_size, facets=rows.facets)
+        return 200, body
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one client connection (keep-alive aware)."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+
+                if method != 'GET':
+                    status, body = 405, {'error': 'Only GET is supported'}
+                else:
+                    url = urlsplit(target)
+                    status, body = await self.execute(url.path, url.query)
+
+                payload = json.dumps(body, default=json_default).encode('utf-8')
+                response_headers = [
+                    f"HTTP/1.1 {status} {STATUS_REASONS[status]}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(payload)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == 503:
+                    response_headers.append("Retry-After: 1")
+                writer.write(("\r\n".join(response_headers) + "\r\n\r\n").encode('latin-1') + payload)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        """Serve until SIGINT/SIGTERM, then let in-flight requests finish."""
+        # Load the in-process indices before taking requests; they are never built on the request path
+        if similarity_index.shared_index() is None:
+            print(f"⚠ No similarity index at {similarity_index.SIMILARITY_INDEX_PATH}; /similar returns "
+                  f"no results until `python src/similarity_index.py build` has been run")
+        if queries_db_script.SEARCH_ENGINE == 'local' and search_index.shared_index() is None:
+            print(f"⚠ No search index at {search_index.SEARCH_INDEX_PATH}; /query_1 and /query_2 fail "
+                  f"until `python src/search_index.py build` has been run")
+
+        self.server = await asyncio.start_server(self.handle_connection, host, port,
+                                                 limit=MAX_HEADER_BYTES, backlog=1024)
+        print(f"MovieFinder search service listening on http://{host}:{port} "
+              f"(pool {self.pool_size}, queue {self.max_queue}, timeout {self.timeout:.1f}s)")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        await stop.wait()
+        print("\nShutting down...")
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+        print(f"Served {self.stats['served']:,} requests "
+              f"(rejected {self.stats['rejected']}, timed out {self.stats['timed_out']})")
+
+
+def main():
+    """
+    Start the search service.
+    """
+    try:
+        asyncio.run(SearchService().serve())
+    except Error as e:
+        print(f"\nFATAL ERROR: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
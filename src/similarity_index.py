@@ -0,0 +1,614 @@
+"""
+Similar-Movie Index for MovieFinder Application
+MinHash signatures over each movie's genres, cast and crew, bucketed with
+locality-sensitive hashing (LSH), so "more like this" looks at a handful of
+candidates instead of comparing a movie with every other one.
+
+A movie is the set of its features (genre IDs, cast person IDs, crew person
+IDs). Two movies sharing a fraction J of their features (Jaccard similarity)
+agree on each MinHash value with probability J. The signature is cut into
+bands; movies whose signatures are identical in at least one band become
+candidates, which are ranked by the fraction of agreeing values.
+
+Movies added after the bulk build (add_movies()) go into a small in-memory
+delta that is merged into the sorted band tables by compact() and save().
+
+Usage:
+    python src/similarity_index.py build                 # build from MySQL and save
+    python src/similarity_index.py similar <movie_id>    # top 10 similar movies
+    python src/similarity_index.py bench [sample]        # recall/speed vs exact Jaccard
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Where the index is persisted between runs
+SIMILARITY_INDEX_PATH = os.getenv('SIMILARITY_INDEX_PATH', 'similarity_index.npz')
+
+# MinHash values per movie, and LSH bands they are split into (rows per band =
+# NUM_PERM / LSH_BANDS). A pair becomes a candidate with probability
+# 1 - (1 - J**rows)**bands: with 64 bands of 2 rows that is ~63% at J=0.125
+# and >99% from J=0.3, the range where movies sharing a director or lead cast fall.
+NUM_PERM = 128
+LSH_BANDS = 64
+
+# Universal hashing modulus (prime just above 2**32)
+HASH_PRIME = 4294967311
+
+# Feature kinds, kept in the top bits of the feature value
+FEATURE_GENRE = 1
+FEATURE_CAST = 2
+FEATURE_CREW = 3
+
+# Rows fetched per round trip while building
+BUILD_BATCH_SIZE = 20000
+
+# On-disk format version
+INDEX_FORMAT_VERSION = 1
+
+# Index shared by the query functions (loaded from SIMILARITY_INDEX_PATH on first use)
+_index = None
+_index_lock = threading.Lock()
+
+FEATURES_QUERY = """
+SELECT movie_id, {genre} AS kind, genre_id AS value FROM movie_genres {where}
+UNION ALL
+SELECT movie_id, {cast}, person_id FROM movie_cast {where_person}
+UNION ALL
+SELECT movie_id, {crew}, person_id FROM movie_crew {where}
+ORDER BY movie_id
+"""
+
+
+def mix64(values):
+    """
+    SplitMix64 finalizer: spread feature values over 64 bits before hashing.
+
+    Args:
+        values (np.ndarray): uint64 values
+
+    Returns:
+        np.ndarray: uint64 hashes
+    """
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def feature_values(features):
+    """
+    Encode (kind, id) feature pairs as integers.
+
+    Args:
+        features (iterable): (kind, id) pairs
+
+    Returns:
+        np.ndarray: uint64 feature values
+    """
+    return np.array([(kind << 40) | value for kind, value in features], dtype=np.uint64)
+
+
+def fetch_features(connection, movie_ids=None, batch_size=BUILD_BATCH_SIZE):
+    """
+    Stream the feature sets of movies, grouped by movie.
+
+    Args:
+        connection: MySQL (or SQLite) connection object
+        movie_ids (list): Only these movies (default: all)
+        batch_size (int): Rows fetched per round trip
+
+    Yields:
+        tuple: (movie_id, set of (kind, id) pairs)
+    """
+    where = where_person = ""
+    params = ()
+    if movie_ids is not None:
+        movie_ids = [int(movie_id) for movie_id in movie_ids]
+        if not movie_ids:
+            return
+        id_list = ', '.join(str(movie_id) for movie_id in movie_ids)
+        where = f"WHERE movie_id IN ({id_list})"
+    where_person = f"{where} {'AND' if where else 'WHERE'} person_id IS NOT NULL"
+
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(FEATURES_QUERY.format(genre=FEATURE_GENRE, cast=FEATURE_CAST, crew=FEATURE_CREW,
+                                             where=where, where_person=where_person), params)
+        current, features = None, set()
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for movie_id, kind, value in rows:
+                if movie_id != current:
+                    if current is not None:
+                        yield current, features
+                    current, features = movie_id, set()
+                features.add((int(kind), int(value)))
+        if current is not None:
+            yield current, features
+    finally:
+        cursor.close()
+
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sets."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index answering top-K similar movies.
+
+    Signatures live in a (rows, NUM_PERM) uint32 array. Each band has a sorted
+    array of band hashes with the matching rows, searched with binary search;
+    movies added since the last compact() are looked up in per-band dicts.
+
+    Args:
+        num_perm (int): MinHash values per movie
+        bands (int): LSH bands (must divide num_perm)
+        seed (int): Seed of the hash functions (an index must be queried
+            with the functions it was built with)
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=LSH_BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"{bands} bands do not divide {num_perm} permutations")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+        # Multipliers combining a band's values into one 64-bit key
+        self.band_multipliers = mix64(np.arange(1, self.rows_per_band + 1, dtype=np.uint64))
+
+        self.movie_ids = np.zeros(0, dtype=np.int64)
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self.band_keys = [np.zeros(0, dtype=np.uint64) for _ in range(bands)]
+        self.band_rows = [np.zeros(0, dtype=np.int32) for _ in range(bands)]
+        self.row_of = {}
+
+        self._delta_ids = []
+        self._delta_signatures = []
+        self._delta_buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def signature(self, features):
+        """
+        MinHash signature of a feature set.
+
+        Args:
+            features (iterable): (kind, id) pairs
+
+        Returns:
+            np.ndarray: uint32 array of num_perm values
+        """
+        hashed = mix64(feature_values(features)) & np.uint64(0xFFFFFFFF)
+        if not len(hashed):
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        values = (self.a[:, None] * hashed[None, :] + self.b[:, None]) % np.uint64(HASH_PRIME)
+        return (values.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def band_hashes(self, signatures):
+        """
+        One 64-bit key per band for each signature.
+
+        Args:
+            signatures (np.ndarray): (n, num_perm) uint32 signatures
+
+        Returns:
+            np.ndarray: (n, bands) uint64 keys
+        """
+        grouped = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows_per_band)
+        with np.errstate(over='ignore'):
+            return mix64((grouped * self.band_multipliers).sum(axis=2, dtype=np.uint64))
+
+    def add(self, movie_id, features):
+        """
+        Add or replace one movie. It is searchable immediately.
+
+        Args:
+            movie_id (int): Movie ID
+            features (iterable): (kind, id) pairs
+        """
+        signature = self.signature(features)
+        row = len(self.movie_ids) + len(self._delta_ids)
+        self._delta_ids.append(int(movie_id))
+        self._delta_signatures.append(signature)
+        for band, key in enumerate(self.band_hashes(signature[None, :])[0].tolist()):
+            self._delta_buckets[band].setdefault(key, []).append(row)
+        self.row_of[int(movie_id)] = row
+
+    def add_movies(self, connection, movie_ids):
+        """
+        Add or refresh movies from the database (e.g. right after ingesting them).
+
+        Args:
+            connection: Database connection object
+            movie_ids (list): Movie IDs
+
+        Returns:
+            int: Number of movies added
+        """
+        added = 0
+        for movie_id, features in fetch_features(connection, movie_ids):
+            self.add(movie_id, features)
+            added += 1
+        return added
+
+    def compact(self):
+        """Merge added movies into the sorted band tables and drop replaced rows."""
+        if self._delta_ids:
+            self.movie_ids = np.concatenate([self.movie_ids, np.array(self._delta_ids, dtype=np.int64)])
+            self.signatures = np.vstack([self.signatures, np.array(self._delta_signatures, dtype=np.uint32)])
+
+        # Keep the latest row of every movie
+        live = np.array(sorted(self.row_of.values()), dtype=np.int64)
+        if len(live) != len(self.movie_ids):
+            self.movie_ids = self.movie_ids[live]
+            self.signatures = self.signatures[live]
+        self.row_of = {movie_id: row for row, movie_id in enumerate(self.movie_ids.tolist())}
+
+        self.rebuild_bands()
+        self._delta_ids = []
+        self._delta_signatures = []
+        self._delta_buckets = [{} for _ in range(self.bands)]
+
+    def rebuild_bands(self):
+        """Recompute the sorted band tables from the signatures."""
+        keys = self.band_hashes(self.signatures)
+        self.band_keys = []
+        self.band_rows = []
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind='stable').astype(np.int32)
+            self.band_keys.append(keys[order, band])
+            self.band_rows.append(order)
+
+    def with_bands(self, bands):
+        """
+        Copy of the index using the same signatures with a different band count
+        (used by the benchmark to trade recall for speed).
+        """
+        self.compact()
+        index = SimilarityIndex(self.num_perm, bands, self.seed)
+        index.movie_ids = self.movie_ids
+        index.signatures = self.signatures
+        index.row_of = dict(self.row_of)
+        index.rebuild_bands()
+        return index
+
+    def _signature_of_row(self, row):
+        if row < len(self.movie_ids):
+            return self.signatures[row]
+        return self._delta_signatures[row - len(self.movie_ids)]
+
+    def _movie_of_row(self, row):
+        if row < len(self.movie_ids):
+            return int(self.movie_ids[row])
+        return self._delta_ids[row - len(self.movie_ids)]
+
+    def candidates(self, signature):
+        """
+        Rows sharing at least one band with a signature.
+
+        Returns:
+            set: Candidate rows (only the current row of each movie)
+        """
+        rows = set()
+        for band, key in enumerate(self.band_hashes(signature[None, :])[0].tolist()):
+            keys = self.band_keys[band]
+            start = np.searchsorted(keys, np.uint64(key), side='left')
+            end = np.searchsorted(keys, np.uint64(key), side='right')
+            if end > start:
+                rows.update(self.band_rows[band][start:end].tolist())
+            rows.update(self._delta_buckets[band].get(key, ()))
+        return {row for row in rows if self.row_of.get(self._movie_of_row(row)) == row}
+
+    def similar(self, movie_id, k=10):
+        """
+        Most similar movies to an indexed movie.
+
+        Args:
+            movie_id (int): Movie ID
+            k (int): Number of results
+
+        Returns:
+            list: List of (movie_id, estimated Jaccard similarity), best first
+                (empty if the movie is not indexed)
+        """
+        row = self.row_of.get(int(movie_id))
+        if row is None:
+            return []
+
+        signature = self._signature_of_row(row)
+        rows = [r for r in self.candidates(signature) if r != row]
+        if not rows:
+            return []
+
+        main = [r for r in rows if r < len(self.movie_ids)]
+        delta = [r for r in rows if r >= len(self.movie_ids)]
+        candidate_signatures = self.signatures[main]
+        if delta:
+            candidate_signatures = np.vstack([candidate_signatures] +
+                                             [self._delta_signatures[r - len(self.movie_ids)][None, :]
+                                              for r in delta])
+        scores = (candidate_signatures == signature).mean(axis=1)
+
+        ordered = main + delta
+        best = np.argsort(-scores, kind='stable')[:k]
+        return [(self._movie_of_row(ordered[i]), float(scores[i])) for i in best]
+
+    def save(self, path=SIMILARITY_INDEX_PATH):
+        """
+        Compact and save the index.
+
+        Args:
+            path (str): Output file path (.npz)
+        """
+        self.compact()
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, version=INDEX_FORMAT_VERSION, num_perm=self.num_perm, bands=self.bands,
+                 seed=self.seed, movie_ids=self.movie_ids, signatures=self.signatures,
+                 band_keys=np.array(self.band_keys), band_rows=np.array(self.band_rows))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=SIMILARITY_INDEX_PATH):
+        """
+        Load an index written by save().
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            SimilarityIndex: Loaded index
+        """
+        with np.load(path) as state:
+            if int(state['version']) != INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported similarity index version: {int(state['version'])}")
+            index = cls(int(state['num_perm']), int(state['bands']), int(state['seed']))
+            index.movie_ids = state['movie_ids']
+            index.signatures = state['signatures']
+            index.band_keys = list(state['band_keys'])
+            index.band_rows = list(state['band_rows'])
+        index.row_of = {movie_id: row for row, movie_id in enumerate(index.movie_ids.tolist())}
+        return index
+
+
+def build_from_database(connection, num_perm=NUM_PERM, bands=LSH_BANDS):
+    """
+    Build a SimilarityIndex over every movie with at least one feature.
+
+    Args:
+        connection: Database connection object
+        num_perm (int): MinHash values per movie
+        bands (int): LSH bands
+
+    Returns:
+        SimilarityIndex: Compacted index
+    """
+    index = SimilarityIndex(num_perm, bands)
+    movie_ids = []
+    signatures = []
+
+    try:
+        for movie_id, features in fetch_features(connection):
+            movie_ids.append(movie_id)
+            signatures.append(index.signature(features))
+    except Error as e:
+        print(f"Error building similarity index: {e}")
+        raise
+
+    index.movie_ids = np.array(movie_ids, dtype=np.int64)
+    index.signatures = (np.array(signatures, dtype=np.uint32) if signatures
+                        else np.zeros((0, num_perm), dtype=np.uint32))
+    index.row_of = {movie_id: row for row, movie_id in enumerate(movie_ids)}
+    index.rebuild_bands()
+    return index
+
+
+def load_or_create(connection, path=SIMILARITY_INDEX_PATH):
+    """
+    Load the index at path, or build it from the database if the file does
+    not exist, so an index that is updated and saved always covers every movie.
+
+    Args:
+        connection: Connection used if the index has to be built
+        path (str): Index file
+
+    Returns:
+        SimilarityIndex: Index to update
+    """
+    if os.path.exists(path):
+        return SimilarityIndex.load(path)
+    print(f"No index at {path}, building it from the database...")
+    return build_from_database(connection)
+
+
+def get_index(connection=None):
+    """
+    Return the shared index, loading it from SIMILARITY_INDEX_PATH or building
+    it from the database on first use.
+
+    Args:
+        connection: Connection used if the index has to be built
+
+    Returns:
+        SimilarityIndex: Shared index
+    """
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            if os.path.exists(SIMILARITY_INDEX_PATH):
+                _index = SimilarityIndex.load(SIMILARITY_INDEX_PATH)
+            elif connection is not None:
+                _index = build_from_database(connection)
+            else:
+                raise RuntimeError("No similarity index file found and no connection to build one")
+        return _index
+
+
+def shared_index():
+    """
+    Return the shared index without ever building it: the index file is loaded
+    once (concurrent first callers wait for that load), and None is returned
+    while there is no file. This is what the request path uses; a build reads
+    every credit and takes far longer than a query budget.
+
+    Returns:
+        SimilarityIndex: Shared index, or None
+    """
+    global _index
+
+    if _index is None and os.path.exists(SIMILARITY_INDEX_PATH):
+        with _index_lock:
+            if _index is None:
+                _index = SimilarityIndex.load(SIMILARITY_INDEX_PATH)
+    return _index
+
+
+def set_index(index):
+    """Replace the shared index (e.g. after a rebuild)."""
+    global _index
+    _index = index
+
+
+def benchmark(connection, index, sample_size=200, k=10, band_options=(16, 32, 64)):
+    """
+    Compare LSH top-K with exact Jaccard top-K on a sample of movies.
+
+    The exact search uses an inverted index from feature to movies, so only
+    movies sharing at least one feature are scored; that is still exact, since
+    every other movie has a Jaccard similarity of 0. Recall counts an LSH result
+    as correct when its exact similarity reaches the k-th best exact similarity,
+    so ties do not penalize either side.
+
+    Args:
+        connection: Database connection object
+        index (SimilarityIndex): Built index
+        sample_size (int): Movies queried
+        k (int): Results per query
+        band_options (tuple): Band counts to evaluate
+
+    Returns:
+        list: List of tuples (method, recall@k, mean ms per query, mean candidates)
+    """
+    features = {}
+    postings = {}
+    for movie_id, movie_features in fetch_features(connection):
+        features[movie_id] = movie_features
+        for feature in movie_features:
+            postings.setdefault(feature, []).append(movie_id)
+
+    sample = random.Random(42).sample(sorted(features), min(sample_size, len(features)))
+
+    exact = {}
+    start = time.perf_counter()
+    for movie_id in sample:
+        movie_features = features[movie_id]
+        others = {other for feature in movie_features for other in postings[feature]}
+        others.discard(movie_id)
+        scored = sorted(((jaccard(movie_features, features[other]), other) for other in others), reverse=True)
+        exact[movie_id] = scored[:k]
+    exact_ms = (time.perf_counter() - start) * 1000 / max(len(sample), 1)
+
+    results = [('exact (inverted index)', 1.0, exact_ms, None)]
+
+    for bands in band_options:
+        if index.num_perm % bands:
+            continue
+        banded = index.with_bands(bands)
+        hits = relevant = candidates = 0
+        start = time.perf_counter()
+        answers = {movie_id: banded.similar(movie_id, k) for movie_id in sample}
+        lsh_ms = (time.perf_counter() - start) * 1000 / max(len(sample), 1)
+
+        for movie_id in sample:
+            best = exact[movie_id]
+            if not best:
+                continue
+            threshold = best[-1][0]
+            relevant += len(best)
+            hits += sum(1 for other, _ in answers[movie_id]
+                        if jaccard(features[movie_id], features.get(other, set())) >= threshold > 0)
+            candidates += len(banded.candidates(banded.signatures[banded.row_of[movie_id]]))
+
+        method = f"LSH {bands}x{index.num_perm // bands}"
+        results.append((method, hits / relevant if relevant else 0.0, lsh_ms, candidates / max(len(sample), 1)))
+
+    return results
+
+
+def main():
+    """
+    Build the index from MySQL, look up similar movies, or benchmark recall.
+    """
+    from api_data_retrieve import get_db_connection
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    connection = None
+
+    try:
+        connection = get_db_connection()
+
+        if command == 'build':
+            start = time.perf_counter()
+            index = build_from_database(connection)
+            index.save(SIMILARITY_INDEX_PATH)
+            print(f"✓ Indexed {len(index):,} movies in {time.perf_counter() - start:.2f}s")
+            print(f"✓ Saved to {SIMILARITY_INDEX_PATH} ({os.path.getsize(SIMILARITY_INDEX_PATH) / 1e6:.1f} MB)")
+
+        elif command == 'similar':
+            from queries_db_script import similar_movies
+
+            set_index(get_index(connection))
+            for movie_id, title, rating, year, similarity in similar_movies(connection, int(sys.argv[2])):
+                print(f"{similarity:.2f}  {title} ({year or 'N/A'}) - Rating: {rating or 'N/A'}")
+
+        elif command == 'bench':
+            sample_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+            index = get_index(connection)
+            print(f"Benchmarking top-10 on {sample_size} movies of {len(index):,}...\n")
+            print(f"{'Method':<26}{'Recall@10':<12}{'ms/query':<12}{'Candidates'}")
+            print("-"*62)
+            for method, recall, ms, candidates in benchmark(connection, index, sample_size):
+                print(f"{method:<26}{recall:<12.1%}{ms:<12.3f}{'-' if candidates is None else f'{candidates:,.0f}'}")
+
+        else:
+            print(f"Unknown command '{command}'. Use 'build', 'similar' or 'bench'.")
+            return 1
+
+    except Error as e:
+        print(f"\nDatabase Error: {e}")
+        return 1
+
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
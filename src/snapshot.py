@@ -0,0 +1,501 @@
+"""
+Catalogue Snapshots for MovieFinder Application
+Exports every table into one compressed, columnar binary file and restores it
+into a fresh schema, as a fast alternative to re-crawling TMDb or loading a
+mysqldump.
+
+File layout:
+    MAGIC
+    block*      <meta length, payload length> + JSON meta + zlib payload; one block
+                holds up to SNAPSHOT_BLOCK_ROWS rows of one table, stored column by
+                column (null mask, then fixed-width values, or offsets + the UTF-8
+                text or raw bytes of string and binary columns)
+    manifest    JSON: layout flags, and per table its columns, row count, block
+                offsets and SHA-256 of the uncompressed payloads
+    <manifest length> MAGIC
+
+The export reads all tables inside one consistent-snapshot transaction. The
+restore creates the tables with primary keys only, loads the tables in parallel
+(one connection per table, foreign key and unique checks off), and builds the
+secondary and FULLTEXT indices once the data is in.
+
+Usage:
+    python src/snapshot.py export [path]            # MySQL -> snapshot file
+    python src/snapshot.py restore [path] [schema]  # snapshot file -> (re)created schema
+    python src/snapshot.py verify [path]            # check every table checksum
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from mysql.connector import Error
+from mysql.connector.constants import FieldType
+from dotenv import load_dotenv
+
+from api_data_retrieve import DB_CONFIG, get_db_connection
+from columnar_analytics import encode_strings
+
+# Load environment variables
+load_dotenv()
+
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'moviefinder.snap')
+
+# Rows per block; a block is the unit of compression and of restore commits
+SNAPSHOT_BLOCK_ROWS = int(os.getenv('SNAPSHOT_BLOCK_ROWS', 50000))
+
+# zlib level for block payloads (1 fastest .. 9 smallest)
+SNAPSHOT_COMPRESSION = int(os.getenv('SNAPSHOT_COMPRESSION', 6))
+
+# Tables restored concurrently
+RESTORE_WORKERS = int(os.getenv('RESTORE_WORKERS', 4))
+
+# Rows per multi-row INSERT during restore (keeps statements under max_allowed_packet)
+RESTORE_INSERT_ROWS = 2000
+
+MAGIC = b'MFSNAP01'
+BLOCK_HEADER = struct.Struct('<II')
+TRAILER = struct.Struct('<Q')
+
+# Column encodings by MySQL field type (anything else is stored as text)
+INT_TYPES = {'TINY', 'SHORT', 'LONG', 'LONGLONG', 'INT24', 'YEAR'}
+FLOAT_TYPES = {'DECIMAL', 'NEWDECIMAL', 'FLOAT', 'DOUBLE'}
+DATE_TYPES = {'DATE'}
+
+# BLOB, BINARY and VARBINARY share these types with TEXT and (VAR)CHAR; they
+# are told apart by the binary character set
+BYTES_TYPES = {'TINY_BLOB', 'MEDIUM_BLOB', 'LONG_BLOB', 'BLOB', 'VAR_STRING', 'STRING'}
+BINARY_CHARSET = 63
+
+
+def column_kind(column):
+    """
+    Storage kind ('int', 'float', 'date', 'bytes' or 'str') of a MySQL result column.
+
+    Args:
+        column (tuple): Entry of cursor.description (name, type, ..., flags, charset)
+    """
+    name = FieldType.get_info(column[1])
+    if name in INT_TYPES:
+        return 'int'
+    if name in FLOAT_TYPES:
+        return 'float'
+    if name in DATE_TYPES:
+        return 'date'
+    if name in BYTES_TYPES and len(column) > 8 and column[8] == BINARY_CHARSET:
+        return 'bytes'
+    return 'str'
+
+
+def encode_column(kind, values):
+    """
+    Encode one column of a block.
+
+    Args:
+        kind (str): Storage kind
+        values (list): Column values (None for NULL)
+
+    Returns:
+        list: Byte strings (null mask, then the kind's value buffers)
+    """
+    nulls = np.array([value is None for value in values], dtype=bool)
+    parts = [np.packbits(nulls).tobytes()]
+
+    if kind == 'int':
+        parts.append(np.array([0 if v is None else v for v in values], dtype=np.int64).tobytes())
+    elif kind == 'float':
+        parts.append(np.array([0.0 if v is None else float(v) for v in values], dtype=np.float64).tobytes())
+    elif kind == 'date':
+        parts.append(np.array([0 if v is None else v.toordinal() for v in values], dtype=np.int32).tobytes())
+    elif kind == 'bytes':
+        chunks = [b'' if v is None else bytes(v) for v in values]
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        parts.extend([offsets.tobytes(), b''.join(chunks)])
+    else:
+        texts = [v.decode('utf-8') if isinstance(v, (bytes, bytearray))
+                 else None if v is None else str(v) for v in values]
+        blob, offsets = encode_strings(texts)
+        parts.extend([offsets.tobytes(), blob.tobytes()])
+
+    return parts
+
+
+def decode_column(kind, parts, rows):
+    """
+    Decode one column of a block back into Python values.
+
+    Args:
+        kind (str): Storage kind
+        parts (list): Buffers written by encode_column()
+        rows (int): Rows in the block
+
+    Returns:
+        list: Column values (None for NULL)
+    """
+    nulls = np.unpackbits(np.frombuffer(parts[0], dtype=np.uint8), count=rows).astype(bool)
+
+    if kind == 'int':
+        values = np.frombuffer(parts[1], dtype=np.int64).tolist()
+    elif kind == 'float':
+        values = np.frombuffer(parts[1], dtype=np.float64).tolist()
+    elif kind == 'date':
+        values = [datetime.date.fromordinal(d) if d else None
+                  for d in np.frombuffer(parts[1], dtype=np.int32).tolist()]
+    elif kind == 'bytes':
+        offsets = np.frombuffer(parts[1], dtype=np.int64).tolist()
+        blob = parts[2]
+        values = [bytes(blob[offsets[i]:offsets[i + 1]]) for i in range(rows)]
+    else:
+        offsets = np.frombuffer(parts[1], dtype=np.int64).tolist()
+        blob = parts[2]
+        values = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+
+    if nulls.any():
+        for i in np.flatnonzero(nulls).tolist():
+            values[i] = None
+    return values
+
+
+def write_block(output, table, kinds, rows):
+    """
+    Append one block to the snapshot file.
+
+    Returns:
+        tuple: (uncompressed payload bytes, bytes written to the file)
+    """
+    columns = list(zip(*rows))
+    parts = [encode_column(kind, list(values)) for kind, values in zip(kinds, columns)]
+    payload = b''.join(b''.join(column) for column in parts)
+    compressed = zlib.compress(payload, SNAPSHOT_COMPRESSION)
+
+    meta = json.dumps({'table': table, 'rows': len(rows),
+                       'parts': [[len(p) for p in column] for column in parts]}).encode('utf-8')
+    output.write(BLOCK_HEADER.pack(len(meta), len(compressed)))
+    output.write(meta)
+    output.write(compressed)
+    return payload, BLOCK_HEADER.size + len(meta) + len(compressed)
+
+
+def read_block(source, offset, kinds):
+    """
+    Read and decode the block at an offset.
+
+    Returns:
+        tuple: (list of row tuples, uncompressed payload bytes)
+    """
+    source.seek(offset)
+    meta_length, payload_length = BLOCK_HEADER.unpack(source.read(BLOCK_HEADER.size))
+    meta = json.loads(source.read(meta_length))
+    payload = zlib.decompress(source.read(payload_length))
+
+    columns = []
+    position = 0
+    for kind, sizes in zip(kinds, meta['parts']):
+        parts = []
+        for size in sizes:
+            parts.append(payload[position:position + size])
+            position += size
+        columns.append(decode_column(kind, parts, meta['rows']))
+
+    return list(zip(*columns)), payload
+
+
+def read_manifest(path):
+    """
+    Read the manifest at the end of a snapshot file.
+
+    Returns:
+        dict: Manifest
+    """
+    with open(path, 'rb') as source:
+        if source.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a MovieFinder snapshot")
+        source.seek(-(TRAILER.size + len(MAGIC)), os.SEEK_END)
+        (length,) = TRAILER.unpack(source.read(TRAILER.size))
+        if source.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is truncated (no manifest)")
+        source.seek(-(length + TRAILER.size + len(MAGIC)), os.SEEK_END)
+        return json.loads(source.read(length))
+
+
+def detect_layout(connection):
+    """
+    Schema options the catalogue was created with, so the restore can recreate
+    the same tables (see create_db_script.create_tables()).
+
+    Returns:
+        dict: clustered_credits, split_text and partition_by_year flags
+    """
+    from blue_green import list_tables
+    from migrations import table_columns
+
+    return {
+        'clustered_credits': 'id' not in table_columns(connection, 'movie_cast'),
+        'split_text': 'movie_texts' in list_tables(connection, DB_CONFIG['database']),
+        'partition_by_year': 'release_year' in table_columns(connection, 'movies'),
+    }
+
+
+def export_table(connection, output, table):
+    """
+    Stream one table into the snapshot file.
+
+    Returns:
+        dict: Manifest entry of the table
+    """
+    cursor = connection.cursor()
+    entry = {'rows': 0, 'blocks': [], 'bytes': 0}
+    checksum = hashlib.sha256()
+
+    try:
+        cursor.execute(f"SELECT * FROM {table}")
+        entry['columns'] = [column[0] for column in cursor.description]
+        entry['kinds'] = [column_kind(column) for column in cursor.description]
+
+        while True:
+            rows = cursor.fetchmany(SNAPSHOT_BLOCK_ROWS)
+            if not rows:
+                break
+            entry['blocks'].append(output.tell())
+            payload, size = write_block(output, table, entry['kinds'], rows)
+            checksum.update(payload)
+            entry['rows'] += len(rows)
+            entry['bytes'] += size
+
+        entry['sha256'] = checksum.hexdigest()
+        return entry
+    finally:
+        cursor.close()
+
+
+def export_snapshot(connection, path=SNAPSHOT_PATH):
+    """
+    Write every table of the connected schema into a snapshot file. The file is
+    built next to the target and renamed into place when complete.
+
+    Args:
+        connection: MySQL connection object
+        path (str): Snapshot file
+
+    Returns:
+        dict: Manifest of the written snapshot
+    """
+    from blue_green import list_tables
+
+    building = f"{path}.building"
+
+    # Every table is read from the same point in time
+    connection.start_transaction(consistent_snapshot=True, readonly=True)
+
+    try:
+        manifest = {'format': 1, 'created_at': time.time(), 'schema': DB_CONFIG['database'],
+                    'layout': detect_layout(connection), 'tables': {}}
+        tables = list_tables(connection, DB_CONFIG['database'])
+
+        with open(building, 'wb') as output:
+            output.write(MAGIC)
+            for table in tables:
+                start = time.perf_counter()
+                entry = manifest['tables'][table] = export_table(connection, output, table)
+                print(f"✓ {table}: {entry['rows']:,} rows, {entry['bytes'] / 1e6:.1f} MB "
+                      f"in {time.perf_counter() - start:.2f}s")
+
+            encoded = json.dumps(manifest).encode('utf-8')
+            output.write(encoded)
+            output.write(TRAILER.pack(len(encoded)))
+            output.write(MAGIC)
+    except BaseException:
+        if os.path.exists(building):
+            os.remove(building)
+        raise
+    finally:
+        connection.rollback()
+
+    os.replace(building, path)
+    return manifest
+
+
+def restore_table(path, schema, table, entry):
+    """
+    Bulk-load one table from the snapshot on its own connection and verify its
+    checksum.
+
+    Returns:
+        tuple: (table, rows loaded, seconds)
+    """
+    start = time.perf_counter()
+    connection = get_db_connection(schema)
+    cursor = connection.cursor()
+    checksum = hashlib.sha256()
+
+    columns = ', '.join(entry['columns'])
+    placeholders = ', '.join(['%s'] * len(entry['columns']))
+    insert = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+    try:
+        # Tables load in any order and rows are known to be unique
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+
+        with open(path, 'rb') as source:
+            for offset in entry['blocks']:
+                rows, payload = read_block(source, offset, entry['kinds'])
+                checksum.update(payload)
+                for i in range(0, len(rows), RESTORE_INSERT_ROWS):
+                    cursor.executemany(insert, rows[i:i + RESTORE_INSERT_ROWS])
+                connection.commit()
+
+        if checksum.hexdigest() != entry['sha256']:
+            raise ValueError(f"Checksum mismatch in table {table}: snapshot file is corrupt")
+        return table, entry['rows'], time.perf_counter() - start
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def restore_snapshot(path=SNAPSHOT_PATH, schema=None, workers=RESTORE_WORKERS):
+    """
+    Recreate a schema from a snapshot file.
+
+    The schema is dropped and recreated with the snapshot's layout, tables are
+    loaded in parallel with primary keys only, and indices are built afterwards.
+
+    Args:
+        path (str): Snapshot file
+        schema (str): Target schema (default: DB_NAME)
+        workers (int): Tables loaded concurrently
+
+    Returns:
+        dict: Table name -> rows restored
+    """
+    from create_db_script import create_tables, create_indices, get_connection
+    from migrations import ensure_migrations_table
+
+    manifest = read_manifest(path)
+    schema = schema or DB_CONFIG['database']
+    layout = manifest['layout']
+
+    connection = get_connection(include_db=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS {schema}")
+        cursor.execute(f"CREATE DATABASE {schema}")
+        cursor.execute(f"USE {schema}")
+        print(f"✓ Recreated schema '{schema}'")
+    finally:
+        cursor.close()
+
+    try:
+        create_tables(connection, **layout)
+        if 'schema_migrations' in manifest['tables']:
+            ensure_migrations_table(connection)
+
+        # Largest tables first so they do not end up running alone at the end
+        tables = sorted(manifest['tables'].items(), key=lambda item: -item[1]['bytes'])
+        counts = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tables)))) as pool:
+            futures = [pool.submit(restore_table, path, schema, table, entry) for table, entry in tables]
+            for future in futures:
+                table, rows, seconds = future.result()
+                counts[table] = rows
+                print(f"✓ {table}: {rows:,} rows in {seconds:.2f}s")
+        print(f"✓ Loaded {sum(counts.values()):,} rows in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        create_indices(connection, **layout)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"ANALYZE TABLE {', '.join(counts)}")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        print(f"✓ Indexed and analyzed in {time.perf_counter() - start:.2f}s")
+
+        return counts
+    finally:
+        connection.close()
+
+
+def verify_snapshot(path=SNAPSHOT_PATH):
+    """
+    Decode every block and compare the table checksums with the manifest.
+
+    Returns:
+        list: Names of tables whose checksum does not match
+    """
+    manifest = read_manifest(path)
+    corrupt = []
+
+    with open(path, 'rb') as source:
+        for table, entry in manifest['tables'].items():
+            checksum = hashlib.sha256()
+            rows = 0
+            for offset in entry['blocks']:
+                block_rows, payload = read_block(source, offset, entry['kinds'])
+                checksum.update(payload)
+                rows += len(block_rows)
+            ok = checksum.hexdigest() == entry['sha256'] and rows == entry['rows']
+            print(f"{'✓' if ok else '✗'} {table}: {rows:,} rows")
+            if not ok:
+                corrupt.append(table)
+
+    return corrupt
+
+
+def main():
+    """
+    Export, restore or verify a catalogue snapshot.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    path = sys.argv[2] if len(sys.argv) > 2 else SNAPSHOT_PATH
+
+    try:
+        if command == 'export':
+            connection = get_db_connection()
+            try:
+                start = time.perf_counter()
+                manifest = export_snapshot(connection, path)
+                rows = sum(entry['rows'] for entry in manifest['tables'].values())
+                print(f"\nWrote {rows:,} rows to {path} ({os.path.getsize(path) / 1e6:.1f} MB) "
+                      f"in {time.perf_counter() - start:.1f}s")
+            finally:
+                connection.close()
+
+        elif command == 'restore':
+            schema = sys.argv[3] if len(sys.argv) > 3 else None
+            start = time.perf_counter()
+            counts = restore_snapshot(path, schema)
+            print(f"\nRestored {sum(counts.values()):,} rows in {time.perf_counter() - start:.1f}s")
+
+        elif command == 'verify':
+            corrupt = verify_snapshot(path)
+            if corrupt:
+                print(f"\n✗ Corrupt tables: {', '.join(corrupt)}")
+                return 1
+            print("\n✓ All checksums match")
+
+        else:
+            print("Usage: python src/snapshot.py <export|restore|verify> [path] [schema]")
+            return 1
+
+    except Error as e:
+        print(f"\nDatabase Error: {e}")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"\nSnapshot Error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,740 @@
+"""
+Embedded SQLite Backend for MovieFinder Application
+Runs query_1..query_5 and search_movies against a read-only SQLite file, with
+FTS5 replacing the MySQL FULLTEXT indices, so read-heavy nodes can answer
+searches locally without a network round trip to MySQL.
+
+The file is produced from the MySQL database by the exporter below. The query
+functions in queries_db_script.py hand over to this module whenever they are
+given a sqlite3 connection, so callers keep using the same API:
+
+    connection = sqlite_backend.connect()
+    query_2(connection, "dark knight")
+
+Select it for queries_execution.py and the search service with DB_BACKEND=sqlite.
+
+Usage:
+    python src/sqlite_backend.py export [path]   # MySQL -> SQLite file
+    python src/sqlite_backend.py bench [path]    # per-query latency on the file
+"""
+
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from query_budgets import QueryFailed, TimedOut, budget_ms
+
+# Load environment variables
+load_dotenv()
+
+# Location of the exported database file
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'moviefinder.sqlite')
+
+# Rows fetched from MySQL and inserted into SQLite per batch
+EXPORT_BATCH_SIZE = 5000
+
+# Weight of title matches relative to overview matches in search_movies(),
+# mirroring queries_db_script.TITLE_MATCH_WEIGHT on top of the combined match
+TITLE_BM25_WEIGHT = 3.0
+
+SCHEMA = [
+    """CREATE TABLE movies (
+        movie_id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        overview TEXT,
+        release_date TEXT,
+        runtime INTEGER,
+        budget INTEGER,
+        revenue INTEGER,
+        vote_average REAL,
+        vote_count INTEGER,
+        popularity REAL,
+        original_language TEXT
+    )""",
+    "CREATE TABLE genres (genre_id INTEGER PRIMARY KEY, genre_name TEXT NOT NULL)",
+    "CREATE TABLE movie_genres (movie_id INTEGER, genre_id INTEGER, PRIMARY KEY (movie_id, genre_id)) WITHOUT ROWID",
+    "CREATE TABLE people (person_id INTEGER PRIMARY KEY, name TEXT NOT NULL, popularity REAL)",
+    """CREATE TABLE movie_cast (
+        movie_id INTEGER NOT NULL,
+        cast_order INTEGER NOT NULL,
+        person_id INTEGER,
+        character_name TEXT,
+        PRIMARY KEY (movie_id, cast_order)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE movie_crew (
+        movie_id INTEGER NOT NULL,
+        person_id INTEGER NOT NULL,
+        job TEXT NOT NULL,
+        department TEXT,
+        PRIMARY KEY (movie_id, person_id, job)
+    ) WITHOUT ROWID""",
+    "CREATE TABLE movie_top_billing (movie_id INTEGER PRIMARY KEY, top_cast TEXT)",
+    "CREATE TABLE movie_documents (movie_id INTEGER PRIMARY KEY, document TEXT NOT NULL)",
+    """CREATE TABLE genre_sketches (
+        genre_id INTEGER PRIMARY KEY,
+        hll_registers BLOB NOT NULL,
+        sample BLOB NOT NULL,
+        version INTEGER NOT NULL
+    )""",
+    *[f"""CREATE TABLE {table} (
+        movie_id INTEGER NOT NULL,
+        period_start TEXT NOT NULL,
+        samples INTEGER NOT NULL,
+        popularity_sum REAL NOT NULL,
+        vote_count_last INTEGER,
+        PRIMARY KEY (movie_id, period_start)
+    ) WITHOUT ROWID""" for table in ('movie_metrics_daily', 'movie_metrics_weekly')],
+    """CREATE TABLE movie_leaderboards (
+        board TEXT NOT NULL,
+        board_key INTEGER NOT NULL,
+        movie_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        release_year INTEGER,
+        vote_average REAL NOT NULL,
+        vote_count INTEGER NOT NULL,
+        PRIMARY KEY (board, board_key, movie_id)
+    ) WITHOUT ROWID""",
+    # Contentless FTS5 index; rowid is the movie_id and text is read from movies
+    "CREATE VIRTUAL TABLE movie_fts USING fts5(title, overview, content='', tokenize='unicode61 remove_diacritics 2')",
+]
+
+# Built after the load, mirroring create_db_script.create_indices()
+INDICES = [
+    "CREATE INDEX idx_movie_vote_average ON movies(vote_average)",
+    "CREATE INDEX idx_movie_release_date ON movies(release_date)",
+    "CREATE INDEX idx_movie_cast_person ON movie_cast(person_id)",
+    "CREATE INDEX idx_movie_crew_person_job ON movie_crew(person_id, job)",
+    "CREATE INDEX idx_movie_genres_genre ON movie_genres(genre_id)",
+    "CREATE INDEX idx_movie_popularity ON movies(popularity)",
+    "CREATE INDEX idx_movie_date_rating_popularity ON movies(release_date, vote_average, popularity)",
+    "CREATE INDEX idx_people_name ON people(name)",
+    "CREATE INDEX idx_movie_metrics_daily_period ON movie_metrics_daily(period_start, movie_id)",
+    "CREATE INDEX idx_movie_metrics_weekly_period ON movie_metrics_weekly(period_start, movie_id)",
+    "CREATE INDEX idx_leaderboard_rank ON movie_leaderboards"
+    "(board, board_key, vote_average DESC, vote_count DESC, movie_id)",
+]
+
+
+def to_sqlite(value):
+    """Convert mysql.connector values SQLite cannot bind."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def fts_query(text, column=None):
+    """
+    Turn free text into an FTS5 query matching any of its words, like MySQL's
+    natural language mode. Words are quoted so FTS5 operators in the input are
+    treated as plain text.
+
+    Args:
+        text (str): Search text
+        column (str): Restrict matching to this FTS column
+
+    Returns:
+        str or None: FTS5 query, None if the text has no searchable words
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    prefix = f"{column} : " if column else ""
+    return " OR ".join(f'{prefix}"{word}"' for word in dict.fromkeys(words))
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """sqlite3 connection with the is_connected() check callers use on MySQL connections."""
+
+    def is_connected(self):
+        try:
+            self.execute("SELECT 1")
+            return True
+        except sqlite3.ProgrammingError:
+            return False
+
+
+def connect(path=SQLITE_PATH):
+    """
+    Open an exported database read-only.
+
+    Args:
+        path (str): SQLite file
+
+    Returns:
+        sqlite3.Connection: Connection usable by the queries_db_script functions
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"SQLite database {path} not found; run 'python src/sqlite_backend.py export'")
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False,
+                                 factory=SQLiteConnection)
+    connection.execute("PRAGMA query_only = ON")
+    connection.execute("PRAGMA cache_size = -65536")  # 64 MB page cache
+    connection.execute("PRAGMA mmap_size = 268435456")
+    return connection
+
+
+def copy_table(mysql_connection, sqlite_connection, select, insert):
+    """
+    Stream the rows of a MySQL query into SQLite in batches.
+
+    Returns:
+        int: Number of rows copied
+    """
+    cursor = mysql_connection.cursor()
+    copied = 0
+
+    try:
+        cursor.execute(select)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            sqlite_connection.executemany(insert, [tuple(to_sqlite(v) for v in row) for row in rows])
+            copied += len(rows)
+        return copied
+    finally:
+        cursor.close()
+
+
+def export_database(mysql_connection, path=SQLITE_PATH):
+    """
+    Export the MySQL catalogue into a new SQLite file with FTS5 search.
+    The file is written next to the target and renamed into place at the end,
+    so readers of an existing file never see a half-written database.
+
+    Args:
+        mysql_connection: MySQL connection object
+        path (str): Output SQLite file
+
+    Returns:
+        dict: Table name -> rows exported
+    """
+    from queries_db_script import text_source
+
+    source, t = text_source()
+    building = f"{path}.building"
+    if os.path.exists(building):
+        os.remove(building)
+
+    connection = sqlite3.connect(building)
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    counts = {}
+
+    try:
+        for statement in SCHEMA:
+            connection.execute(statement)
+
+        tables = [
+            ('movies', f"""
+                SELECT m.movie_id, m.title, {t}.overview, m.release_date, m.runtime, m.budget,
+                       m.revenue, m.vote_average, m.vote_count, m.popularity, m.original_language
+                FROM {source}""", 11),
+            ('genres', "SELECT genre_id, genre_name FROM genres", 2),
+            ('movie_genres', "SELECT movie_id, genre_id FROM movie_genres", 2),
+            ('people', "SELECT person_id, name, popularity FROM people", 3),
+            ('movie_cast', """
+                SELECT movie_id, cast_order, person_id, character_name FROM movie_cast
+                WHERE movie_id IS NOT NULL AND cast_order IS NOT NULL""", 4),
+            ('movie_crew', """
+                SELECT movie_id, person_id, job, department FROM movie_crew
+                WHERE movie_id IS NOT NULL AND person_id IS NOT NULL AND job IS NOT NULL""", 4),
+            ('movie_top_billing', "SELECT movie_id, top_cast FROM movie_top_billing", 2),
+            ('movie_documents', "SELECT movie_id, document FROM movie_documents", 2),
+            ('genre_sketches', "SELECT genre_id, hll_registers, sample, version FROM genre_sketches", 4),
+            ('movie_leaderboards', """
+                SELECT board, board_key, movie_id, title, release_year, vote_average, vote_count
+                FROM movie_leaderboards""", 7),
+            *[(table, f"""
+                SELECT movie_id, period_start, samples, popularity_sum, vote_count_last
+                FROM {table}""", 5) for table in ('movie_metrics_daily', 'movie_metrics_weekly')],
+        ]
+
+        for table, select, width in tables:
+            start = time.perf_counter()
+            # OR REPLACE folds duplicates left by the legacy surrogate-key credit tables
+            insert = f"INSERT OR REPLACE INTO {table} VALUES ({', '.join(['?'] * width)})"
+            counts[table] = copy_table(mysql_connection, connection, select, insert)
+            print(f"✓ {table}: {counts[table]:,} rows in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        connection.execute("""
+            INSERT INTO movie_fts (rowid, title, overview)
+            SELECT movie_id, title, COALESCE(overview, '') FROM movies
+        """)
+        connection.execute("INSERT INTO movie_fts (movie_fts) VALUES ('optimize')")
+        for statement in INDICES:
+            connection.execute(statement)
+        connection.execute("ANALYZE")
+        connection.commit()
+        print(f"✓ Built FTS5 and secondary indices in {time.perf_counter() - start:.2f}s")
+
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    os.replace(building, path)
+    print(f"✓ Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return counts
+
+
+def fetch(connection, name, query, params):
+    """
+    Run a query on the SQLite connection and return all rows.
+    Errors are handled like queries_db_script.query_failed(): a query stopped by
+    cancel_query() (connection.interrupt()) returns TimedOut, any other error is
+    printed and an empty QueryFailed returned.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    except sqlite3.OperationalError as e:
+        if str(e) == 'interrupted':
+            return TimedOut(name, budget_ms(name), cancelled=True)
+        print(f"Error executing {name}: {e}")
+        return QueryFailed(name, e)
+    except sqlite3.Error as e:
+        print(f"Error executing {name}: {e}")
+        return QueryFailed(name, e)
+    finally:
+        cursor.close()
+
+
+def stopped(result):
+    """Whether a fetch() result is a TimedOut or QueryFailed instead of rows."""
+    return isinstance(result, TimedOut) or getattr(result, 'failed', False)
+
+
+def year_conditions(year_from, year_to):
+    """Release-date range conditions on movies m (ISO date strings sort correctly)."""
+    conditions = []
+    params = []
+    if year_from is not None:
+        conditions.append("AND m.release_date >= ?")
+        params.append(f"{int(year_from)}-01-01")
+    if year_to is not None:
+        conditions.append("AND m.release_date < ?")
+        params.append(f"{int(year_to) + 1}-01-01")
+    return ' '.join(conditions), params
+
+
+def query_1(connection, keywords):
+    """SQLite version of queries_db_script.query_1 (FTS5 on overview)."""
+    match = fts_query(keywords, 'overview')
+    if match is None:
+        return []
+
+    return fetch(connection, 'query_1', """
+        SELECT
+            m.title,
+            m.vote_average AS rating,
+            CAST(substr(m.release_date, 1, 4) AS INTEGER) AS year,
+            substr(m.overview, 1, 150) AS overview_snippet,
+            -bm25(movie_fts, 0.0, 1.0) AS relevance_score
+        FROM movie_fts
+        INNER JOIN movies m ON m.movie_id = movie_fts.rowid
+        WHERE movie_fts MATCH ?
+        ORDER BY relevance_score DESC, m.vote_average DESC
+        LIMIT 20
+    """, (match,))
+
+
+def query_2(connection, search_term):
+    """SQLite version of queries_db_script.query_2 (FTS5 on title)."""
+    match = fts_query(search_term, 'title')
+    if match is None:
+        return []
+
+    return fetch(connection, 'query_2', """
+        SELECT
+            m.title,
+            m.vote_average AS rating,
+            CAST(substr(m.release_date, 1, 4) AS INTEGER) AS year,
+            m.popularity,
+            -bm25(movie_fts, 1.0, 0.0) AS relevance_score
+        FROM movie_fts
+        INNER JOIN movies m ON m.movie_id = movie_fts.rowid
+        WHERE movie_fts MATCH ?
+        ORDER BY relevance_score DESC, m.popularity DESC
+        LIMIT 20
+    """, (match,))
+
+
+def query_3(connection, min_movies=20, year_from=None, year_to=None):
+    """SQLite version of queries_db_script.query_3."""
+    years, year_params = year_conditions(year_from, year_to)
+
+    return fetch(connection, 'query_3', f"""
+        SELECT
+            g.genre_name,
+            ROUND(AVG(m.vote_average), 2) AS avg_rating,
+            COUNT(DISTINCT m.movie_id) AS movie_count,
+            SUM(m.revenue) AS total_revenue,
+            ROUND(AVG(m.revenue), 0) AS avg_revenue
+        FROM genres g
+        INNER JOIN movie_genres mg ON g.genre_id = mg.genre_id
+        INNER JOIN movies m ON mg.movie_id = m.movie_id
+        WHERE m.vote_average IS NOT NULL
+            {years}
+        GROUP BY g.genre_id, g.genre_name
+        HAVING COUNT(DISTINCT m.movie_id) >= ?
+        ORDER BY avg_rating DESC, movie_count DESC
+    """, (*year_params, min_movies))
+
+
+def query_3_approximate(connection, min_movies=20, year_from=None, year_to=None):
+    """SQLite version of queries_db_script.query_3_approximate."""
+    import genre_sketches
+
+    version = fetch(connection, 'query_3_approximate',
+                    "SELECT COALESCE(SUM(version), 0), COUNT(*) FROM genre_sketches", ())
+    if stopped(version) or not version:
+        return version
+
+    def load():
+        return fetch(connection, 'query_3_approximate', """
+            SELECT g.genre_name, s.hll_registers, s.sample
+            FROM genre_sketches s
+            INNER JOIN genres g ON g.genre_id = s.genre_id
+        """, ())
+
+    sketches = genre_sketches.cached_sketches('sqlite', tuple(version[0]), load)
+    return genre_sketches.estimate_genre_stats(sketches, min_movies, year_from, year_to)
+
+
+def query_4(connection, actor_name, min_collaborations=2, year_from=None, year_to=None):
+    """SQLite version of queries_db_script.query_4."""
+    years, year_params = year_conditions(year_from, year_to)
+
+    # group_concat has no ORDER BY before SQLite 3.44, so titles are ordered in
+    # the inner query and concatenated in that order
+    return fetch(connection, 'query_4', f"""
+        SELECT
+            name AS collaborator_name,
+            COUNT(*) AS collaboration_count,
+            group_concat(title, ', ') AS movie_titles
+        FROM (
+            SELECT DISTINCT p2.person_id, p2.name, m.movie_id, m.title, m.vote_average
+            FROM people p1
+            INNER JOIN movie_cast mc1 ON p1.person_id = mc1.person_id
+            INNER JOIN movie_cast mc2 ON mc1.movie_id = mc2.movie_id
+            INNER JOIN people p2 ON mc2.person_id = p2.person_id
+            INNER JOIN movies m ON mc1.movie_id = m.movie_id
+            WHERE
+                p1.name LIKE ?
+                AND p2.person_id != p1.person_id
+                {years}
+            ORDER BY m.vote_average DESC
+        )
+        GROUP BY person_id, name
+        HAVING COUNT(*) >= ?
+        ORDER BY collaboration_count DESC, name
+        LIMIT 20
+    """, (f"%{actor_name}%", *year_params, min_collaborations))
+
+
+def query_5(connection, director_name, min_rating=7.0, year_from=None, year_to=None):
+    """SQLite version of queries_db_script.query_5."""
+    years, year_params = year_conditions(year_from, year_to)
+
+    return fetch(connection, 'query_5', f"""
+        SELECT DISTINCT
+            m.title,
+            m.vote_average AS rating,
+            CAST(substr(m.release_date, 1, 4) AS INTEGER) AS year,
+            m.revenue,
+            tb.top_cast
+        FROM movies m
+        INNER JOIN movie_crew mcr ON m.movie_id = mcr.movie_id
+        INNER JOIN people p_dir ON mcr.person_id = p_dir.person_id
+        LEFT JOIN movie_top_billing tb ON tb.movie_id = m.movie_id
+        WHERE
+            p_dir.name LIKE ?
+            AND mcr.job = 'Director'
+            AND m.vote_average >= ?
+            {years}
+        ORDER BY m.vote_average DESC, m.popularity DESC
+        LIMIT 20
+    """, (f"%{director_name}%", float(min_rating), *year_params))
+
+
+def search_movies(connection, text, genre=None, year_from=None, year_to=None, limit=20):
+    """SQLite version of queries_db_script.search_movies (FTS5 on title + overview)."""
+    match = fts_query(text)
+    if match is None:
+        return []
+
+    years, params = year_conditions(year_from, year_to)
+    genre_filter = ""
+    if genre is not None:
+        genre_filter = """AND EXISTS (
+            SELECT 1
+            FROM movie_genres mg
+            INNER JOIN genres g ON mg.genre_id = g.genre_id
+            WHERE mg.movie_id = m.movie_id AND g.genre_name = ?
+        )"""
+        params.append(genre)
+
+    return fetch(connection, 'search_movies', f"""
+        SELECT
+            m.movie_id,
+            m.title,
+            m.vote_average AS rating,
+            CAST(substr(m.release_date, 1, 4) AS INTEGER) AS year,
+            m.popularity,
+            substr(m.overview, 1, 150) AS overview_snippet,
+            -bm25(movie_fts, ?, 1.0) AS score
+        FROM movie_fts
+        INNER JOIN movies m ON m.movie_id = movie_fts.rowid
+        WHERE movie_fts MATCH ?
+            {years}
+            {genre_filter}
+        ORDER BY score DESC, m.popularity DESC
+        LIMIT ?
+    """, (TITLE_BM25_WEIGHT, match, *params, int(limit)))
+
+
+def browse_filters(genre, min_rating, year_from, year_to, exclude=None):
+    """SQLite version of queries_db_script.browse_filters."""
+    conditions = []
+    params = []
+
+    if genre is not None and exclude != 'genre':
+        conditions.append("""AND EXISTS (
+            SELECT 1
+            FROM movie_genres mg
+            WHERE mg.movie_id = m.movie_id
+                AND mg.genre_id = (SELECT genre_id FROM genres WHERE genre_name = ?)
+        )""")
+        params.append(genre)
+    if min_rating is not None and exclude != 'rating':
+        conditions.append("AND m.vote_average >= ?")
+        params.append(float(min_rating))
+    if exclude != 'year':
+        years, year_params = year_conditions(year_from, year_to)
+        conditions.append(years)
+        params.extend(year_params)
+
+    return ' '.join(conditions), params
+
+
+def browse_movies(connection, genre, year_from, year_to, min_rating, sort, page, page_size):
+    """SQLite version of queries_db_script.browse_movies (arguments already validated)."""
+    from queries_db_script import BROWSE_SORTS, BrowsePage
+
+    year = "CAST(substr(m.release_date, 1, 4) AS INTEGER)"
+
+    filters, params = browse_filters(genre, min_rating, year_from, year_to)
+    rows = fetch(connection, 'browse_movies', f"""
+        SELECT m.movie_id, m.title, m.vote_average AS rating, {year} AS year, m.popularity, m.vote_count
+        FROM movies m
+        WHERE 1 = 1
+            {filters}
+        ORDER BY {BROWSE_SORTS[sort]}, m.movie_id
+        LIMIT ? OFFSET ?
+    """, (*params, page_size, (page - 1) * page_size))
+    if stopped(rows):
+        return rows
+
+    filters, params = browse_filters(genre, min_rating, year_from, year_to, exclude='genre')
+    genres = fetch(connection, 'browse_movies', f"""
+        SELECT g.genre_id, g.genre_name, COUNT(*) AS movie_count
+        FROM movie_genres mg
+        INNER JOIN movies m ON m.movie_id = mg.movie_id
+        INNER JOIN genres g ON g.genre_id = mg.genre_id
+        WHERE 1 = 1
+            {filters}
+        GROUP BY g.genre_id, g.genre_name
+        ORDER BY movie_count DESC, g.genre_name
+    """, params)
+
+    filters, params = browse_filters(genre, min_rating, year_from, year_to, exclude='year')
+    years = fetch(connection, 'browse_movies', f"""
+        SELECT {year} AS year, COUNT(*) AS movie_count
+        FROM movies m
+        WHERE m.release_date IS NOT NULL
+            {filters}
+        GROUP BY year
+        ORDER BY year DESC
+    """, params)
+
+    filters, params = browse_filters(genre, min_rating, year_from, year_to, exclude='rating')
+    matching = "COUNT(*)" if min_rating is None else "SUM(m.vote_average >= ?)"
+    buckets = fetch(connection, 'browse_movies', f"""
+        SELECT CAST(m.vote_average AS INTEGER) AS bucket, COUNT(*) AS movie_count, {matching} AS matching
+        FROM movies m
+        WHERE 1 = 1
+            {filters}
+        GROUP BY bucket
+        ORDER BY bucket DESC
+    """, ((float(min_rating),) if min_rating is not None else ()) + tuple(params))
+
+    for result in (genres, years, buckets):
+        if stopped(result):
+            return result
+
+    facets = {
+        'genres': [{'genre_id': genre_id, 'name': name, 'count': count} for genre_id, name, count in genres],
+        'years': [{'year': y, 'count': count} for y, count in years],
+        'ratings': [{'rating': bucket, 'count': count} for bucket, count, _ in buckets if bucket is not None],
+    }
+    total = sum(matched or 0 for _, _, matched in buckets)
+    return BrowsePage(rows, total, facets, page, page_size)
+
+
+def get_movie(connection, movie_ids):
+    """SQLite version of queries_db_script.get_movie (documents only, no fallback)."""
+    rows = fetch(connection, 'get_movie', f"""
+        SELECT movie_id, document
+        FROM movie_documents
+        WHERE movie_id IN ({', '.join(['?'] * len(movie_ids))})
+    """, movie_ids)
+    if stopped(rows):
+        return rows
+
+    documents = {movie_id: json.loads(document) for movie_id, document in rows}
+    return [(movie_id, documents[movie_id]) for movie_id in movie_ids if movie_id in documents]
+
+
+def similar_movies(connection, matches):
+    """SQLite version of the detail lookup in queries_db_script.similar_movies."""
+    rows = fetch(connection, 'similar_movies', f"""
+        SELECT movie_id, title, vote_average, CAST(substr(release_date, 1, 4) AS INTEGER)
+        FROM movies
+        WHERE movie_id IN ({', '.join(['?'] * len(matches))})
+    """, [match_id for match_id, _ in matches])
+    if stopped(rows):
+        return rows
+
+    details = {row[0]: row for row in rows}
+    return [(*details[match_id], round(similarity, 3)) for match_id, similarity in matches if match_id in details]
+
+
+def top_movies(connection, board, key, limit):
+    """SQLite version of queries_db_script.top_movies."""
+    if board == 'genre':
+        key_filter = "l.board_key = (SELECT genre_id FROM genres WHERE genre_name = ?)"
+    elif board == 'director':
+        key_filter = "l.board_key IN (SELECT person_id FROM people WHERE name = ?)"
+    else:
+        key_filter, key = "l.board_key = ?", int(key)
+
+    return fetch(connection, 'top_movies', f"""
+        SELECT l.movie_id, l.title, l.vote_average AS rating, l.vote_count, l.release_year AS year
+        FROM movie_leaderboards l
+        WHERE l.board = ? AND {key_filter}
+        ORDER BY l.vote_average DESC, l.vote_count DESC, l.movie_id
+        LIMIT ?
+    """, (board, key, limit))
+
+
+def trending_movies(connection, table, prior_start, recent_start, recent_end, limit):
+    """SQLite version of queries_db_script.trending_movies (window bounds precomputed)."""
+    from metrics_history import TRENDING_MIN_POPULARITY
+
+    recent_start, prior_start, recent_end = (to_sqlite(day) for day in (recent_start, prior_start, recent_end))
+    return fetch(connection, 'trending_movies', f"""
+        SELECT w.movie_id, m.title, ROUND(w.recent, 3), ROUND(w.prior, 3),
+               ROUND(w.recent / w.prior - 1, 4) AS growth, w.recent_votes - w.prior_votes
+        FROM (
+            SELECT
+                r.movie_id,
+                SUM(CASE WHEN r.period_start >= ? THEN r.popularity_sum END)
+                    / SUM(CASE WHEN r.period_start >= ? THEN r.samples END) AS recent,
+                SUM(CASE WHEN r.period_start < ? THEN r.popularity_sum END)
+                    / SUM(CASE WHEN r.period_start < ? THEN r.samples END) AS prior,
+                MAX(CASE WHEN r.period_start >= ? THEN r.vote_count_last END) AS recent_votes,
+                MAX(CASE WHEN r.period_start < ? THEN r.vote_count_last END) AS prior_votes
+            FROM {table} r
+            WHERE r.period_start >= ? AND r.period_start < ?
+            GROUP BY r.movie_id
+        ) w
+        INNER JOIN movies m ON m.movie_id = w.movie_id
+        WHERE w.recent IS NOT NULL AND w.prior >= ?
+        ORDER BY growth DESC, w.recent DESC
+        LIMIT ?
+    """, (*[recent_start] * 6, prior_start, recent_end, TRENDING_MIN_POPULARITY, int(limit)))
+
+
+def benchmark(connection, repeats=50):
+    """
+    Median latency of each query on the SQLite file.
+
+    Returns:
+        list: List of tuples (query, median ms, rows)
+    """
+    calls = [
+        ('query_1', query_1, ("space exploration",)),
+        ('query_2', query_2, ("dark knight",)),
+        ('query_3', query_3, (20,)),
+        ('query_4', query_4, ("Tom Hanks", 1)),
+        ('query_5', query_5, ("Christopher Nolan", 7.0)),
+        ('search_movies', search_movies, ("love story",)),
+    ]
+
+    results = []
+    for name, func, args in calls:
+        rows = func(connection, *args)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(connection, *args)
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append((name, statistics.median(timings), len(rows)))
+    return results
+
+
+def main():
+    """
+    Export the MySQL database to SQLite, or benchmark an exported file.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    path = sys.argv[2] if len(sys.argv) > 2 else SQLITE_PATH
+
+    if command == 'export':
+        from api_data_retrieve import get_db_connection
+
+        connection = None
+        try:
+            connection = get_db_connection()
+            start = time.perf_counter()
+            export_database(connection, path)
+            print(f"\nExport completed in {time.perf_counter() - start:.1f}s")
+        except Error as e:
+            print(f"\nDatabase Error: {e}")
+            return 1
+        finally:
+            if connection and connection.is_connected():
+                connection.close()
+
+    elif command == 'bench':
+        connection = connect(path)
+        try:
+            print(f"{'Query':<16}{'Median ms':<12}{'Rows'}")
+            print("-"*34)
+            for name, median_ms, rows in benchmark(connection):
+                print(f"{name:<16}{median_ms:<12.3f}{rows}")
+        finally:
+            connection.close()
+
+    else:
+        print("Usage: python src/sqlite_backend.py <export|bench> [path]")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())